@@ -0,0 +1,71 @@
+"""
+ctc_extract - phát hiện bảng theo border trong file Excel và trích xuất ra JSON.
+
+Các hàm public được nạp "lười" (lazy): `import ctc_extract` không import pandas,
+openpyxl hay numpy; mỗi module con chỉ được nạp khi tên tương ứng được dùng lần
+đầu (ví dụ cache hit qua `load_cached_sheet` không cần pandas).
+
+    from ctc_extract import detect_tables, extract_sheet
+    tables = detect_tables("Book1.xlsx", "Sheet1", min_width=2, min_height=2)
+"""
+
+import importlib
+from typing import Any, List
+
+__version__ = "0.1.0"
+
+# tên public -> module con chứa nó
+_EXPORTS = {
+    # Giai đoạn 1: phát hiện bảng
+    "load_worksheet": "detection",
+    "detect_tables": "detection",
+    "detect_tables_in_worksheet": "detection",
+    "detect_value_blocks_in_worksheet": "detection",
+    "debug_extract_data": "detection",
+    # Giai đoạn 2: JSON "dài"
+    "detect_header_split_point": "header_split",
+    "register_header_split_strategy": "header_split",
+    "HEADER_SPLIT_STRATEGIES": "header_split",
+    "detect_attribute_boundary": "long_format",
+    "analyze_header": "long_format",
+    "infer_column_types": "long_format",
+    "parse_table_to_long_json": "long_format",
+    "iter_table_to_long_json": "long_format",
+    "parse_table_to_long_json_sharded": "long_format",
+    # Giai đoạn 2: JSON lồng nhau
+    "DynamicExcelParser": "nested",
+    "excel_to_nested_json": "nested",
+    "visualize_structure": "nested",
+    # Pipeline / service
+    "extract_sheet": "pipeline",
+    "ExtractOptions": "service",
+    "ExtractionService": "service",
+    "extract_workbook": "service",
+    "extract_workbook_sync": "service",
+    "TemplateStore": "templates",
+    "extract_sheet_templated": "templates",
+    # Bộ đọc XLSX + cache
+    "XlsxWorkbook": "xlsx_reader",
+    "SheetGrid": "xlsx_reader",
+    "read_sheet": "xlsx_reader",
+    "load_cached_sheet": "grid_cache",
+    "share_frame": "shared_grid",
+    "attach_frame": "shared_grid",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f".{module_name}", __name__)
+    # grid_cache.load_sheet được export dưới tên load_cached_sheet
+    value = getattr(module, "load_sheet" if name == "load_cached_sheet" else name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,118 @@
+"""
+Đo thời gian các chiến lược tách header (`header_split`) trên các file thật:
+
+    python -m ctc_extract.bench Book1.xlsx data/*.xlsx
+    python -m ctc_extract.bench Book1.xlsx --strategies edges,edges_vectorized --repeat 20
+    python -m ctc_extract.bench Book1.xlsx --reader openpyxl
+
+Với mỗi file / sheet: phát hiện bảng một lần, đọc dữ liệu thô của từng bảng,
+rồi chạy từng chiến lược `--repeat` lần (log của chiến lược bị tắt). In ra
+thời gian trung bình (ms / bảng) và số bảng cho kết quả giống chiến lược mốc
+(`--baseline`, mặc định "edges").
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+from typing import Dict, List, Optional
+
+from .detection import _create_merged_cell_map, debug_extract_data, detect_tables_in_worksheet, load_worksheet
+from .header_split import DEFAULT_HEADER_STRATEGY, HEADER_SPLIT_STRATEGIES, detect_header_split_point
+from .xlsx_reader import XlsxWorkbook
+
+
+def bench_file(file_path: str, strategies: List[str],
+               sheets: Optional[List[str]] = None,
+               border_threshold: float = 0.98,
+               repeat: int = 5,
+               reader: str = "native",
+               min_width: int = 2,
+               min_height: int = 2) -> Dict[str, Dict[str, float]]:
+    """
+    Chạy benchmark trên một file.
+
+    Returns:
+        { chiến lược: {"seconds": tổng thời gian, "tables": số bảng, "splits": [kết quả từng bảng]} }
+    """
+    if sheets is None:
+        with XlsxWorkbook(file_path) as wb:
+            sheets = wb.sheetnames
+
+    stats = {name: {"seconds": 0.0, "tables": 0, "splits": []} for name in strategies}
+    for sheet_name in sheets:
+        with contextlib.redirect_stdout(io.StringIO()):
+            worksheet, wb = load_worksheet(file_path, sheet_name, reader=reader)
+            merged_map = _create_merged_cell_map(worksheet)
+            tables = detect_tables_in_worksheet(worksheet, min_width=min_width, min_height=min_height,
+                                                merged_map=merged_map)
+            frames = [(coords, debug_extract_data(file_path, sheet_name, coords, worksheet))
+                      for coords in tables]
+        try:
+            for coords, raw_table_df in frames:
+                if raw_table_df.empty:
+                    continue
+                for name in strategies:
+                    sink = io.StringIO()
+                    started = time.perf_counter()
+                    with contextlib.redirect_stdout(sink):
+                        for _ in range(repeat):
+                            split = detect_header_split_point(raw_table_df, worksheet, coords, merged_map,
+                                                              border_threshold=border_threshold,
+                                                              strategy=name)
+                    stats[name]["seconds"] += (time.perf_counter() - started) / repeat
+                    stats[name]["tables"] += 1
+                    stats[name]["splits"].append(split)
+        finally:
+            if wb is not None:
+                wb.close()
+    return stats
+
+
+def _report(file_path: str, stats: Dict[str, Dict[str, float]], baseline: str) -> None:
+    reference = stats.get(baseline, {}).get("splits")
+    print(f"\n{file_path}")
+    print(f"  {'chiến lược':<24}{'bảng':>6}{'ms/bảng':>12}{'giống ' + baseline:>16}")
+    for name, entry in stats.items():
+        tables = entry["tables"]
+        per_table = entry["seconds"] * 1000 / tables if tables else 0.0
+        if reference is None:
+            agree = "-"
+        else:
+            agree = f"{sum(a == b for a, b in zip(entry['splits'], reference))}/{tables}"
+        print(f"  {name:<24}{tables:>6}{per_table:>12.3f}{agree:>16}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m ctc_extract.bench",
+                                     description="Benchmark các chiến lược tách header/data.")
+    parser.add_argument("files", nargs="+", help="Các file .xlsx")
+    parser.add_argument("--strategies", default=None,
+                        help="Danh sách chiến lược, cách nhau bởi dấu phẩy (mặc định: tất cả)")
+    parser.add_argument("--baseline", default=DEFAULT_HEADER_STRATEGY,
+                        help="Chiến lược mốc để so kết quả")
+    parser.add_argument("--sheets", default=None, help="Danh sách sheet, cách nhau bởi dấu phẩy")
+    parser.add_argument("--threshold", type=float, default=0.98, help="border_threshold")
+    parser.add_argument("--repeat", type=int, default=5, help="Số lần chạy mỗi chiến lược / bảng")
+    parser.add_argument("--reader", choices=["native", "openpyxl"], default="native")
+    args = parser.parse_args(argv)
+
+    strategies = args.strategies.split(",") if args.strategies else sorted(HEADER_SPLIT_STRATEGIES)
+    unknown = [name for name in strategies if name not in HEADER_SPLIT_STRATEGIES]
+    if unknown:
+        print(f"Lỗi: chiến lược không hợp lệ: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    for file_path in args.files:
+        stats = bench_file(file_path, strategies,
+                           sheets=args.sheets.split(",") if args.sheets else None,
+                           border_threshold=args.threshold,
+                           repeat=max(1, args.repeat),
+                           reader=args.reader)
+        _report(file_path, stats, args.baseline)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""
+CLI `ctc-extract`: chạy toàn bộ pipeline (phát hiện bảng -> JSON) cho nhiều file
+trong MỘT process (pandas / openpyxl chỉ import một lần).
+
+    ctc-extract Book1.xlsx Book2.xlsx --sheets Sheet1 --format ndjson -o out/
+    ctc-extract data/*.xlsx --workers 4 --format parquet
+    ctc-extract Book1.xlsx --profile
+    python -m ctc_extract Book1.xlsx          (không cần cài đặt)
+
+Mỗi file đầu vào ghi ra `<output-dir>/<tên file>.<format>`:
+    json    - { tên sheet: [bản ghi...] }
+    ndjson  - mỗi dòng 1 bản ghi, thêm key "_sheet"
+    parquet - bản ghi được làm phẳng (`Financials.Product A.Revenue`), cột "_sheet"
+              (cần pyarrow: `pip install ctc-extract[parquet]`)
+
+Log của pipeline in ra stderr; stdout chỉ in đường dẫn các file kết quả.
+"""
+
+import argparse
+import contextlib
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from .header_split import HEADER_SPLIT_STRATEGIES
+from .service import ExtractOptions, extract_workbook_sync
+
+
+FORMATS = ("json", "ndjson", "parquet")
+
+
+# ======================================================================
+# GHI KẾT QUẢ
+# ======================================================================
+
+def _write_json(path: str, sheets: Dict[str, List[Dict[str, Any]]]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        # Ô ngày tháng (datetime / Timestamp) -> chuỗi ISO
+        json.dump(sheets, f, indent=2, ensure_ascii=False, default=str)
+
+
+def _write_ndjson(path: str, sheets: Dict[str, List[Dict[str, Any]]]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for sheet_name, records in sheets.items():
+            for record in records:
+                f.write(json.dumps({"_sheet": sheet_name, **record}, ensure_ascii=False, default=str))
+                f.write("\n")
+
+
+def _write_parquet(path: str, sheets: Dict[str, List[Dict[str, Any]]]) -> None:
+    import pandas as pd
+
+    frames = []
+    for sheet_name, records in sheets.items():
+        frame = pd.json_normalize(records)
+        frame.insert(0, "_sheet", sheet_name)
+        frames.append(frame)
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame({"_sheet": []})
+
+    # Parquet cần mỗi cột một kiểu: cột object lẫn kiểu (số + chữ) -> chuỗi
+    for col in df.columns[df.dtypes == object]:
+        types = {type(v) for v in df[col].dropna()}
+        if len(types) > 1:
+            df[col] = df[col].map(lambda v: v if v is None or v != v else str(v))
+    df.to_parquet(path, index=False)
+
+
+_WRITERS = {"json": _write_json, "ndjson": _write_ndjson, "parquet": _write_parquet}
+
+
+# ======================================================================
+# CHẠY
+# ======================================================================
+
+def _extract_quietly(path: str, options: ExtractOptions, verbose: bool) -> Dict[str, Any]:
+    """Chạy pipeline cho 1 file; log của pipeline sang stderr (hoặc bỏ nếu không verbose)."""
+    sink = sys.stderr if verbose else io.StringIO()
+    with contextlib.redirect_stdout(sink):
+        try:
+            return extract_workbook_sync(path, options)
+        except Exception as e:
+            return {"sheets": {}, "errors": {"*": f"{type(e).__name__}: {e}"}, "elapsed": 0.0}
+
+
+def _output_path(output_dir: str, input_path: str, fmt: str) -> str:
+    stem = os.path.splitext(os.path.basename(input_path))[0]
+    return os.path.join(output_dir, f"{stem}.{fmt}")
+
+
+def _output_collisions(files: List[str], output_dir: str, fmt: str) -> Dict[str, List[str]]:
+    """Các file kết quả bị nhiều file đầu vào cùng ghi vào ({đường dẫn ra: [đầu vào...]})."""
+    sources: Dict[str, List[str]] = {}
+    for path in files:
+        key = os.path.normcase(os.path.abspath(_output_path(output_dir, path, fmt)))
+        sources.setdefault(key, []).append(path)
+    return {output: inputs for output, inputs in sources.items() if len(inputs) > 1}
+
+
+def run(files: List[str], options: ExtractOptions, fmt: str = "json",
+        output_dir: str = ".", workers: int = 1, verbose: bool = False) -> int:
+    """
+    Xử lý `files` và ghi kết quả. Trả về exit code (0 = mọi file/sheet thành công).
+
+    workers > 1: mỗi file chạy trong 1 process của pool (warm - không import lại
+    pandas cho từng file); kết quả được ghi ở process chính theo thứ tự đầu vào.
+    
+    Hai file đầu vào cùng tên (`a/Book1.xlsx`, `b/Book1.xlsx`) sẽ ghi đè cùng một
+    file kết quả -> báo lỗi và trả về 2 trước khi xử lý file nào.
+    """
+    collisions = _output_collisions(files, output_dir, fmt)
+    if collisions:
+        for output, inputs in collisions.items():
+            print(f"Lỗi: {', '.join(inputs)} cùng ghi ra {output}. "
+                  f"Đổi tên file hoặc chạy riêng với --output-dir khác nhau.", file=sys.stderr)
+        return 2
+    
+    os.makedirs(output_dir, exist_ok=True)
+    exit_code = 0
+
+    if workers > 1 and len(files) > 1:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        results = pool.map(_extract_quietly, files, [options] * len(files), [verbose] * len(files))
+    else:
+        pool = None
+        results = (_extract_quietly(path, options, verbose) for path in files)
+
+    try:
+        for path, result in zip(files, results):
+            for sheet_name, error in result["errors"].items():
+                print(f"⚠ {path} [{sheet_name}]: {error}", file=sys.stderr)
+                exit_code = 1
+            if not result["sheets"] and result["errors"]:
+                continue
+
+            output_path = _output_path(output_dir, path, fmt)
+            _WRITERS[fmt](output_path, result["sheets"])
+            total = sum(len(records) for records in result["sheets"].values())
+            print(f"  {path}: {len(result['sheets'])} sheet, {total} bản ghi, "
+                  f"{result['elapsed']:.2f}s", file=sys.stderr)
+            print(output_path)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return exit_code
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="ctc-extract",
+        description="Phát hiện bảng (theo border) trong file Excel và trích xuất ra JSON.")
+    parser.add_argument("files", nargs="+", help="Các file .xlsx cần xử lý")
+    parser.add_argument("--sheets", default=None,
+                        help="Danh sách sheet, cách nhau bởi dấu phẩy (mặc định: tất cả)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Số process xử lý song song các file (mặc định 1)")
+    parser.add_argument("--format", choices=FORMATS, default="json", dest="fmt")
+    parser.add_argument("-o", "--output-dir", default=".", help="Thư mục ghi kết quả")
+    parser.add_argument("--min-width", type=int, default=2, help="Chiều rộng tối thiểu của bảng")
+    parser.add_argument("--min-height", type=int, default=2, help="Chiều cao tối thiểu của bảng")
+    parser.add_argument("--border-threshold", type=float, default=0.98,
+                        help="Tỉ lệ ô có border để coi là ranh giới header/data")
+    parser.add_argument("--engine", choices=["bfs", "scanline"], default="bfs",
+                        help="Thuật toán tìm cụm border")
+    parser.add_argument("--header-strategy", choices=sorted(HEADER_SPLIT_STRATEGIES), default=None,
+                        help="Chiến lược tách header/data (mặc định edges, numeric_density với --detection values)")
+    parser.add_argument("--detection", choices=["borders", "values"], default="borders",
+                        help="Phát hiện bảng theo border (mặc định) hoặc theo khối ô có giá trị, không đọc style")
+    parser.add_argument("--templates", default=None, metavar="DIR",
+                        help="Thư mục template bố cục: file cùng mẫu với file đã gặp bỏ qua phát hiện bảng")
+    parser.add_argument("--table-workers", type=int, default=1,
+                        help="Số process lắp ráp MỘT bảng lớn (chia các hàng dữ liệu thành shard)")
+    parser.add_argument("--structured", action="store_true",
+                        help="Dùng Excel Table / defined name của sheet làm bảng có sẵn (bỏ qua tìm border "
+                             "trong các vùng đó); chỉ dùng khi mỗi tên là đúng một bảng")
+    parser.add_argument("--profile", action="store_true",
+                        help="Chạy với cProfile và in các hàm tốn thời gian nhất ra stderr")
+    parser.add_argument("-v", "--verbose", action="store_true", help="In log chi tiết của pipeline")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.fmt == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            print("Lỗi: --format parquet cần pyarrow (pip install ctc-extract[parquet]).", file=sys.stderr)
+            return 2
+    options = ExtractOptions(
+        sheets=[s for s in args.sheets.split(",") if s] if args.sheets else None,
+        min_width=args.min_width,
+        min_height=args.min_height,
+        border_threshold=args.border_threshold,
+        engine=args.engine,
+        header_strategy=args.header_strategy,
+        detection=args.detection,
+        template_dir=args.templates,
+        table_workers=args.table_workers,
+        structured=args.structured,
+    )
+
+    started = time.perf_counter()
+    if args.profile:
+        if args.workers > 1:
+            print("⚠ --profile chỉ đo process chính: chạy với --workers 1.", file=sys.stderr)
+        profiler = cProfile.Profile()
+        exit_code = profiler.runcall(run, args.files, options, args.fmt, args.output_dir, 1, args.verbose)
+        stats = pstats.Stats(profiler, stream=sys.stderr)
+        stats.sort_stats("cumulative").print_stats(25)
+    else:
+        exit_code = run(args.files, options, args.fmt, args.output_dir, args.workers, args.verbose)
+
+    print(f"Hoàn thành {len(args.files)} file trong {time.perf_counter() - started:.2f}s", file=sys.stderr)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
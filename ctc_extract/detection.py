@@ -0,0 +1,714 @@
+"""
+Giai đoạn 1: phát hiện bảng theo border (bản đồ ô gộp -> heatmap -> cụm -> bounding box),
+tải sheet và đọc dữ liệu thô bên trong một bảng.
+
+Chế độ "values" (`detect_value_blocks_in_worksheet`) dành cho các sheet mà bảng
+được ngăn cách bằng hàng/cột trống thay vì border: không đọc style, bảng là các
+khối ô có giá trị liền kề nhau.
+
+openpyxl / pandas chỉ được import khi thực sự cần (fallback openpyxl, `pd.read_excel`).
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .grid_cache import load_sheet as load_cached_sheet
+from .xlsx_reader import SheetGrid, WorkbookSource, as_seekable, parse_range_ref, read_sheet, rewind
+
+if TYPE_CHECKING:
+    import openpyxl
+    import pandas as pd
+    from openpyxl.worksheet.worksheet import Worksheet
+
+
+# ======================================================================
+# GIAI ĐOẠN 1: PHÁT HIỆN BẢNG (Giữ nguyên từ trước)
+# ======================================================================
+
+# --- BƯỚC 0: BẢNG CÓ SẴN TRONG FILE (EXCEL TABLE / DEFINED NAME) ---
+# Hộp (min_col, min_row, max_col, max_row), 1-indexed - giống `range_boundaries`
+Box = Tuple[int, int, int, int]
+
+
+def _structured_ranges(ws: Any) -> List[Tuple[str, str]]:
+    """
+    Các vùng (tên, ref) mà workbook tự khai báo cho sheet: Excel Table trước,
+    rồi tới các defined name (bỏ tên ẩn / tên dựng sẵn như Print_Area).
+    
+    Defined name được sắp theo (tên, ref): bộ đọc native giữ thứ tự trong
+    workbook.xml còn openpyxl để tên cục bộ trước tên toàn cục, nên thứ tự
+    khai báo không dùng được khi bộ đọc native fallback sang openpyxl.
+    """
+    ranges = list(ws.tables.items())
+    if isinstance(ws, SheetGrid):
+        return ranges + sorted(ws.defined_ranges)
+
+    # openpyxl: tên cục bộ của sheet + tên toàn cục của workbook
+    defined_names = list(ws.defined_names.values()) + list(ws.parent.defined_names.values())
+    named_ranges = []
+    for defined_name in defined_names:
+        if defined_name.hidden or defined_name.name.startswith("_xlnm."):
+            continue
+        try:
+            destinations = list(defined_name.destinations)
+        except Exception:
+            continue
+        named_ranges.extend((defined_name.name, ref) for title, ref in destinations if title == ws.title)
+    return ranges + sorted(named_ranges)
+
+
+def _boxes_overlap(a: Box, b: Box) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def _structured_boxes(ws: Any, min_width: int, min_height: int) -> List[Box]:
+    """
+    Hộp của các Excel Table / defined name đủ kích thước `min_width x min_height`.
+    Vùng chồng lên một vùng đã nhận (thường là tên đặt trùng vùng của Table)
+    bị bỏ qua. Kết quả sắp theo (min_row, min_col) như các bảng theo border.
+    """
+    boxes: List[Box] = []
+    for name, ref in _structured_ranges(ws):
+        try:
+            box = parse_range_ref(ref)
+        except ValueError:
+            continue
+        min_col, min_row, max_col, max_row = box
+        if max_col - min_col + 1 < min_width or max_row - min_row + 1 < min_height:
+            continue
+        if any(_boxes_overlap(box, other) for other in boxes):
+            continue
+        boxes.append(box)
+    return sorted(boxes, key=lambda box: (box[1], box[0]))
+
+
+def _in_boxes(r: int, c: int, boxes: List[Box]) -> bool:
+    """Ô (r, c) 1-indexed có nằm trong hộp nào không."""
+    return any(b[1] <= r <= b[3] and b[0] <= c <= b[2] for b in boxes)
+
+
+# --- BƯỚC 1: TẠO BẢN ĐỒ TRA CỨU Ô GỘP ---
+def _create_merged_cell_map(ws: Worksheet) -> Dict[Tuple[int, int], Tuple[int, int]]:
+    """
+    Tạo một dict (map) để tra cứu ô "cha" (ô top-left chứa style)
+    từ bất kỳ tọa độ ô "con" nào.
+    
+    Returns:
+        Dict[(con_r, con_c), (cha_r, cha_c)]
+    """
+    merged_map = {}
+    # Lặp qua tất cả các dải ô gộp trong sheet
+    for merged_range in ws.merged_cells.ranges:
+        # Lấy tọa độ (1-based index) của dải ô
+        min_col, min_row, max_col, max_row = merged_range.bounds
+        
+        # Tọa độ ô "cha" (ô top-left)
+        parent_coord = (min_row, min_col)
+        
+        # Lặp qua tất cả ô "con" trong dải (bao gồm cả ô cha)
+        for r in range(min_row, max_row + 1):
+            for c in range(min_col, max_col + 1):
+                # Ánh xạ ô con về ô cha
+                merged_map[(r, c)] = parent_coord
+    return merged_map
+
+# --- BƯỚC 2: TẠO BẢN ĐỒ NHIỆT BORDER (ĐÃ XỬ LÝ Ô GỘP) ---
+# Heatmap thưa: { hàng (0-indexed): {các cột (0-indexed) có border} }
+SparseHeatmap = Dict[int, Set[int]]
+
+
+def _has_border(border: Any) -> bool:
+    # Chỉ cần 1 cạnh có style là coi như ô đó có border
+    return bool(border.left.style or border.right.style or
+                border.top.style or border.bottom.style)
+
+
+def _create_border_heatmap(ws: Worksheet, merged_map: Dict,
+                           exclude: Optional[List[Box]] = None) -> SparseHeatmap:
+    """
+    Tạo bản đồ (heatmap) THƯA của sheet: chỉ lưu các ô "Đất"
+    (ô có border, hoặc là 1 phần của ô gộp có border). Ô không có trong map
+    là "Biển".
+    
+    Chỉ duyệt các ô thực sự có trong sheet (và các dải gộp), nên bộ nhớ / thời
+    gian tỉ lệ với số ô có style chứ không phải diện tích `max_row x max_column`
+    (1 ô định dạng lạc ở XFD1048576 không làm heatmap phình to).
+    
+    Bản đồ này sử dụng 0-based index để dễ dàng cho Bước 3.
+    
+    Args:
+        exclude: Các hộp (1-indexed) đã biết là bảng (Bước 0) - ô bên trong
+                 không được đưa vào heatmap.
+    """
+    heatmap: SparseHeatmap = {}
+    exclude = exclude or []
+
+    # 1. Các ô KHÔNG thuộc dải gộp: xét border của chính nó
+    if isinstance(ws, SheetGrid):
+        # Bộ đọc native: lọc ô có border vector hóa từ mảng style index
+        rows, cols = ws.bordered_cells()
+        if exclude:
+            keep = np.ones(len(rows), dtype=bool)
+            for min_col, min_row, max_col, max_row in exclude:
+                keep &= ~((rows >= min_row) & (rows <= max_row) & (cols >= min_col) & (cols <= max_col))
+            rows, cols = rows[keep], cols[keep]
+        bordered = zip(rows.tolist(), cols.tolist())
+    else:
+        # openpyxl: chỉ duyệt các ô đã tồn tại (`ws.cell()` sẽ tạo ô mới)
+        bordered = (coord for coord, cell in ws._cells.items()
+                    if _has_border(cell.border) and not (exclude and _in_boxes(*coord, exclude)))
+
+    for r, c in bordered:
+        if (r, c) not in merged_map:
+            heatmap.setdefault(r - 1, set()).add(c - 1)
+
+    # 2. Ô thuộc dải gộp: lấy border của ô "cha" (top-left) cho cả dải
+    for merged_range in ws.merged_cells.ranges:
+        min_col, min_row, max_col, max_row = merged_range.bounds
+        if not _has_border(ws.cell(row=min_row, column=min_col).border):
+            continue
+        if any(_boxes_overlap(merged_range.bounds, box) for box in exclude):
+            # Chỉ phần của dải gộp nằm ngoài các bảng đã biết
+            for r in range(min_row, max_row + 1):
+                outside = [c - 1 for c in range(min_col, max_col + 1) if not _in_boxes(r, c, exclude)]
+                if outside:
+                    heatmap.setdefault(r - 1, set()).update(outside)
+            continue
+        merged_cols = range(min_col - 1, max_col)
+        for r in range(min_row - 1, max_row):
+            heatmap.setdefault(r, set()).update(merged_cols)
+
+    return heatmap
+
+
+def _create_value_heatmap(ws: Any) -> SparseHeatmap:
+    """
+    Như `_create_border_heatmap` nhưng ô "Đất" là ô CÓ GIÁ TRỊ (khác None và
+    khác chuỗi rỗng). Dải gộp có ô cha mang giá trị được tính là Đất cả dải
+    (header gộp nối liền các cột bên dưới nó).
+    """
+    heatmap: SparseHeatmap = {}
+
+    if isinstance(ws, SheetGrid):
+        values = ws.values
+        filled = ws.has_value().copy()
+        filled[filled] = np.fromiter((not (isinstance(v, str) and not v.strip()) for v in values[filled]),
+                                     dtype=bool, count=int(filled.sum()))
+        cells = zip(ws.rows[filled].tolist(), ws.cols[filled].tolist())
+    else:
+        cells = (coord for coord, cell in ws._cells.items()
+                 if cell.value is not None and not (isinstance(cell.value, str) and not cell.value.strip()))
+
+    for r, c in cells:
+        heatmap.setdefault(r - 1, set()).add(c - 1)
+
+    for merged_range in ws.merged_cells.ranges:
+        min_col, min_row, max_col, max_row = merged_range.bounds
+        if (min_col - 1) not in heatmap.get(min_row - 1, ()):
+            continue
+        merged_cols = range(min_col - 1, max_col)
+        for r in range(min_row - 1, max_row):
+            heatmap.setdefault(r, set()).update(merged_cols)
+
+    return heatmap
+
+# --- BƯỚC 3: TÌM "CỤM BORDER" (BFS) ---
+def _find_clusters(heatmap: SparseHeatmap, keep_cells: bool = False) -> List[Dict[str, Any]]:
+    """
+    Chạy thuật toán BFS (Breadth-First Search) trên heatmap
+    để tìm các "quần đảo" (cụm) các ô "Đất" liền kề nhau.
+    
+    Mỗi cụm chỉ giữ bounding box (cập nhật dần trong lúc BFS) và số ô,
+    không giữ danh sách tọa độ - bảng 1 triệu ô không tạo 1 triệu tuple.
+    
+    Duyệt theo thứ tự hàng rồi cột (giống bản đồ dày trước đây), nên thứ tự
+    cụm không đổi.
+    
+    Args:
+        keep_cells: (debug) Giữ thêm danh sách tọa độ của cụm trong key 'cells'
+                    (theo thứ tự BFS).
+    
+    Returns:
+        List các cụm, mỗi cụm là 1 dict (0-indexed):
+        {'min_r', 'max_r', 'min_c', 'max_c', 'size'[, 'cells']}
+    """
+    if not heatmap: 
+        return []
+    
+    visited = set()  # Set chứa các tọa độ (r, c) (0-indexed) đã ghé thăm
+    clusters = []    # List chứa các cụm
+    no_cols: Set[int] = set()
+
+    for r in sorted(heatmap):
+        for c in sorted(heatmap[r]):
+            # Nếu ô này là "Đất" và chưa được ghé thăm
+            if (r, c) not in visited:
+                
+                # Bắt đầu một cụm mới
+                min_r = max_r = r
+                min_c = max_c = c
+                size = 0
+                cells = [] if keep_cells else None
+                q = deque([(r, c)]) # Hàng đợi cho BFS
+                visited.add((r, c))
+
+                while q:
+                    curr_r, curr_c = q.popleft()
+                    # Cập nhật bounding box (0-indexed) của cụm
+                    size += 1
+                    if curr_r > max_r:
+                        max_r = curr_r
+                    elif curr_r < min_r:
+                        min_r = curr_r
+                    if curr_c > max_c:
+                        max_c = curr_c
+                    elif curr_c < min_c:
+                        min_c = curr_c
+                    if cells is not None:
+                        cells.append((curr_r, curr_c))
+
+                    # Kiểm tra 4 hướng lân cận (trên, dưới, trái, phải)
+                    for dr, dc in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
+                        nr, nc = curr_r + dr, curr_c + dc
+
+                        # Nếu ô lân cận là "Đất" và chưa ghé thăm
+                        # (ô ngoài sheet không bao giờ có trong map)
+                        if nc in heatmap.get(nr, no_cols) and (nr, nc) not in visited:
+                            visited.add((nr, nc))
+                            q.append((nr, nc))
+                
+                # Sau khi while kết thúc, thêm cụm mới vào danh sách
+                cluster = {'min_r': min_r, 'max_r': max_r,
+                           'min_c': min_c, 'max_c': max_c, 'size': size}
+                if cells is not None:
+                    cluster['cells'] = cells
+                clusters.append(cluster)
+                
+    return clusters
+
+def _row_runs(cols: Set[int]) -> List[Tuple[int, int]]:
+    """Mã hóa các cột có border của 1 hàng thành các đoạn liên tiếp [(đầu, cuối)]."""
+    runs = []
+    sorted_cols = sorted(cols)
+    start = prev = sorted_cols[0]
+    for c in sorted_cols[1:]:
+        if c != prev + 1:
+            runs.append((start, prev))
+            start = c
+        prev = c
+    runs.append((start, prev))
+    return runs
+
+
+def _find_clusters_scanline(heatmap: SparseHeatmap, keep_cells: bool = False) -> List[Dict[str, Any]]:
+    """
+    Engine "scanline" cho Bước 3: thay vì BFS từng ô, mỗi hàng được mã hóa
+    thành các đoạn (run) cột liên tiếp, rồi gộp (union-find) các đoạn chồng
+    cột với đoạn của hàng ngay trên. Mỗi đoạn chỉ được xét một lần, nên bảng
+    rộng nhanh hơn nhiều so với BFS.
+    
+    Kết quả (bounding box, số ô, thứ tự cụm) giống hệt `_find_clusters`.
+    Với `keep_cells=True`, 'cells' liệt kê theo thứ tự hàng rồi cột
+    (không phải thứ tự BFS).
+    """
+    if not heatmap:
+        return []
+
+    # runs[i] = (hàng, đầu, cuối), theo thứ tự hàng rồi cột
+    runs: List[Tuple[int, int, int]] = []
+    parent: List[int] = []
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i: int, j: int) -> None:
+        ri, rj = find(i), find(j)
+        if ri != rj:
+            # Gốc luôn là đoạn xuất hiện trước -> giữ thứ tự cụm như BFS
+            if ri < rj:
+                parent[rj] = ri
+            else:
+                parent[ri] = rj
+
+    prev_row = None
+    prev_first = prev_last = 0   # Chỉ số các đoạn của hàng trước trong `runs`
+    for r in sorted(heatmap):
+        cols = heatmap[r]
+        if not cols:
+            continue
+        first = len(runs)
+        adjacent = prev_row is not None and prev_row == r - 1
+        k = prev_first
+        for start, end in _row_runs(cols):
+            i = len(runs)
+            runs.append((r, start, end))
+            parent.append(i)
+            if not adjacent:
+                continue
+            # Hai con trỏ: bỏ qua các đoạn hàng trên nằm hẳn bên trái
+            while k < prev_last and runs[k][2] < start:
+                k += 1
+            j = k
+            while j < prev_last and runs[j][1] <= end:
+                union(i, j)
+                j += 1
+            # Đoạn cuối cùng chạm tới có thể còn chồng với đoạn kế tiếp
+            if j > k:
+                k = j - 1
+        prev_row, prev_first, prev_last = r, first, len(runs)
+
+    # Tổng hợp bounding box theo từng gốc (gốc = đoạn đầu tiên của cụm)
+    boxes: Dict[int, Dict[str, Any]] = {}
+    for i, (r, start, end) in enumerate(runs):
+        root = find(i)
+        box = boxes.get(root)
+        if box is None:
+            box = boxes[root] = {'min_r': r, 'max_r': r,
+                                 'min_c': start, 'max_c': end, 'size': 0}
+            if keep_cells:
+                box['cells'] = []
+        box['max_r'] = r
+        if start < box['min_c']:
+            box['min_c'] = start
+        if end > box['max_c']:
+            box['max_c'] = end
+        box['size'] += end - start + 1
+        if keep_cells:
+            box['cells'].extend((r, c) for c in range(start, end + 1))
+
+    return [boxes[root] for root in sorted(boxes)]
+
+
+# Các engine cho Bước 3 (chọn bằng tham số `engine` của `detect_tables`)
+_CLUSTER_ENGINES = {
+    "bfs": _find_clusters,
+    "scanline": _find_clusters_scanline,
+}
+ENGINES = tuple(_CLUSTER_ENGINES)
+
+def _merge_overlapping_clusters(clusters: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Gộp các cụm có bounding box chồng lên nhau (ví dụ một "đảo" ô nằm trong
+    lỗ trống của bảng) để mỗi ô chỉ thuộc một bảng. Thứ tự theo (min_r, min_c).
+    """
+    merged: List[Dict[str, Any]] = []
+    for cluster in sorted(clusters, key=lambda c: (c['min_r'], c['min_c'])):
+        box = dict(cluster)
+        absorbed = True
+        while absorbed:
+            absorbed = False
+            for other in merged:
+                if (other['min_r'] <= box['max_r'] and box['min_r'] <= other['max_r'] and
+                        other['min_c'] <= box['max_c'] and box['min_c'] <= other['max_c']):
+                    merged.remove(other)
+                    box = {'min_r': min(box['min_r'], other['min_r']), 'max_r': max(box['max_r'], other['max_r']),
+                           'min_c': min(box['min_c'], other['min_c']), 'max_c': max(box['max_c'], other['max_c']),
+                           'size': box['size'] + other['size']}
+                    absorbed = True
+                    break
+        merged.append(box)
+    return sorted(merged, key=lambda c: (c['min_r'], c['min_c']))
+
+# --- BƯỚC 4: LỌC CỤM & LẤY TỌA ĐỘ (BOUNDING BOX) ---
+def _filter_and_get_boundaries(clusters: List[Dict[str, Any]], 
+                               min_width: int = 5, 
+                               min_height: int = 3) -> List[Dict[str, int]]:
+    """
+    Lặp qua các cụm (bounding box từ Bước 3), lọc bỏ "nhiễu" (cụm quá nhỏ),
+    và trả về tọa độ của các "bảng" hợp lệ.
+    
+    Tọa độ trả về là 1-indexed (để khớp với Excel).
+    """
+    final_table_boundaries = []
+    
+    for cluster in clusters:
+        # Tọa độ min/max (0-indexed)
+        min_r, max_r = cluster['min_r'], cluster['max_r']
+        min_c, max_c = cluster['min_c'], cluster['max_c']
+        
+        # Tính toán kích thước
+        width = max_c - min_c + 1
+        height = max_r - min_r + 1
+        
+        # Áp dụng bộ lọc (heuristic)
+        if width >= min_width and height >= min_height:
+            
+            # Nếu đủ lớn, lưu lại tọa độ (chuyển về 1-indexed)
+            final_table_boundaries.append({
+                'min_row': min_r + 1,
+                'max_row': max_r + 1,
+                'min_col': min_c + 1,
+                'max_col': max_c + 1
+            })
+            
+    return final_table_boundaries
+
+# --- TẢI SHEET ---
+def load_worksheet(file_path: WorkbookSource, sheet_name: str,
+                   reader: str = "native",
+                   cache: bool = False,
+                   values_only: bool = False) -> Tuple[Any, Optional[openpyxl.Workbook]]:
+    """
+    Tải một sheet để phát hiện bảng / đọc border.
+    
+    Args:
+        file_path: Đường dẫn, bytes hoặc stream nhị phân của file Excel
+                   (không cần ghi ra file tạm).
+        reader: "native" - bộ đọc XML nhẹ (`xlsx_reader`), tự động fallback
+                sang openpyxl nếu file không đọc được.
+                "openpyxl" - luôn dùng openpyxl.
+        cache: Chỉ với bộ đọc native - lưu/đọc lưới ô trong `.ctc_cache/`
+               cạnh workbook (`grid_cache`), chạy lại không phải parse XML.
+        values_only: Chỉ với bộ đọc native và khi không dùng cache - không đọc
+                     border, chỉ giữ các ô có giá trị (chế độ "values").
+    
+    Returns:
+        (worksheet, workbook). `workbook` là None với bộ đọc native,
+        ngược lại người gọi cần `workbook.close()`.
+    
+    Raises:
+        KeyError: Không tìm thấy sheet.
+    """
+    file_path = as_seekable(file_path)
+    if reader == "native":
+        try:
+            if cache:
+                return load_cached_sheet(file_path, sheet_name), None
+            return read_sheet(file_path, sheet_name, values_only=values_only), None
+        except KeyError:
+            raise
+        except Exception as e:
+            print(f"⚠ Bộ đọc native không đọc được file ({e}). Chuyển sang openpyxl...")
+    
+    import openpyxl
+    
+    # data_only=True để đọc giá trị (nếu cần), không phải công thức
+    wb = openpyxl.load_workbook(rewind(file_path), data_only=True)
+    if sheet_name not in wb.sheetnames:
+        wb.close()
+        raise KeyError(f"Không tìm thấy sheet '{sheet_name}' trong file.")
+    return wb[sheet_name], wb
+
+
+# --- HÀM TỔNG HỢP (MAIN FUNCTION) ---
+def detect_tables_in_worksheet(ws: Any,
+                               min_width: int = 5,
+                               min_height: int = 3,
+                               merged_map: Optional[Dict[Tuple[int, int], Tuple[int, int]]] = None,
+                               engine: str = "bfs",
+                               structured: bool = False
+                               ) -> List[Dict[str, int]]:
+    """
+    Chạy 4 bước của Giai đoạn 1 trên một worksheet ĐÃ TẢI
+    (`SheetGrid` hoặc openpyxl Worksheet), để pipeline chỉ tải sheet một lần.
+    
+    Args:
+        merged_map: Bản đồ ô gộp đã tạo sẵn (nếu có) để không phải tạo lại.
+        engine: Thuật toán tìm cụm ở Bước 3 - "bfs" (mặc định) hoặc "scanline".
+        structured: (Bước 0, mặc định tắt) Lấy thẳng các Excel Table / defined
+                    name của sheet làm bảng; heatmap + tìm cụm chỉ chạy cho phần
+                    còn lại (bỏ qua hẳn nếu không còn ô có border nào bên ngoài).
+                    Chỉ bật khi các tên trong file đúng là từng bảng: một named
+                    range phủ nhiều bảng có border sẽ thay cho các bảng đó.
+    
+    Returns:
+        Các bảng từ Bước 0 trước (theo vị trí: hàng rồi cột), rồi tới các bảng theo border.
+    """
+    if engine not in _CLUSTER_ENGINES:
+        raise ValueError(f"engine không hợp lệ: {engine!r} (chọn một trong {list(_CLUSTER_ENGINES)})")
+    find_clusters = _CLUSTER_ENGINES[engine]
+    
+    # --- Chạy 4 bước của Giai đoạn 1 ---
+    
+    # Bước 0:
+    known_boxes: List[Box] = []
+    if structured:
+        known_boxes = _structured_boxes(ws, min_width, min_height)
+        if known_boxes:
+            print(f"Bước 0: Tìm thấy {len(known_boxes)} bảng từ Excel Table / defined name.")
+    known = [{'min_row': min_row, 'max_row': max_row, 'min_col': min_col, 'max_col': max_col}
+             for min_col, min_row, max_col, max_row in known_boxes]
+    
+    # Bước 1:
+    print(f"Bước 1: Đang tạo bản đồ ô gộp...")
+    if merged_map is None:
+        merged_map = _create_merged_cell_map(ws)
+    print(f"Bước 1: Hoàn thành. Tìm thấy {len(merged_map)} ô con trong các ô gộp.")
+    
+    # Bước 2:
+    print(f"Bước 2: Đang tạo bản đồ nhiệt border (có xử lý ô gộp)...")
+    heatmap = _create_border_heatmap(ws, merged_map, exclude=known_boxes)
+    print("Bước 2: Hoàn thành.")
+    if not heatmap and known:
+        print("Bước 3-4: Bỏ qua - các bảng khai báo sẵn đã phủ hết vùng có border.")
+        return known
+    
+    # Bước 3:
+    print(f"Bước 3: Đang tìm các cụm border (engine={engine})...")
+    clusters = find_clusters(heatmap)
+    print(f"Bước 3: Hoàn thành. Tìm thấy {len(clusters)} cụm.")
+    
+    # Bước 4:
+    print(f"Bước 4: Đang lọc cụm và lấy tọa độ (min_width={min_width}, min_height={min_height})...")
+    boundaries = _filter_and_get_boundaries(clusters, min_width, min_height)
+    print(f"Bước 4: Hoàn thành. Tìm thấy {len(boundaries)} bảng hợp lệ.")
+    return known + boundaries
+
+
+def detect_value_blocks_in_worksheet(ws: Any,
+                                     min_width: int = 2,
+                                     min_height: int = 2,
+                                     engine: str = "scanline"
+                                     ) -> List[Dict[str, int]]:
+    """
+    Chế độ "values" của Giai đoạn 1: bảng là khối các ô CÓ GIÁ TRỊ liền kề nhau
+    (ngăn cách bằng hàng/cột trống), không cần border.
+    
+    Dùng chung Bước 3-4 với chế độ border; các khối có bounding box chồng nhau
+    được gộp lại. `ws` thường được tải bằng `load_worksheet(..., values_only=True)`.
+    
+    Args:
+        engine: Thuật toán tìm cụm - mặc định "scanline" (lưới giá trị thường dày).
+    
+    Returns:
+        Tọa độ 1-indexed của các bảng, như `detect_tables_in_worksheet`.
+    """
+    if engine not in _CLUSTER_ENGINES:
+        raise ValueError(f"engine không hợp lệ: {engine!r} (chọn một trong {list(_CLUSTER_ENGINES)})")
+    
+    print(f"Bước 2: Đang tạo bản đồ ô có giá trị...")
+    heatmap = _create_value_heatmap(ws)
+    print("Bước 2: Hoàn thành.")
+    
+    print(f"Bước 3: Đang tìm các khối giá trị (engine={engine})...")
+    clusters = _merge_overlapping_clusters(_CLUSTER_ENGINES[engine](heatmap))
+    print(f"Bước 3: Hoàn thành. Tìm thấy {len(clusters)} khối.")
+    
+    print(f"Bước 4: Đang lọc khối và lấy tọa độ (min_width={min_width}, min_height={min_height})...")
+    boundaries = _filter_and_get_boundaries(clusters, min_width, min_height)
+    print(f"Bước 4: Hoàn thành. Tìm thấy {len(boundaries)} bảng hợp lệ.")
+    return boundaries
+
+
+# Chế độ phát hiện bảng của pipeline: theo border (mặc định) hoặc theo khối giá trị
+DETECTION_MODES = ("borders", "values")
+
+
+def detect_tables(file_path: WorkbookSource, sheet_name: str, 
+                  min_width: int = 5, 
+                  min_height: int = 3,
+                  reader: str = "native",
+                  cache: bool = False,
+                  engine: str = "bfs",
+                  structured: bool = False) -> List[Dict[str, int]]:
+    """
+    Phát hiện tất cả các "bảng" (được định nghĩa bằng border)
+    trong một sheet Excel.
+    
+    Args:
+        file_path: Đường dẫn đến file Excel (hoặc bytes / stream nhị phân).
+        sheet_name: Tên sheet cần xử lý.
+        min_width: Chiều rộng tối thiểu để coi là 1 bảng (ý tưởng "line > 5").
+        min_height: Chiều cao tối thiểu để coi là 1 bảng.
+        reader: "native" (mặc định, fallback openpyxl) hoặc "openpyxl".
+        cache: Dùng cache lưới ô trên đĩa (xem `load_worksheet`).
+        engine: Thuật toán tìm cụm - "bfs" (mặc định) hoặc "scanline"
+                (gộp các đoạn cột theo hàng, nhanh hơn với bảng rộng).
+        structured: Dùng Excel Table / defined name của sheet làm bảng có sẵn
+                    (xem `detect_tables_in_worksheet`).
+        
+    Returns:
+        Một list các dict, mỗi dict chứa tọa độ 1-indexed của bảng.
+        Ví dụ: [{'min_row': 2, 'max_row': 12, 'min_col': 1, 'max_col': 26}]
+    """
+    try:
+        ws, wb = load_worksheet(file_path, sheet_name, reader, cache)
+    except KeyError:
+        print(f"Lỗi: Không tìm thấy sheet '{sheet_name}' trong file.")
+        return []
+    except Exception as e:
+        print(f"Lỗi khi tải file hoặc sheet: {e}")
+        return []
+
+    try:
+        boundaries = detect_tables_in_worksheet(ws, min_width, min_height, engine=engine,
+                                                structured=structured)
+    finally:
+        if wb is not None:
+            wb.close()
+    return boundaries
+
+
+
+
+
+
+
+def debug_extract_data(file_path: WorkbookSource, sheet_name: str, 
+                       boundary: Dict[str, int],
+                       worksheet: Optional[Any] = None) -> pd.DataFrame:
+    """
+    Đọc và trả về dữ liệu thô (raw data) từ BÊN TRONG một tọa độ (boundary)
+    đã được phát hiện, dùng cho mục đích kiểm tra (debug).
+    
+    Tọa độ boundary nhận vào là 1-indexed.
+    
+    Nếu truyền `worksheet` là `SheetGrid` (từ `load_worksheet`), giá trị được
+    lấy trực tiếp từ grid đã đọc thay vì đọc lại file bằng `pd.read_excel`.
+    
+    `file_path` có thể là đường dẫn, bytes hoặc stream nhị phân.
+    """
+    import pandas as pd
+    
+    # 1. Chuyển đổi tọa độ 1-indexed (từ detect_tables) 
+    #    sang 0-indexed (cho pandas)
+    
+    # Hàng 3 (1-indexed) -> skiprows=2 (bỏ qua hàng 0, 1)
+    skip_rows = boundary['min_row'] - 1
+    
+    # Số hàng cần đọc
+    num_rows = boundary['max_row'] - boundary['min_row'] + 1
+    
+    # Cột 1 (1-indexed) -> cột 0 (0-indexed)
+    # Cột 26 (1-indexed) -> cột 25 (0-indexed)
+    # Chúng ta cần list [0, 1, ..., 25]
+    cols_to_use = list(range(
+        boundary['min_col'] - 1,  # (1-1) = 0
+        boundary['max_col']       # (26) -> range() sẽ dừng ở 25
+    ))
+    
+    if not cols_to_use:
+        print("Lỗi: Không có cột nào để đọc.")
+        return pd.DataFrame()
+
+    # 2. Đọc file Excel chỉ trong phạm vi đã định
+    try:
+        if isinstance(worksheet, SheetGrid):
+            raw_table_df = worksheet.table_frame(boundary)
+            raw_table_df.columns = range(raw_table_df.shape[1])
+            return raw_table_df
+        
+        raw_table_df = pd.read_excel(
+            rewind(as_seekable(file_path)),
+            sheet_name=sheet_name,
+            header=None,        # Không giả định header, đọc thô
+            skiprows=skip_rows,   # Bỏ qua các hàng bên trên
+            nrows=num_rows,     # Chỉ đọc số hàng của bảng
+            usecols=cols_to_use   # Chỉ đọc các cột của bảng
+        )
+        
+        # Đặt lại index cột để dễ nhìn (0, 1, 2...)
+        raw_table_df.columns = range(raw_table_df.shape[1])
+        
+        return raw_table_df
+        
+    except Exception as e:
+        print(f"Lỗi khi trích xuất dữ liệu debug: {e}")
+        return pd.DataFrame()
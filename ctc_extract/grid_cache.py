@@ -0,0 +1,353 @@
+"""
+Cache trên đĩa cho `SheetGrid` (kết quả của bộ đọc native).
+
+Khi chạy lại nhiều lần trên cùng một workbook (ví dụ để chỉnh `border_threshold`,
+`min_width`/`min_height`), không cần giải nén và parse lại XML: mảng toạ độ,
+style index, giá trị đã mã hoá và dải ô gộp được lưu thành các file `.npy`
+cạnh workbook và mở lại bằng memory-map (các process dùng chung page cache).
+
+Bố cục:
+    <thư mục workbook>/.ctc_cache/<tên workbook>/<khoá sheet>/
+        meta.json        - mtime_ns, size, sha1 của file nguồn, tên sheet,
+                           Excel Table / defined name của sheet
+        rows.npy, cols.npy, style_ids.npy, kinds.npy, numbers.npy, codes.npy, merged.npy
+        objects.json     - bảng chuỗi / giá trị không phải số (dictionary encoding)
+        styles.json      - `SheetStyles` của workbook
+
+Không có file pickle nào: cache nằm cạnh workbook, ai ghi được vào `.ctc_cache/`
+cũng sửa được nó - đọc cache chỉ được trả về dữ liệu, không được chạy mã.
+
+Cache hợp lệ khi mtime + size khớp; nếu chỉ mtime đổi (file được copy/touch)
+thì so sánh sha1 nội dung trước khi đọc lại.
+
+Nguồn là bytes / stream (không có đường dẫn) chỉ được cache khi truyền
+`cache_dir`; khi đó khoá là sha1 của nội dung: `<cache_dir>/<sha1>/<khoá sheet>/`.
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .xlsx_reader import (BorderSide, CellBorder, CellError, SheetGrid, SheetStyles, WorkbookSource,
+                          as_seekable, is_path, read_sheet, rewind)
+
+
+CACHE_DIR_NAME = ".ctc_cache"
+CACHE_VERSION = 3
+
+# Mã loại giá trị trong kinds.npy
+_KIND_NONE = 0
+_KIND_INT = 1      # numbers.npy (int an toàn trong float64)
+_KIND_FLOAT = 2    # numbers.npy
+_KIND_BOOL = 3     # numbers.npy (0/1)
+_KIND_OBJECT = 4   # codes.npy -> objects.json (chuỗi, ngày tháng, lỗi, int lớn...)
+
+_MAX_EXACT_INT = 2 ** 53
+
+_ARRAY_NAMES = ("rows", "cols", "style_ids", "kinds", "numbers", "codes", "merged")
+
+
+def default_cache_dir(file_path: str) -> str:
+    """Thư mục cache mặc định của một workbook: cạnh file, trong `.ctc_cache/`."""
+    directory, name = os.path.split(os.path.abspath(file_path))
+    return os.path.join(directory, CACHE_DIR_NAME, name)
+
+
+def _sheet_key(sheet_name: str) -> str:
+    return hashlib.sha1(sheet_name.encode("utf-8")).hexdigest()[:16]
+
+
+def _stream_sha1(f) -> str:
+    digest = hashlib.sha1()
+    for block in iter(lambda: f.read(1 << 20), b""):
+        digest.update(block)
+    return digest.hexdigest()
+
+
+def _file_sha1(file_path: str) -> str:
+    with open(file_path, "rb") as f:
+        return _stream_sha1(f)
+
+
+# ======================================================================
+# MÃ HOÁ / GIẢI MÃ GIÁ TRỊ
+# ======================================================================
+
+def _encode_values(values: np.ndarray) -> Dict[str, Any]:
+    """
+    Tách mảng giá trị (object) thành các mảng kiểu cố định để memory-map được.
+    Chuỗi và các giá trị khác được dictionary-encode vào `objects`.
+    """
+    n = len(values)
+    kinds = np.zeros(n, dtype=np.int8)
+    numbers = np.zeros(n, dtype=np.float64)
+    codes = np.full(n, -1, dtype=np.int32)
+    objects: List[Any] = []
+    object_codes: Dict[Any, int] = {}
+
+    for i, value in enumerate(values.tolist()):
+        if value is None:
+            continue
+        value_type = type(value)
+        if value_type is bool:
+            kinds[i] = _KIND_BOOL
+            numbers[i] = value
+        elif value_type is int and -_MAX_EXACT_INT <= value <= _MAX_EXACT_INT:
+            kinds[i] = _KIND_INT
+            numbers[i] = value
+        elif value_type is float:
+            kinds[i] = _KIND_FLOAT
+            numbers[i] = value
+        else:
+            key = (value_type, value)
+            code = object_codes.get(key)
+            if code is None:
+                code = object_codes[key] = len(objects)
+                objects.append(value)
+            kinds[i] = _KIND_OBJECT
+            codes[i] = code
+
+    return {"kinds": kinds, "numbers": numbers, "codes": codes, "objects": objects}
+
+
+def _decode_values(kinds: np.ndarray, numbers: np.ndarray,
+                   codes: np.ndarray, objects: List[Any]) -> np.ndarray:
+    """Dựng lại mảng giá trị (object) - vector hoá theo từng loại."""
+    values = np.full(len(kinds), None, dtype=object)
+
+    is_int = kinds == _KIND_INT
+    values[is_int] = numbers[is_int].astype(np.int64)
+    is_float = kinds == _KIND_FLOAT
+    values[is_float] = numbers[is_float].astype(object)
+    is_bool = kinds == _KIND_BOOL
+    values[is_bool] = numbers[is_bool].astype(bool)
+    is_object = kinds == _KIND_OBJECT
+    if is_object.any():
+        object_array = np.empty(len(objects), dtype=object)
+        object_array[:] = objects
+        values[is_object] = object_array[codes[is_object]]
+    return values
+
+
+def value_to_json(value: Any) -> Any:
+    """
+    Một giá trị ô -> giá trị JSON. str / int / float / bool / None giữ nguyên;
+    lỗi, ngày giờ, khoảng thời gian thành {"loại": dữ liệu} (ô không bao giờ
+    chứa dict nên không nhầm lẫn). Ngược lại: `value_from_json`.
+    """
+    value_type = type(value)
+    if value is None or value_type in (str, int, float, bool):
+        return value
+    if isinstance(value, np.generic):
+        return value_to_json(value.item())
+    if value_type is CellError:
+        return {"error": str(value)}
+    if isinstance(value, datetime.datetime):
+        # pd.Timestamp -> datetime (isoformat của Timestamp có thể có nano giây)
+        if hasattr(value, "to_pydatetime"):
+            value = value.to_pydatetime()
+        return {"datetime": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"date": value.isoformat()}
+    if isinstance(value, datetime.time):
+        return {"time": value.isoformat()}
+    if isinstance(value, datetime.timedelta):
+        return {"timedelta": [value.days, value.seconds, value.microseconds]}
+    raise TypeError(f"Không lưu được giá trị kiểu {value_type.__name__} dưới dạng JSON")
+
+
+def value_from_json(value: Any) -> Any:
+    if not isinstance(value, dict):
+        return value
+    (kind, data), = value.items()
+    if kind == "error":
+        return CellError(data)
+    if kind == "datetime":
+        return datetime.datetime.fromisoformat(data)
+    if kind == "date":
+        return datetime.date.fromisoformat(data)
+    if kind == "time":
+        return datetime.time.fromisoformat(data)
+    if kind == "timedelta":
+        return datetime.timedelta(*data)
+    raise ValueError(f"Loại giá trị không hợp lệ: {kind!r}")
+
+
+def _styles_to_json(styles: SheetStyles) -> Dict[str, Any]:
+    return {
+        "borders": [[side.style for side in border] for border in styles.borders],
+        "date_styles": sorted(styles.date_styles),
+        "timedelta_styles": sorted(styles.timedelta_styles),
+    }
+
+
+def _styles_from_json(data: Dict[str, Any]) -> SheetStyles:
+    borders = [CellBorder(*(BorderSide(style) for style in sides)) for sides in data["borders"]]
+    return SheetStyles(
+        borders=borders,
+        has_border=np.array([b.has_any for b in borders], dtype=bool),
+        date_styles=frozenset(data["date_styles"]),
+        timedelta_styles=frozenset(data["timedelta_styles"]),
+    )
+
+
+# ======================================================================
+# ĐỌC / GHI CACHE
+# ======================================================================
+
+def _read_meta(meta_path: str) -> Optional[Dict[str, Any]]:
+    """meta.json của một entry, None nếu thiếu / hỏng / khác phiên bản."""
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("version") == CACHE_VERSION else None
+
+
+def _cache_is_valid(meta_path: str, file_path: str, stat: os.stat_result) -> bool:
+    meta = _read_meta(meta_path)
+    if meta is None:
+        return False
+    if meta.get("mtime_ns") == stat.st_mtime_ns and meta.get("size") == stat.st_size:
+        return True
+    if meta.get("size") != stat.st_size:
+        return False
+
+    # mtime đổi nhưng nội dung có thể giống hệt (copy, touch) -> so sha1
+    if meta.get("sha1") != _file_sha1(file_path):
+        return False
+    meta["mtime_ns"] = stat.st_mtime_ns
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    return True
+
+
+def _write_cache(entry_dir: str, grid: SheetGrid, source_meta: Dict[str, Any]) -> None:
+    parent = os.path.dirname(entry_dir)
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=".tmp-", dir=parent)
+    try:
+        encoded = _encode_values(grid.values)
+        arrays = {
+            "rows": np.asarray(grid.rows, dtype=np.int32),
+            "cols": np.asarray(grid.cols, dtype=np.int32),
+            "style_ids": np.asarray(grid.style_ids, dtype=np.int32),
+            "kinds": encoded["kinds"],
+            "numbers": encoded["numbers"],
+            "codes": encoded["codes"],
+            "merged": np.asarray([r.bounds for r in grid.merged_cells.ranges],
+                                 dtype=np.int32).reshape(-1, 4),
+        }
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_dir, name + ".npy"), array)
+        with open(os.path.join(tmp_dir, "objects.json"), "w", encoding="utf-8") as f:
+            json.dump([value_to_json(value) for value in encoded["objects"]], f, ensure_ascii=False)
+        with open(os.path.join(tmp_dir, "styles.json"), "w", encoding="utf-8") as f:
+            json.dump(_styles_to_json(grid.styles), f)
+
+        meta = {
+            "version": CACHE_VERSION,
+            "sheet": grid.title,
+            "cells": len(grid),
+            "tables": grid.tables,
+            "defined_ranges": grid.defined_ranges,
+            **source_meta,
+        }
+        # meta.json ghi cuối cùng: thiếu meta = cache chưa hoàn chỉnh
+        with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+        if os.path.isdir(entry_dir):
+            shutil.rmtree(entry_dir, ignore_errors=True)
+        os.replace(tmp_dir, entry_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+def _read_cache(entry_dir: str, sheet_name: str) -> SheetGrid:
+    arrays = {name: np.load(os.path.join(entry_dir, name + ".npy"), mmap_mode="r", allow_pickle=False)
+              for name in _ARRAY_NAMES}
+    with open(os.path.join(entry_dir, "objects.json"), "r", encoding="utf-8") as f:
+        objects = [value_from_json(value) for value in json.load(f)]
+    with open(os.path.join(entry_dir, "styles.json"), "r", encoding="utf-8") as f:
+        styles = _styles_from_json(json.load(f))
+    with open(os.path.join(entry_dir, "meta.json"), "r", encoding="utf-8") as f:
+        meta = json.load(f)
+
+    values = _decode_values(arrays["kinds"], arrays["numbers"], arrays["codes"], objects)
+    return SheetGrid(
+        title=sheet_name,
+        rows=arrays["rows"],
+        cols=arrays["cols"],
+        style_ids=arrays["style_ids"],
+        values=values,
+        merged_ranges=[tuple(b) for b in arrays["merged"].tolist()],
+        styles=styles,
+        tables=meta.get("tables"),
+        defined_ranges=[tuple(r) for r in meta.get("defined_ranges", [])],
+    )
+
+
+def load_sheet(source: WorkbookSource, sheet_name: str, cache_dir: Optional[str] = None) -> SheetGrid:
+    """
+    Đọc một sheet qua cache: lần đầu parse bằng `read_sheet` rồi lưu cache,
+    các lần sau mở các mảng bằng memory-map.
+
+    Args:
+        source: Đường dẫn, bytes hoặc stream nhị phân.
+        cache_dir: Thư mục cache của workbook (mặc định `default_cache_dir`).
+                   Bắt buộc để cache nguồn không phải đường dẫn.
+    """
+    if not is_path(source):
+        return _load_sheet_from_stream(as_seekable(source), sheet_name, cache_dir)
+
+    file_path = source
+    stat = os.stat(file_path)
+    entry_dir = os.path.join(cache_dir or default_cache_dir(file_path), _sheet_key(sheet_name))
+    meta_path = os.path.join(entry_dir, "meta.json")
+
+    if _cache_is_valid(meta_path, file_path, stat):
+        try:
+            return _read_cache(entry_dir, sheet_name)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"⚠ Cache hỏng ({e}), đọc lại file...")
+
+    grid = read_sheet(file_path, sheet_name)
+    try:
+        _write_cache(entry_dir, grid, {"source": os.path.abspath(file_path),
+                                       "mtime_ns": stat.st_mtime_ns,
+                                       "size": stat.st_size,
+                                       "sha1": _file_sha1(file_path)})
+    except OSError as e:
+        # Không ghi được cache (thư mục chỉ đọc...) -> vẫn trả kết quả
+        print(f"⚠ Không ghi được cache: {e}")
+    return grid
+
+
+def _load_sheet_from_stream(stream, sheet_name: str, cache_dir: Optional[str]) -> SheetGrid:
+    """Nguồn bytes / stream: khoá cache theo sha1 nội dung (chỉ khi có `cache_dir`)."""
+    if cache_dir is None:
+        return read_sheet(stream, sheet_name)
+
+    sha1 = _stream_sha1(rewind(stream))
+    entry_dir = os.path.join(cache_dir, sha1, _sheet_key(sheet_name))
+    if _read_meta(os.path.join(entry_dir, "meta.json")) is not None:
+        try:
+            return _read_cache(entry_dir, sheet_name)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"⚠ Cache hỏng ({e}), đọc lại file...")
+
+    grid = read_sheet(stream, sheet_name)
+    try:
+        _write_cache(entry_dir, grid, {"sha1": sha1})
+    except OSError as e:
+        print(f"⚠ Không ghi được cache: {e}")
+    return grid
@@ -0,0 +1,415 @@
+"""
+Tách header/data của một bảng theo đường kẻ ngang (border) - các chiến lược
+(strategy) có thể thay thế nhau, chọn bằng tên khi chạy:
+
+    "edges"             - (mặc định) ranh giới giữa 2 hàng: border.bottom hàng trên
+                          HOẶC border.top hàng dưới, bỏ qua ranh giới bên trong ô gộp.
+                          Lấy ranh giới ĐẦU TIÊN đạt threshold (giữ nguyên như bản gốc).
+    "top_border"        - chỉ xét border.top của từng hàng (bản trong helper/test_copy.py).
+    "edges_vectorized"  - như "edges", tính bằng numpy trên mảng style của `SheetGrid`.
+    "top_border_vectorized" - như "top_border", bằng numpy.
+    "numeric_density"   - không dùng style: hàng data đầu tiên là hàng có > 30% số ô
+                          là số (giống `DynamicExcelParser`); dùng cho chế độ "values".
+
+Biến thể vectorized chỉ áp dụng cho `SheetGrid` (bộ đọc native); với worksheet
+openpyxl chúng tự chuyển sang bản quét từng ô tương ứng.
+
+Thêm chiến lược mới:
+
+    @register_header_split_strategy("ten_moi")
+    def _split_moi(raw_table_df, worksheet, boundary, merged_map, border_threshold) -> int:
+        ...   # trả về index hàng DATA đầu tiên, -1 nếu không tìm thấy
+"""
+
+import datetime
+from typing import TYPE_CHECKING, Callable, Dict, List, Tuple
+
+import numpy as np
+
+from .xlsx_reader import SheetGrid
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from openpyxl.worksheet.worksheet import Worksheet
+
+
+HeaderSplitStrategy = Callable[..., int]
+
+HEADER_SPLIT_STRATEGIES: Dict[str, HeaderSplitStrategy] = {}
+DEFAULT_HEADER_STRATEGY = "edges"
+
+
+def register_header_split_strategy(name: str) -> Callable[[HeaderSplitStrategy], HeaderSplitStrategy]:
+    """Decorator: đăng ký một chiến lược tách header dưới tên `name`."""
+    def decorator(func: HeaderSplitStrategy) -> HeaderSplitStrategy:
+        HEADER_SPLIT_STRATEGIES[name] = func
+        return func
+    return decorator
+
+
+def detect_header_split_point(
+    raw_table_df: "pd.DataFrame", 
+    worksheet: "Worksheet",
+    boundary: Dict[str, int],
+    merged_map: Dict[Tuple[int, int], Tuple[int, int]],
+    border_threshold: float = 0.95,
+    strategy: str = DEFAULT_HEADER_STRATEGY
+) -> int:
+    """
+    Tìm ranh giới header/data của bảng `boundary` bằng chiến lược `strategy`.
+    
+    Returns:
+        Index (0-based, trong `raw_table_df`) của hàng DATA đầu tiên.
+        Trả về -1 nếu không tìm thấy.
+    
+    Raises:
+        ValueError: Tên chiến lược không có trong `HEADER_SPLIT_STRATEGIES`.
+    """
+    split = HEADER_SPLIT_STRATEGIES.get(strategy)
+    if split is None:
+        raise ValueError(f"strategy không hợp lệ: {strategy!r} "
+                         f"(chọn một trong {sorted(HEADER_SPLIT_STRATEGIES)})")
+    
+    if not 0 <= border_threshold <= 1:
+        print(f"⚠ CẢNH BÁO: border_threshold phải từ 0.0 đến 1.0, nhận được: {border_threshold}")
+        border_threshold = max(0.0, min(1.0, border_threshold))
+    
+    return split(raw_table_df, worksheet, boundary, merged_map, border_threshold)
+
+
+# ======================================================================
+# QUÉT TỪNG Ô (mọi loại worksheet)
+# ======================================================================
+
+@register_header_split_strategy("edges")
+def _split_by_edges(
+    raw_table_df: "pd.DataFrame", 
+    worksheet: "Worksheet",
+    boundary: Dict[str, int],
+    merged_map: Dict[Tuple[int, int], Tuple[int, int]],
+    border_threshold: float = 0.95
+) -> int:
+    """
+    (Phiên bản V3 - ĐÃ SỬA BUG Ô GỘP)
+    Phát hiện header bằng cách quét "KHÔNG GIAN" (ranh giới) giữa các hàng.
+    
+    Logic:
+    1. Quét từng "ranh giới" (N-1 ranh giới cho N hàng).
+    2. Nếu ranh giới NẰM BÊN TRONG một ô gộp, bỏ qua (coi như không có border).
+    3. Nếu là ranh giới THỰC SỰ, kiểm tra CẢ hai "bờ":
+       - `border.bottom` (kẻ dưới) của HÀNG TRÊN.
+       - `border.top` (kẻ trên) của HÀNG DƯỚI.
+    4. Dừng ở ranh giới "ỨNG VIÊN" ĐẦU TIÊN thỏa mãn threshold: header là
+       các hàng phía trên nó.
+    
+    Lưu ý: bản gốc (V3) ghi "ứng viên cuối cùng" nhưng luôn trả về ngay ứng
+    viên đầu tiên. Hành vi này được GIỮ NGUYÊN có chủ ý để đầu ra JSON không
+    đổi so với các bản trước (bảng có đường kẻ giữa các hàng dữ liệu sẽ bị
+    tách sai nếu lấy ứng viên cuối). Cần ứng viên khác -> đăng ký chiến lược
+    mới thay vì sửa chiến lược này.
+    """
+    
+    total_columns = raw_table_df.shape[1]
+    if total_columns == 0:
+        return -1
+
+    total_rows = raw_table_df.shape[0]
+    if total_rows <= 1:
+        return -1
+
+    print(f"\n[detect_header_split_point] Quét {total_rows - 1} ranh giới, {total_columns} cột")
+    print(f"  Threshold: {border_threshold} ({border_threshold*100:.1f}%)")
+    print(f"  Số cells tối thiểu: {int(border_threshold * total_columns)}/{total_columns}\n")
+
+    last_split_row_idx = -1 
+    
+    # Quét N-1 ranh giới
+    for r_idx in range(total_rows - 1):
+        
+        real_row_above = boundary['min_row'] + r_idx
+        real_row_below = boundary['min_row'] + r_idx + 1
+        
+        horizontal_count = 0
+        
+        # Quét từ trái qua phải
+        for c_idx in range(boundary['min_col'], boundary['max_col'] + 1):
+            
+            # 1. Tìm "ô cha" (ô chứa style) cho cả hai
+            coord_above = (real_row_above, c_idx)
+            style_coord_above = merged_map.get(coord_above, coord_above)
+            
+            coord_below = (real_row_below, c_idx)
+            style_coord_below = merged_map.get(coord_below, coord_below)
+            
+            has_bottom_border = False
+            has_top_border = False
+
+            # --- (PHẦN SỬA LỖI LOGIC QUAN TRỌNG) ---
+            if style_coord_above == style_coord_below:
+                # Nếu "ô cha" của cả hai LÀ MỘT
+                # (Ví dụ: A3 và A4 cùng có cha là A3)
+                # -> Đây là ranh giới "ảo" BÊN TRONG một ô gộp.
+                # -> Bỏ qua, coi như không có border.
+                pass
+            else:
+                # Đây là ranh giới THỰC SỰ giữa hai ô/khối gộp khác nhau
+                # (Ví dụ: ranh giới giữa A6 [cha là A3] và A7 [cha là A7])
+                
+                # Kiểm tra border.bottom của khối BÊN TRÊN
+                cell_above = worksheet.cell(row=style_coord_above[0], column=style_coord_above[1])
+                if cell_above.border.bottom and cell_above.border.bottom.style and cell_above.border.bottom.style != 'none':
+                    has_bottom_border = True
+                    
+                # Kiểm tra border.top của khối BÊN DƯỚI
+                cell_below = worksheet.cell(row=style_coord_below[0], column=style_coord_below[1])
+                if cell_below.border.top and cell_below.border.top.style and cell_below.border.top.style != 'none':
+                    has_top_border = True
+            
+            # --- (Điều kiện HOẶC) ---
+            if has_bottom_border or has_top_border:
+                horizontal_count += 1
+        
+        # --- (Logic báo cáo và ghi sổ) ---
+        border_rate = horizontal_count / total_columns
+        
+        status = ""
+        if border_rate >= border_threshold:
+            last_split_row_idx = r_idx 
+            status = " ✓ ỨNG VIÊN"
+        
+        print(f"  Ranh giới {r_idx:2d} (giữa Excel {real_row_above:2d} & {real_row_below:2d}): "
+              f"{horizontal_count:2d}/{total_columns:2d} = "
+              f"{border_rate:5.1%}{status}")
+    
+        # --- (Logic kết luận: dừng ở ứng viên đầu tiên - xem docstring) ---
+        if last_split_row_idx != -1:
+            data_start_row_idx = last_split_row_idx + 1
+            
+            print(f"\n✓ Ranh giới ĐẦU TIÊN tìm thấy tại index hàng header: {last_split_row_idx}")
+            print(f"  Header: 0-{last_split_row_idx}, Data: {data_start_row_idx}+")
+            return data_start_row_idx 
+    
+    # Thêm một cảnh báo hữu ích
+    if border_threshold >= 1.0:
+        print(f"\n✗ Không tìm thấy ranh giới nào >= {border_threshold*100:.0f}%.")
+        print("  GỢI Ý: Threshold 100% rất nhạy cảm. Hãy thử hạ xuống 0.95 (95%).")
+    else:
+        print(f"\n✗ Không tìm thấy ranh giới nào >= {border_threshold*100:.0f}%.")
+        
+    return -1
+
+
+@register_header_split_strategy("top_border")
+def _split_by_top_border(
+    raw_table_df: "pd.DataFrame", 
+    worksheet: "Worksheet",
+    boundary: Dict[str, int],
+    merged_map: Dict[Tuple[int, int], Tuple[int, int]],
+    border_threshold: float = 0.95
+) -> int:
+    """
+    Phát hiện header bằng cách tìm đường kẻ ngang (border.top) kéo dài suốt bảng
+    (thuật toán của helper/test_copy.py).
+    
+    Logic:
+    1. Bỏ qua hàng đầu tiên (viền trên của table)
+    2. Quét các hàng, hàng ĐẦU TIÊN có kẻ trên >= threshold là ranh giới
+    3. Hàng đó là hàng data đầu tiên
+    
+    Ô gộp được xử lý như openpyxl: ô con ở hàng đầu của dải gộp mang kẻ trên
+    của ô cha, các ô con bên dưới không có kẻ trên (nhờ vậy `SheetGrid` và
+    worksheet openpyxl cho cùng kết quả).
+    """
+    total_columns = raw_table_df.shape[1]
+    if total_columns == 0:
+        return -1
+
+    total_rows = raw_table_df.shape[0]
+    if total_rows <= 1:
+        return -1
+
+    print(f"[detect_header_split_point] Quét {total_rows} hàng, {total_columns} cột")
+    print(f"  Threshold: {border_threshold} ({border_threshold*100:.1f}%)")
+    print(f"  Số cells tối thiểu: {int(border_threshold * total_columns)}/{total_columns}\n")
+
+    # Quét từ hàng 1 (bỏ hàng 0 - viền trên)
+    for r_idx in range(1, total_rows):
+        real_row_num = boundary['min_row'] + r_idx
+        horizontal_count = 0
+        
+        # Đếm cells có border TOP
+        for c_idx in range(boundary['min_col'], boundary['max_col'] + 1):
+            style_row, style_col = merged_map.get((real_row_num, c_idx), (real_row_num, c_idx))
+            if style_row != real_row_num:
+                continue
+            cell = worksheet.cell(row=style_row, column=style_col)
+            
+            if cell.border.top and cell.border.top.style and cell.border.top.style != 'none':
+                horizontal_count += 1
+        
+        border_rate = horizontal_count / total_columns
+        
+        print(f"  Hàng {r_idx:2d} (Excel {real_row_num:2d}): "
+              f"{horizontal_count:2d}/{total_columns:2d} = "
+              f"{border_rate:5.1%}{' ✓ ỨNG VIÊN' if border_rate >= border_threshold else ''}")
+    
+        if border_rate >= border_threshold:
+            print(f"\n✓ Ranh giới tại hàng {r_idx}")
+            print(f"  Header: 0-{r_idx-1}, Data: {r_idx}+")
+            return r_idx
+    
+    print(f"\n✗ Không tìm thấy hàng nào >= {border_threshold*100:.0f}%")
+    return -1
+
+
+# ======================================================================
+# VECTORIZED (SheetGrid)
+# ======================================================================
+
+def _side_flags(worksheet: SheetGrid) -> Tuple[np.ndarray, np.ndarray]:
+    """(has_top, has_bottom) theo chỉ số style."""
+    borders = worksheet.styles.borders
+    has_top = np.array([bool(b.top.style) and b.top.style != 'none' for b in borders], dtype=bool)
+    has_bottom = np.array([bool(b.bottom.style) and b.bottom.style != 'none' for b in borders], dtype=bool)
+    return has_top, has_bottom
+
+
+def _box_styles(worksheet: SheetGrid, min_row: int, height: int,
+                min_col: int, max_col: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Mảng (height x width) chỉ số style của các ô trong hộp, và "chủ" của từng ô
+    (mã toạ độ `hàng * stride + cột` của ô chứa style). Ô con của dải gộp nhận
+    style và chủ là ô cha (kể cả khi ô cha nằm ngoài hộp) - giống `merged_map`.
+    """
+    max_row = min_row + height - 1
+    width = max_col - min_col + 1
+    stride = worksheet.max_column + 1
+
+    styles = np.zeros((height, width), dtype=np.int64)
+    rows, cols = worksheet.rows, worksheet.cols
+    inside = (rows >= min_row) & (rows <= max_row) & (cols >= min_col) & (cols <= max_col)
+    styles[rows[inside] - min_row, cols[inside] - min_col] = worksheet.style_ids[inside]
+
+    owner = (np.arange(min_row, max_row + 1, dtype=np.int64)[:, None] * stride +
+             np.arange(min_col, max_col + 1, dtype=np.int64)[None, :])
+    for m_min_col, m_min_row, m_max_col, m_max_row in (r.bounds for r in worksheet.merged_cells.ranges):
+        r0, r1 = max(m_min_row, min_row), min(m_max_row, max_row)
+        c0, c1 = max(m_min_col, min_col), min(m_max_col, max_col)
+        if r0 > r1 or c0 > c1:
+            continue
+        block = (slice(r0 - min_row, r1 - min_row + 1), slice(c0 - min_col, c1 - min_col + 1))
+        styles[block] = worksheet.style_id(m_min_row, m_min_col)
+        owner[block] = m_min_row * stride + m_min_col
+    return styles, owner
+
+
+def _first_candidate(counts: np.ndarray, total_columns: int, border_threshold: float) -> int:
+    rates = counts / total_columns
+    candidates = np.flatnonzero(rates >= border_threshold)
+    return int(candidates[0]) if len(candidates) else -1
+
+
+@register_header_split_strategy("edges_vectorized")
+def _split_by_edges_vectorized(
+    raw_table_df: "pd.DataFrame", 
+    worksheet: "Worksheet",
+    boundary: Dict[str, int],
+    merged_map: Dict[Tuple[int, int], Tuple[int, int]],
+    border_threshold: float = 0.95
+) -> int:
+    """
+    Như "edges" (kết quả giống hệt), tính mọi ranh giới cùng lúc bằng numpy.
+    Cũng chọn ứng viên ĐẦU TIÊN (`_first_candidate`) để khớp đầu ra của "edges".
+    """
+    if not isinstance(worksheet, SheetGrid):
+        return _split_by_edges(raw_table_df, worksheet, boundary, merged_map, border_threshold)
+
+    total_rows, total_columns = raw_table_df.shape
+    if total_columns == 0 or total_rows <= 1:
+        return -1
+
+    has_top, has_bottom = _side_flags(worksheet)
+    styles, owner = _box_styles(worksheet, boundary['min_row'], total_rows,
+                                boundary['min_col'], boundary['max_col'])
+    # Ranh giới i nằm giữa hàng i và i+1; ranh giới bên trong ô gộp (cùng chủ) bị bỏ qua
+    real_edge = owner[:-1] != owner[1:]
+    hits = real_edge & (has_bottom[styles[:-1]] | has_top[styles[1:]])
+    boundary_idx = _first_candidate(hits.sum(axis=1), total_columns, border_threshold)
+
+    print(f"[detect_header_split_point/edges_vectorized] {total_rows - 1} ranh giới, {total_columns} cột"
+          f" -> {'không tìm thấy' if boundary_idx == -1 else f'header: 0-{boundary_idx}'}")
+    return boundary_idx + 1 if boundary_idx != -1 else -1
+
+
+@register_header_split_strategy("top_border_vectorized")
+def _split_by_top_border_vectorized(
+    raw_table_df: "pd.DataFrame", 
+    worksheet: "Worksheet",
+    boundary: Dict[str, int],
+    merged_map: Dict[Tuple[int, int], Tuple[int, int]],
+    border_threshold: float = 0.95
+) -> int:
+    """Như "top_border" (kết quả giống hệt), bằng numpy."""
+    if not isinstance(worksheet, SheetGrid):
+        return _split_by_top_border(raw_table_df, worksheet, boundary, merged_map, border_threshold)
+
+    total_rows, total_columns = raw_table_df.shape
+    if total_columns == 0 or total_rows <= 1:
+        return -1
+
+    has_top, _ = _side_flags(worksheet)
+    styles, owner = _box_styles(worksheet, boundary['min_row'], total_rows,
+                                boundary['min_col'], boundary['max_col'])
+    # Ô con nằm dưới hàng đầu của dải gộp không có kẻ trên
+    rows = np.arange(boundary['min_row'], boundary['min_row'] + total_rows)[:, None]
+    top_hits = has_top[styles] & (owner // (worksheet.max_column + 1) == rows)
+    # Bỏ hàng 0 (viền trên của bảng): candidate i ứng với hàng i + 1
+    row_idx = _first_candidate(top_hits[1:].sum(axis=1), total_columns, border_threshold)
+
+    print(f"[detect_header_split_point/top_border_vectorized] {total_rows} hàng, {total_columns} cột"
+          f" -> {'không tìm thấy' if row_idx == -1 else f'data từ hàng {row_idx + 1}'}")
+    return row_idx + 1 if row_idx != -1 else -1
+
+
+# ======================================================================
+# KHÔNG DÙNG STYLE
+# ======================================================================
+
+# Tỉ lệ ô là số tối thiểu của một hàng data (cùng ngưỡng với DynamicExcelParser)
+NUMERIC_DENSITY_THRESHOLD = 0.3
+# Ô ngày/giờ là số serial trong Excel -> cũng tính là ô số
+_TEMPORAL_TYPES = (datetime.date, datetime.time, datetime.timedelta)
+
+
+@register_header_split_strategy("numeric_density")
+def _split_by_numeric_density(
+    raw_table_df: "pd.DataFrame", 
+    worksheet: "Worksheet",
+    boundary: Dict[str, int],
+    merged_map: Dict[Tuple[int, int], Tuple[int, int]],
+    border_threshold: float = 0.95
+) -> int:
+    """
+    Hàng data đầu tiên (từ hàng 1) là hàng có hơn `NUMERIC_DENSITY_THRESHOLD`
+    số ô là số (kể cả ngày/giờ). Chỉ dùng giá trị của `raw_table_df` (không đọc
+    worksheet / style), `border_threshold` không được dùng.
+    """
+    import pandas as pd
+
+    total_rows, total_columns = raw_table_df.shape
+    if total_columns == 0 or total_rows <= 1:
+        return -1
+
+    numeric = raw_table_df.apply(pd.to_numeric, errors='coerce').notna()
+    temporal = raw_table_df.apply(lambda col: col.map(lambda v: isinstance(v, _TEMPORAL_TYPES) and v == v))
+    density = (numeric | temporal).sum(axis=1).to_numpy() / total_columns
+    candidates = np.flatnonzero(density[1:] > NUMERIC_DENSITY_THRESHOLD)
+    split = int(candidates[0]) + 1 if len(candidates) else -1
+
+    print(f"[detect_header_split_point/numeric_density] {total_rows} hàng, {total_columns} cột"
+          f" -> {'không tìm thấy' if split == -1 else f'data từ hàng {split}'}")
+    return split
+
+
+def available_header_strategies() -> List[str]:
+    return sorted(HEADER_SPLIT_STRATEGIES)
@@ -0,0 +1,538 @@
+"""
+Giai đoạn 2 (dạng "dài"): tách cột thuộc tính/dữ liệu và lắp ráp mỗi ô dữ liệu
+thành một bản ghi JSON. (Tách header/data theo border: xem `header_split`.)
+"""
+
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .shared_grid import SharedHandle, attach_frame, share_frame
+
+
+def detect_attribute_boundary(header_df: pd.DataFrame) -> Tuple[List[int], List[int]]:
+    """
+    (Hàm MỚI - Bước 2.5)
+    Phân tích `header_df` (Cái Khuôn) để tìm "Ranh giới Thuộc tính".
+    
+    Quy tắc (Heuristic):
+    - "Cột Thuộc tính" (Ngày, ID) chỉ có giá trị ở hàng đầu tiên (index 0).
+    - "Cột Dữ liệu" (Group 1) có giá trị ở cả hàng 0 VÀ các hàng dưới.
+    - Ranh giới là cột "Dữ liệu" đầu tiên được tìm thấy.
+    
+    Returns:
+        Một tuple chứa 2 list: (attribute_cols_idx, data_cols_idx)
+    """
+    print(f"\n[detect_attribute_boundary] Phân tích {header_df.shape[1]} cột header...")
+    
+    attribute_cols_idx = []
+    data_cols_idx = []
+    
+    total_header_rows = header_df.shape[0]
+    total_cols = header_df.shape[1]
+
+    # Trường hợp Bảng Đơn giản (header_df chỉ có 1 hàng)
+    if total_header_rows == 1:
+        print("  -> Phát hiện Bảng Đơn giản (1 hàng header).")
+        # Giả định: Cột đầu tiên là Thuộc tính, còn lại là Dữ liệu
+        attribute_cols_idx = [0]
+        data_cols_idx = list(range(1, total_cols))
+        
+        print(f"  -> Cột Thuộc tính: {attribute_cols_idx}")
+        print(f"  -> Cột Dữ liệu: {data_cols_idx}")
+        return attribute_cols_idx, data_cols_idx
+
+    # Trường hợp Bảng Phức tạp (header_df có > 1 hàng)
+    print("  -> Phát hiện Bảng Phức tạp (>1 hàng header).")
+    
+    for c_idx in header_df.columns:
+        # Lấy "thân" của cột (tất cả các hàng TRỪ hàng đầu tiên)
+        column_body = header_df.iloc[1: , c_idx]
+        
+        # Kiểm tra xem "thân" có dữ liệu (không phải toàn NaN) không
+        body_has_data = not column_body.isna().all()
+        
+        if body_has_data:
+            # Đây là ranh giới! Cột này là "Cột Dữ liệu" đầu tiên.
+            print(f"  -> Ranh giới tại Cột {c_idx} (vì có '{column_body.loc[column_body.notna().idxmax()]}')")
+            
+            # Tất cả các cột từ đây về sau ĐỀU LÀ Cột Dữ liệu
+            data_cols_idx = list(range(c_idx, total_cols))
+            
+            # Thoát vòng lặp
+            break
+        else:
+            # Nếu "thân" toàn NaN, đây là "Cột Thuộc tính"
+            print(f"  -> Cột {c_idx} ('{header_df.iloc[0, c_idx]}') là Cột Thuộc tính.")
+            attribute_cols_idx.append(c_idx)
+
+    print(f"\n  -> [CHỐT] Cột Thuộc tính: {attribute_cols_idx}")
+    print(f"  -> [CHỐT] Cột Dữ liệu: {data_cols_idx}")
+    return attribute_cols_idx, data_cols_idx
+
+
+# --- [LẮP RÁP JSON] ---
+
+
+def _set_nested_value(target_dict: Dict, path: List[str], value: Any):
+    """
+    (Hàm trợ giúp - Bánh xe)
+    Đi theo `path` và gán `value` ở cấp cuối cùng.
+    Ví dụ: _set_nested_value(d, ['Group 1', 'Sub 1'], 5)
+    -> d['Group 1']['Sub 1'] = 5
+    """
+    for key in path[:-1]:
+        # Nếu key chưa có, tạo 1 dict con
+        target_dict = target_dict.setdefault(key, {})
+    # Gán giá trị ở cấp cuối cùng
+    target_dict[path[-1]] = value
+
+
+def _fallback_path(c_idx: int) -> List[str]:
+    return [f"Column_{c_idx}"]
+
+
+def _build_header_map(header_df: pd.DataFrame, data_cols: List[int]) -> Dict[int, List[str]]:
+    """
+    (Hàm MỚI - Bước 2.3)
+    Phân tích `header_df` và tạo "Bản đồ Header" cho các cột dữ liệu.
+    
+    Logic:
+    1. Lấp đầy (ffill) các ô gộp (cả ngang và dọc).
+    2. Đọc "dọc" từng cột để xây dựng "con đường" (path).
+    
+    Cột không có ô header nào (path rỗng) dùng key dự phòng `Column_<index>`
+    (như `DynamicExcelParser`) để không mất dữ liệu của cột.
+    
+    Returns:
+        Một dict (bản đồ): { column_index -> [path, to, header] }
+        Ví dụ: { 5: ['(Group 1)', 'Sub-Group 1.1', 'F-Data'] }
+    """
+    print(f"\n[build_header_map] Đang xây dựng bản đồ cho {len(data_cols)} cột dữ liệu...")
+    
+    # 1. Lấp đầy (ffill) để xử lý ô gộp
+    # Fill ngang (axis=1) để vá các lỗ hổng ô gộp
+    header_df_filled = header_df.ffill(axis=1)
+    # Fill dọc (axis=0) để lấp đầy các cấp (ví dụ: Sub-Group 1.1)
+    header_df_filled = header_df_filled.ffill(axis=0)
+    
+    header_map = {}
+    
+    # Chỉ lặp qua các CỘT DỮ LIỆU
+    for c_idx in data_cols:
+        path = []
+        last_val = None # Dùng để tránh lặp lại (ví dụ: Group 1, Group 1, Group 1...)
+        
+        # Lặp qua từng hàng (row_index) trong header_df
+        for r_idx in header_df_filled.index:
+            value = header_df_filled.loc[r_idx, c_idx]
+            
+            # Chỉ thêm nếu nó không NaN VÀ không bị lặp lại
+            if pd.notna(value) and value != last_val:
+                path.append(value)
+                last_val = value
+        
+        if not path:
+            path = _fallback_path(c_idx)
+            print(f"  ⚠ Cột {c_idx} không có header -> dùng key '{path[0]}'")
+        header_map[c_idx] = path
+    
+    # print(f"  -> Bản đồ Header (mẫu): Cột 5 -> {header_map.get(5)}")
+    return header_map
+
+
+# --- [SUY LUẬN KIỂU CỘT DỮ LIỆU] ---
+# Cột chuỗi thành categorical khi số giá trị khác nhau <= tỉ lệ này * số hàng
+CATEGORY_MAX_RATIO = 0.5
+
+
+def _infer_column(column: pd.Series) -> Optional[pd.Series]:
+    """
+    Kiểu cố định cho một cột object, None nếu phải giữ nguyên (cột trộn kiểu).
+    
+    Không đổi giá trị nào: cột số nguyên có ô trống dùng Int64 (nullable) chứ
+    không ép sang float; cột trộn int/float (5 và 2.5) giữ object.
+    """
+    kind = pd.api.types.infer_dtype(column, skipna=True)
+    has_nulls = bool(column.isna().any())
+    try:
+        if kind == "integer":
+            return column.astype("Int64" if has_nulls else np.int64)
+        if kind == "floating":
+            return column.astype(np.float64)
+        if kind == "boolean":
+            return column.astype("boolean" if has_nulls else bool)
+        if kind == "datetime":
+            typed = pd.to_datetime(column)
+            # Có múi giờ -> không phải datetime64 NumPy thuần, giữ nguyên
+            return typed if isinstance(typed.dtype, np.dtype) else None
+        if kind == "string" and column.nunique() <= CATEGORY_MAX_RATIO * len(column):
+            return column.astype("category")
+    except (OverflowError, TypeError, ValueError):
+        # int ngoài phạm vi int64, ngày ngoài phạm vi datetime64, múi giờ trộn...
+        pass
+    return None
+
+
+def infer_column_types(data_df: pd.DataFrame, data_cols: List[int]) -> pd.DataFrame:
+    """
+    Chuyển các cột dữ liệu (object, như `pd.read_excel(header=None)` trả về)
+    sang kiểu cố định sau khi tách header: int64 / Int64, float64, bool,
+    datetime64, categorical (cột chuỗi lặp nhiều); cột trộn kiểu giữ object.
+    
+    Khối dữ liệu nhỏ hơn nhiều lần trong bộ nhớ, bảng toàn số đi vào nhánh
+    mảng số của `_assemble_long_records`, và `share_frame` chia sẻ cột số
+    nguyên trạng. Các bản ghi JSON tạo ra không đổi. Cột thuộc tính giữ
+    nguyên (ffill theo giá trị gốc).
+    """
+    converted = {}
+    for c_idx in data_cols:
+        column = data_df[c_idx]
+        if column.dtype != object:
+            continue
+        typed = _infer_column(column)
+        if typed is not None:
+            converted[c_idx] = typed
+    
+    if not converted:
+        return data_df
+    
+    typed_df = data_df.copy(deep=False)
+    for c_idx, column in converted.items():
+        typed_df[c_idx] = column
+    return typed_df
+
+
+# --- [NHỚ KẾT QUẢ PHÂN TÍCH HEADER] ---
+# Số khối header khác nhau được nhớ (LRU) trong một process; 0 = tắt
+HEADER_MEMO_SIZE = 256
+
+HeaderAnalysis = Tuple[List[int], List[int], Dict[int, List[str]]]
+_header_memo: "OrderedDict[Tuple, HeaderAnalysis]" = OrderedDict()
+_header_memo_stats = {"hits": 0, "misses": 0}
+
+
+def _header_key(header_df: pd.DataFrame) -> Tuple:
+    """
+    Khoá của một khối header: kích thước, nhãn cột và giá trị từng ô (kèm tên
+    kiểu, để 1 / 1.0 / True không bị coi là một). Ô trống (NaN/None) -> None.
+    """
+    values = header_df.to_numpy(dtype=object)
+    nulls = pd.isna(values)
+    cells = tuple(None if is_null else (type(value).__name__, value)
+                  for value, is_null in zip(values.ravel().tolist(), nulls.ravel().tolist()))
+    return header_df.shape, tuple(header_df.columns.tolist()), cells
+
+
+def analyze_header(header_df: pd.DataFrame) -> HeaderAnalysis:
+    """
+    `detect_attribute_boundary` + `_build_header_map` cho một khối header,
+    có nhớ: các bảng có khối header giống hệt (cùng giá trị, cùng kích thước -
+    ví dụ mỗi tháng một bảng cùng mẫu) chỉ phân tích một lần cho mọi sheet /
+    file trong cùng process. Giữ tối đa `HEADER_MEMO_SIZE` khối gần nhất.
+    
+    Returns:
+        (attribute_cols, data_cols, header_map) - `header_map` dùng chung giữa
+        các lần gọi, không sửa trực tiếp.
+    """
+    key = _header_key(header_df)
+    cached = _header_memo.get(key)
+    if cached is not None:
+        _header_memo.move_to_end(key)
+        _header_memo_stats["hits"] += 1
+        print(f"\n[analyze_header] Dùng lại kết quả của khối header {header_df.shape} đã gặp.")
+    else:
+        _header_memo_stats["misses"] += 1
+        attribute_cols, data_cols = detect_attribute_boundary(header_df)
+        cached = (attribute_cols, data_cols, _build_header_map(header_df, data_cols))
+        if HEADER_MEMO_SIZE > 0:
+            _header_memo[key] = cached
+            while len(_header_memo) > HEADER_MEMO_SIZE:
+                _header_memo.popitem(last=False)
+    attribute_cols, data_cols, header_map = cached
+    return list(attribute_cols), list(data_cols), header_map
+
+
+def header_memo_info() -> Dict[str, int]:
+    """Thống kê bộ nhớ `analyze_header`: hits, misses, size, maxsize."""
+    return {**_header_memo_stats, "size": len(_header_memo), "maxsize": HEADER_MEMO_SIZE}
+
+
+def clear_header_memo() -> None:
+    _header_memo.clear()
+    _header_memo_stats.update(hits=0, misses=0)
+
+def parse_table_to_long_json(
+    header_df: pd.DataFrame, 
+    data_df: pd.DataFrame, 
+    attribute_cols: List[int], 
+    data_cols: List[int],
+    chunk_size: Optional[int] = None,
+    header_map: Optional[Dict[int, List[str]]] = None
+) -> List[Dict[str, Any]]:
+    """
+    (Hàm MỚI - Bước 2.4)
+    Lắp ráp JSON theo định dạng "Dài" (Long Format)
+    (Một object JSON cho mỗi Ô dữ liệu).
+    
+    Args:
+        chunk_size: Nếu có, xử lý khối dữ liệu theo từng cửa sổ `chunk_size`
+            hàng (xem `iter_table_to_long_json`). Kết quả giống hệt nhau.
+        header_map: "Bản đồ Header" đã có (ví dụ từ template) - None thì
+            tạo bằng `_build_header_map`.
+    """
+    
+    if not chunk_size:
+        chunk_size = max(len(data_df), 1)
+    
+    final_json_list = []
+    for records in iter_table_to_long_json(header_df, data_df, attribute_cols, data_cols, chunk_size,
+                                           header_map=header_map):
+        final_json_list.extend(records)
+    
+    return final_json_list
+
+
+def iter_table_to_long_json(
+    header_df: pd.DataFrame, 
+    data_df: pd.DataFrame, 
+    attribute_cols: List[int], 
+    data_cols: List[int],
+    chunk_size: int = 50000,
+    header_map: Optional[Dict[int, List[str]]] = None
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Phiên bản "cửa sổ hàng" của `parse_table_to_long_json`.
+    
+    Khối dữ liệu được xử lý theo từng cửa sổ `chunk_size` hàng; mỗi cửa sổ
+    được yield (list các bản ghi JSON) ngay khi lắp ráp xong. Trạng thái ffill
+    (giá trị không-NaN cuối cùng của từng cột thuộc tính) được mang sang cửa
+    sổ kế tiếp, nên kết quả nối lại giống hệt xử lý cả bảng một lần.
+    Không tạo bản sao của toàn bộ khối dữ liệu.
+    """
+    
+    # --- 1. Chuẩn bị 2 "Bản đồ" ---
+    
+    # Bản đồ 1: "Bản đồ Header" (Tra cứu Path theo Cột)
+    if header_map is None:
+        header_map = _build_header_map(header_df, data_cols)
+    
+    # Bản đồ 2: "Tên Thuộc tính" (Lấy tên "Ngày", "ID" từ hàng đầu)
+    attribute_key_names = [header_df.iloc[0, c_idx] for c_idx in attribute_cols]
+    
+    # Hàng thuộc tính cuối cùng đã ffill (mang qua ranh giới cửa sổ)
+    carried_row = None
+    
+    print(f"[parse_table_to_long_json] Đang lấp đầy (ffill) và lắp ráp các ô "
+          f"({len(data_df)} hàng, cửa sổ {chunk_size} hàng)...")
+    
+    for start in range(0, len(data_df), chunk_size):
+        chunk_df = data_df.iloc[start:start + chunk_size]
+        
+        attribute_df, carried_row = _ffill_attribute_columns(chunk_df, attribute_cols, carried_row)
+        
+        yield _assemble_long_records(
+            chunk_df, attribute_df, header_map,
+            attribute_key_names, attribute_cols, data_cols
+        )
+
+
+# Số hàng tối thiểu của một shard: bảng nhỏ hơn không đáng chia process
+MIN_SHARD_ROWS = 20000
+
+
+def parse_table_to_long_json_sharded(
+    header_df: pd.DataFrame, 
+    data_df: pd.DataFrame, 
+    attribute_cols: List[int], 
+    data_cols: List[int],
+    workers: Optional[int] = None,
+    header_map: Optional[Dict[int, List[str]]] = None,
+    min_shard_rows: int = MIN_SHARD_ROWS
+) -> List[Dict[str, Any]]:
+    """
+    Như `parse_table_to_long_json` (kết quả giống hệt, cùng thứ tự) nhưng chia
+    các hàng dữ liệu của MỘT bảng lớn thành các shard liên tiếp và lắp ráp song
+    song trên `workers` process.
+    
+    Phần phụ thuộc giữa các hàng duy nhất là ffill cột thuộc tính: mỗi shard
+    nhận thêm hàng thuộc tính (đã ffill) ngay trước nó làm `carried_row`,
+    giống cách `iter_table_to_long_json` nối các cửa sổ.
+    
+    Khối dữ liệu không được pickle sang worker: nó được đặt một lần vào shared
+    memory (`share_frame`), mỗi worker gắn vào theo tên và chỉ dựng lại các
+    hàng của shard mình.
+    
+    Args:
+        workers: Số process (None -> số CPU). Bảng có ít hơn
+            `2 * min_shard_rows` hàng được xử lý tuần tự trong process hiện tại.
+    """
+    if header_map is None:
+        header_map = _build_header_map(header_df, data_cols)
+    
+    num_rows = len(data_df)
+    workers = workers or os.cpu_count() or 1
+    num_shards = min(workers, num_rows // max(min_shard_rows, 1))
+    if num_shards <= 1:
+        return parse_table_to_long_json(header_df, data_df, attribute_cols, data_cols,
+                                        header_map=header_map)
+    
+    attribute_key_names = [header_df.iloc[0, c_idx] for c_idx in attribute_cols]
+    
+    # Ranh giới shard + hàng thuộc tính đã ffill ngay trước mỗi shard
+    bounds = np.linspace(0, num_rows, num_shards + 1).astype(int).tolist()
+    filled_attributes = data_df.loc[:, attribute_cols].ffill()
+    carried_rows = [None] + [filled_attributes.iloc[start - 1:start] for start in bounds[1:-1]]
+    
+    final_json_list = []
+    with share_frame(data_df) as shared:
+        print(f"[parse_table_to_long_json_sharded] {num_rows} hàng -> {num_shards} shard "
+              f"trên {num_shards} process ({shared.nbytes / 2**20:.1f} MiB shared memory)...")
+        with ProcessPoolExecutor(max_workers=num_shards) as pool:
+            for records in pool.map(_assemble_shard, repeat(shared.handle), bounds, bounds[1:],
+                                    carried_rows, repeat(header_map), repeat(attribute_key_names),
+                                    repeat(attribute_cols), repeat(data_cols)):
+                final_json_list.extend(records)
+    return final_json_list
+
+
+def _assemble_shard(
+    handle: SharedHandle,
+    start: int,
+    end: int,
+    carried_row: Optional[pd.DataFrame],
+    header_map: Dict[int, List[str]],
+    attribute_key_names: List[Any],
+    attribute_cols: List[int],
+    data_cols: List[int]
+) -> List[Dict[str, Any]]:
+    """Chạy trong worker: dựng các hàng [start, end) từ shared memory, ffill (có hàng mồi) + lắp ráp."""
+    chunk_df = attach_frame(handle, start, end)
+    attribute_df, _ = _ffill_attribute_columns(chunk_df, attribute_cols, carried_row)
+    return _assemble_long_records(
+        chunk_df, attribute_df, header_map,
+        attribute_key_names, attribute_cols, data_cols
+    )
+
+
+def _ffill_attribute_columns(
+    chunk_df: pd.DataFrame,
+    attribute_cols: List[int],
+    carried_row: Optional[pd.DataFrame]
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Lấp đầy (ffill) CHỈ các cột thuộc tính của một cửa sổ hàng.
+    
+    `carried_row` (hàng thuộc tính cuối của cửa sổ trước, đã ffill) được đặt
+    lên đầu trước khi ffill rồi bỏ đi, nên kết quả giống hệt ffill cả cột.
+    
+    Returns:
+        (attribute_df, last_row) - last_row dùng làm `carried_row` cho cửa sổ sau.
+    """
+    attribute_df = chunk_df.loc[:, attribute_cols]
+    
+    if carried_row is not None:
+        attribute_df = pd.concat([carried_row, attribute_df]).ffill().iloc[1:]
+    else:
+        attribute_df = attribute_df.ffill()
+    
+    return attribute_df, attribute_df.iloc[-1:]
+
+
+def _assemble_long_records(
+    chunk_df: pd.DataFrame,
+    attribute_df: pd.DataFrame,
+    header_map: Dict[int, List[str]],
+    attribute_key_names: List[Any],
+    attribute_cols: List[int],
+    data_cols: List[int]
+) -> List[Dict[str, Any]]:
+    """
+    --- 2. Vòng lặp Kép (Lắp ráp Ô) --- cho một cửa sổ hàng.
+    
+    Không dùng `.loc` cho từng ô: giá trị dữ liệu được đọc theo từng cột
+    (cột đã có kiểu - xem `infer_column_types` - chuyển thẳng từ mảng số sang
+    list, không qua mảng object), mask NaN tính một lần cho mỗi cột.
+    """
+    
+    final_json_list = []
+    
+    # Giá trị thuộc tính (đã ffill) theo từng cột
+    attribute_values = [attribute_df[c_idx].tolist() for c_idx in attribute_cols]
+    
+    # Khối dữ liệu: giá trị + mask ô trống theo từng cột
+    data_columns = [chunk_df[c_idx] for c_idx in data_cols]
+    data_values = [_column_values(column) for column in data_columns]
+    null_masks = [column.isna().to_numpy().tolist() for column in data_columns]
+    
+    # Tách path thành (key đầu, các key còn lại) một lần cho mỗi cột
+    # (header_map truyền từ ngoài vào có thể còn path rỗng -> key dự phòng)
+    paths = []
+    for c_idx in data_cols:
+        path = header_map.get(c_idx) or _fallback_path(c_idx)
+        paths.append((path[0], path[:0:-1]))
+    
+    # Bảng không có cột thuộc tính -> mỗi hàng có bản ghi thuộc tính rỗng
+    attribute_rows = zip(*attribute_values) if attribute_cols else repeat(())
+    
+    # Lặp qua các HÀNG DỮ LIỆU
+    for attrs, row_values, row_nulls in zip(attribute_rows, zip(*data_values), zip(*null_masks)):
+        
+        # a. Lấy "Bản ghi Thuộc tính" (Attribute Record) cho hàng này
+        # (Lấy 1 lần cho mỗi hàng)
+        base_record = dict(zip(attribute_key_names, attrs))
+        
+        # b. Lặp qua các CỘT DỮ LIỆU
+        for (head, tail_reversed), value, is_null in zip(paths, row_values, row_nulls):
+            
+            # Bỏ qua nếu ô đó trống (không tạo JSON cho ô NaN)
+            if is_null:
+                continue
+            
+            # Tạo object lồng nhau từ lá lên gốc
+            # Ví dụ: ['Group 1', 'Sub 1', 'Data'] -> {'Group 1': {'Sub 1': {'Data': v}}}
+            nested = value
+            for key in tail_reversed:
+                nested = {key: nested}
+            
+            # Gộp với bản sao của "Bản ghi Thuộc tính"
+            record = base_record.copy()
+            record[head] = nested
+            
+            # Thêm vào kết quả cuối cùng
+            final_json_list.append(record)
+            
+    return final_json_list
+
+
+def _column_values(column: pd.Series) -> List[Any]:
+    """
+    Giá trị của một cột dưới dạng list đối tượng Python (int, float, str,
+    datetime...) - giống giá trị gốc trước `infer_column_types`.
+    
+    Cột số NumPy và cột số nullable (Int64, boolean) đi thẳng từ mảng số -
+    không bao giờ ép int -> float; ô trống của cột nullable thành 0 (đã bị
+    mask NaN loại). datetime64 -> `datetime.datetime` (không phải
+    `pd.Timestamp`), categorical -> giá trị của từng nhóm. Các kiểu khác qua
+    mảng object.
+    """
+    dtype = column.dtype
+    if isinstance(dtype, np.dtype):
+        if dtype.kind in 'iufb':
+            return column.to_numpy().tolist()
+        if dtype.kind == 'M':
+            # Đơn vị micro giây: astype(object) cho datetime (ns sẽ cho int); NaT -> None
+            return column.to_numpy().astype("datetime64[us]").astype(object).tolist()
+    elif isinstance(dtype, pd.CategoricalDtype):
+        # Ô trống có mã -1 -> phần tử cuối (None), đã bị mask NaN loại
+        categories = np.empty(len(dtype.categories) + 1, dtype=object)
+        categories[:-1] = _column_values(pd.Series(dtype.categories))
+        return categories[column.cat.codes.to_numpy()].tolist()
+    elif dtype.kind in 'iufb' and getattr(dtype, 'numpy_dtype', None) is not None:
+        return column.to_numpy(dtype=dtype.numpy_dtype, na_value=0).tolist()
+    return column.to_numpy(dtype=object).tolist()
@@ -0,0 +1,495 @@
+"""
+Giai đoạn 2 (dạng lồng nhau): `DynamicExcelParser` tự phát hiện header nhiều tầng
+và chuyển DataFrame thành JSON lồng nhau; ghi JSON / NDJSON theo kiểu streaming.
+"""
+
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, TextIO
+
+import numpy as np
+import pandas as pd
+
+
+class DynamicExcelParser:
+    """
+    Parser động cho bảng Excel với header nhiều cấp.
+    Tự động phát hiện cấu trúc và chuyển đổi sang nested JSON.
+    """
+    
+    # Số hàng của khối đầu tiên khi dò ranh giới header (nhân đôi sau mỗi khối)
+    BOUNDARY_SCAN_WINDOW = 64
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.header_end_row = 0
+        self.data_start_row = 0
+        self.column_structure = []
+        
+    def parse(self) -> Dict[str, Any]:
+        """Parse toàn bộ DataFrame sang nested JSON."""
+        
+        # Bước 1 & 2: Tìm ranh giới header/data và parse cấu trúc header
+        metadata = self.parse_header()
+        
+        # Bước 3: Parse dữ liệu
+        data_rows = self._parse_data_rows()
+        
+        return {
+            "metadata": metadata,
+            "data": data_rows
+        }
+    
+    def parse_header(self) -> Dict[str, Any]:
+        """
+        Chỉ chạy Bước 1 & 2 (ranh giới header và cấu trúc cột).
+        
+        Returns:
+            Phần "metadata" của kết quả. Sau khi gọi, có thể lấy dữ liệu
+            dần dần bằng `iter_data_rows()`.
+        """
+        
+        # Bước 1: Tìm ranh giới giữa header và data
+        self._detect_header_boundary()
+        
+        # Bước 2: Parse cấu trúc header
+        self._parse_header_structure()
+        
+        return {
+            "header_rows": self.header_end_row,
+            "data_start_row": self.data_start_row,
+            "total_columns": len(self.column_structure),
+            "column_structure": self.column_structure
+        }
+    
+    def _detect_header_boundary(self):
+        """
+        Tự động phát hiện hàng nào là ranh giới giữa header và data.
+        Sử dụng heuristic: hàng đầu tiên có pattern như ID-1, ID-2, hoặc ngày tháng thực.
+
+        Cả hai phép kiểm tra (pattern ID và tỷ lệ ô số) được tính vector hóa
+        cho từng khối hàng (khối tăng dần kích thước), hàng đầu tiên thỏa mãn
+        là argmax của mask. Dừng ngay khi tìm thấy, không quét hết sheet.
+        """
+
+        num_rows = len(self.df)
+        window_start = 0
+        window_size = self.BOUNDARY_SCAN_WINDOW
+
+        while window_start < num_rows:
+            window = self.df.iloc[window_start:window_start + window_size]
+            qualifies = self._boundary_candidates(window)
+
+            if qualifies.any():
+                idx = window_start + int(qualifies.argmax())
+                self.data_start_row = idx
+                self.header_end_row = idx
+                break
+
+            window_start += window_size
+            window_size *= 2
+
+        if self.header_end_row == 0:
+            # Fallback: giả sử 5 hàng đầu là header
+            self.header_end_row = min(5, len(self.df) - 1)
+            self.data_start_row = self.header_end_row
+    
+    def _boundary_candidates(self, rows: pd.DataFrame) -> np.ndarray:
+        """
+        Trả về mask (bool) các hàng "giống dữ liệu" trong khối `rows`.
+        """
+        num_rows, num_cols = rows.shape
+        qualifies = np.zeros(num_rows, dtype=bool)
+
+        if num_cols > 1:
+            # Kiểm tra cột thứ 2 (thường là ID)
+            id_col = rows.iloc[:, 1]
+            id_str = id_col.astype(str).str.strip()
+
+            # Pattern: ID-số hoặc số thuần túy (không phải text mô tả)
+            is_id = id_str.str.match(r'^ID-?\d+$', case=False)
+            is_digit = id_str.str.isdigit()
+            is_small_id = is_digit & (pd.to_numeric(id_str.where(is_digit), errors='coerce') < 1000)  # ID dạng số nhỏ
+            qualifies |= (id_col.notna() & (is_id | is_small_id)).to_numpy()
+
+        if num_cols > 2:
+            # Nếu có nhiều ô liên tiếp chứa số (dữ liệu thực)
+            numeric_block = rows.iloc[:, 2:].apply(self._to_numeric_column)
+            numeric_count = numeric_block.notna().sum(axis=1).to_numpy()
+            qualifies |= numeric_count > num_cols * 0.3  # >30% là số
+
+        return qualifies
+
+    @staticmethod
+    def _to_numeric_column(col: pd.Series) -> pd.Series:
+        """Chuyển cả cột sang số, ô không phải số -> NaN."""
+        return pd.to_numeric(col, errors='coerce')
+    
+    def _parse_header_structure(self):
+        """
+        Parse cấu trúc header động, tự động phát hiện các nhóm và nhóm con.
+
+        Mỗi hàng header được chuẩn hóa + ffill sang phải MỘT lần, sau đó path
+        của tất cả các cột được xây dựng trong một lượt duyệt.
+        """
+        
+        if self.header_end_row <= 0:
+            # Không có header, mỗi cột là một field đơn giản
+            self.column_structure = [
+                {"col_index": i, "path": [f"Column_{i}"], "name": f"Column_{i}"}
+                for i in range(len(self.df.columns))
+            ]
+            return
+        
+        header_block = self.df.iloc[:self.header_end_row]
+        
+        # (giá trị gốc đã chuẩn hóa, giá trị merged bên trái) cho từng hàng
+        header_rows = [
+            self._prepare_header_row(row)
+            for row in header_block.itertuples(index=False, name=None)
+        ]
+        
+        # Parse từng cột
+        num_cols = len(self.df.columns)
+        
+        for col_idx in range(num_cols):
+            col_path = self._build_column_path(header_rows, col_idx)
+            
+            self.column_structure.append({
+                "col_index": col_idx,
+                "path": col_path,
+                "name": col_path[-1] if col_path else f"Column_{col_idx}",
+                "full_path": " > ".join(col_path)
+            })
+    
+    @staticmethod
+    def _clean_header_value(val: Any) -> Optional[str]:
+        """Chuẩn hóa 1 ô header: NaN / rỗng / 'nan' -> None."""
+        if pd.isna(val):
+            return None
+        val_str = str(val).strip()
+        if not val_str or val_str in ['nan', 'NaN', 'None']:
+            return None
+        return val_str
+    
+    def _prepare_header_row(self, row: Tuple) -> Tuple[List[Optional[str]], List[Optional[str]]]:
+        """
+        Chuẩn hóa một hàng header và tính sẵn giá trị merged cell cho mọi cột.
+        
+        Returns:
+            (cleaned, merged):
+            - cleaned[i]: giá trị đã chuẩn hóa của ô i (None nếu bỏ qua)
+            - merged[i]: giá trị hợp lệ gần nhất bên trái ô i (ffill), dùng khi ô i là NaN
+        """
+        is_na = [pd.isna(val) for val in row]
+        cleaned = [None if na else self._clean_header_value(val) for na, val in zip(is_na, row)]
+        
+        merged = []
+        last_val = None
+        for val in cleaned:
+            merged.append(last_val)
+            if val is not None:
+                last_val = val
+        
+        # Ô không NaN (kể cả chuỗi rỗng) không bao giờ tra merged cell
+        merged = [m if na else None for na, m in zip(is_na, merged)]
+        return cleaned, merged
+    
+    def _build_column_path(self, header_rows: List[Tuple[List, List]], col_idx: int) -> List[str]:
+        """
+        Xây dựng path phân cấp cho một cột từ các hàng header (đã chuẩn bị sẵn).
+        
+        Logic:
+        - Đọc từ trên xuống dưới
+        - Bỏ qua NaN
+        - Phát hiện merged cells (giá trị trải dài nhiều cột) - tra O(1)
+        - Xây dựng path: [Group] -> [SubGroup] -> [Column Name]
+        """
+        
+        path = []
+        
+        for cleaned, merged in header_rows:
+            # Ô NaN -> lấy giá trị merged cell (nếu có), ngược lại lấy giá trị của ô
+            val = cleaned[col_idx] or merged[col_idx]
+            
+            # Chỉ thêm vào path nếu chưa có (tránh lặp)
+            if val and (not path or path[-1] != val):
+                path.append(val)
+        
+        # Nếu path rỗng, đặt tên mặc định
+        if not path:
+            path = [f"Column_{col_idx}"]
+        
+        return path
+    
+    def _parse_data_rows(self) -> List[Dict[str, Any]]:
+        """Parse các hàng dữ liệu thành list of nested dictionaries."""
+        return list(self.iter_data_rows())
+    
+    def iter_data_rows(self, chunk_size: int = 10000) -> Iterator[Dict[str, Any]]:
+        """
+        Sinh (yield) từng hàng dữ liệu dạng nested dictionary.
+        
+        Khối dữ liệu được xử lý theo từng đoạn `chunk_size` hàng: mỗi đoạn được
+        chuyển sang giá trị Python native theo cột (vector hóa), hàng rỗng bị
+        loại bằng boolean mask. Bộ nhớ chỉ giữ một đoạn tại một thời điểm.
+        
+        Yêu cầu đã gọi `parse_header()` trước.
+        """
+        
+        compiled_paths = self._compile_paths()
+        
+        for start in range(max(self.data_start_row, 0), len(self.df), chunk_size):
+            data_block = self.df.iloc[start:start + chunk_size]
+            
+            # Loại hàng rỗng (tất cả đều NaN)
+            non_empty = data_block.notna().any(axis=1).to_numpy()
+            data_block = data_block[non_empty]
+            
+            columns = [
+                self._native_column(data_block.iloc[:, col_info["col_index"]])
+                for col_info in self.column_structure
+            ]
+            
+            for values in zip(*columns):
+                yield self._parse_single_row(values, compiled_paths)
+    
+    def _compile_paths(self) -> List[Tuple[Tuple[str, ...], str]]:
+        """Tách path của từng cột thành (các key cha, key lá) để dùng lại cho mọi hàng."""
+        return [
+            (tuple(col_info["path"][:-1]), col_info["path"][-1])
+            for col_info in self.column_structure
+        ]
+    
+    def _native_column(self, col: pd.Series) -> List[Any]:
+        """
+        Chuyển một cột dữ liệu sang list giá trị Python native.
+        
+        Tương đương gọi `_safe_value` cho từng ô, nhưng xử lý cả cột:
+        - Cột số: NaN -> None, float nguyên -> int (vector hóa bằng NumPy)
+        - Cột chuỗi: strip, chuỗi rỗng -> None
+        - Cột hỗn hợp: fallback `_safe_value` từng ô
+        """
+        inferred = col.infer_objects() if col.dtype == object else col
+        kind = inferred.dtype.kind
+        
+        if kind in 'iub':
+            return inferred.tolist()
+        
+        if kind == 'f':
+            arr = inferred.to_numpy(dtype=np.float64)
+            is_na = np.isnan(arr)
+            is_integral = np.isfinite(arr) & (arr == np.trunc(arr))
+            fits_int64 = np.abs(arr) < 2**63
+            
+            values = arr.astype(object)
+            values[is_integral & fits_int64] = arr[is_integral & fits_int64].astype(np.int64)
+            big = is_integral & ~fits_int64
+            if big.any():
+                values[big] = [int(v) for v in arr[big]]
+            values[is_na] = None
+            return values.tolist()
+        
+        if isinstance(inferred.dtype, pd.StringDtype):
+            stripped = inferred.str.strip()
+            keep = (stripped.notna() & (stripped != '')).to_numpy()
+            return np.where(keep, stripped.to_numpy(dtype=object), None).tolist()
+        
+        # Hỗn hợp: fallback từng ô
+        is_na = col.isna().to_numpy()
+        return [None if na else self._safe_value(val) for na, val in zip(is_na, col.tolist())]
+    
+    def _parse_single_row(self, values: Tuple, compiled_paths: List[Tuple[Tuple[str, ...], str]]) -> Dict[str, Any]:
+        """
+        Dựng nested dictionary cho một hàng từ giá trị native và path đã biên dịch.
+        
+        Ví dụ: parents = ("Group1", "SubGroup"), leaf = "Data"
+               -> result["Group1"]["SubGroup"]["Data"] = value
+        """
+        
+        result = {}
+        
+        for (parents, leaf), value in zip(compiled_paths, values):
+            current = result
+            
+            for key in parents:
+                node = current.get(key)
+                if node is None and key not in current:
+                    node = current[key] = {}
+                elif not isinstance(node, dict):
+                    # Xung đột: key đã tồn tại nhưng không phải dict
+                    # Chuyển thành dict và giữ giá trị cũ
+                    node = current[key] = {"_value": node}
+                current = node
+            
+            # Đặt giá trị cuối cùng
+            current[leaf] = value
+        
+        return result
+    
+    def _safe_value(self, val: Any) -> Any:
+        """Chuyển đổi giá trị an toàn, xử lý NaN và kiểu dữ liệu."""
+        
+        if pd.isna(val):
+            return None
+        
+        # Chuyển numpy types sang Python native types
+        if hasattr(val, 'item'):
+            val = val.item()
+        
+        # Xử lý số
+        if isinstance(val, (int, float)):
+            if isinstance(val, float):
+                if val.is_integer():
+                    return int(val)
+            return val
+        
+        # Xử lý chuỗi
+        val_str = str(val).strip()
+        return val_str if val_str else None
+
+
+def excel_to_nested_json(df: pd.DataFrame, 
+                         output_file: Optional[str] = None,
+                         indent: int = 2,
+                         stream: bool = False,
+                         ndjson: bool = False) -> Dict[str, Any]:
+    """
+    Chuyển đổi DataFrame với header nhiều cấp sang nested JSON.
+    
+    Function này hoàn toàn ĐỘNG - tự động phát hiện cấu trúc header.
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        DataFrame đọc từ Excel với header=None
+    output_file : str, optional
+        Đường dẫn file JSON output. Nếu None, không ghi file.
+    indent : int
+        Số space cho indentation trong JSON
+    stream : bool
+        Ghi file theo kiểu streaming: metadata trước, sau đó từng phần tử
+        của "data" được ghi ngay khi parse xong (không giữ cả list trong RAM).
+        Nội dung file giống hệt chế độ thường. Cần `output_file`.
+    ndjson : bool
+        Ghi file dạng NDJSON (streaming): dòng đầu là {"metadata": ...},
+        mỗi dòng tiếp theo là 1 hàng dữ liệu. Cần `output_file`.
+        
+    Returns:
+    --------
+    dict : Nested JSON structure
+        Ở chế độ stream/ndjson, "data" không được giữ lại: kết quả chỉ gồm
+        "metadata" và "total_rows" (số hàng đã ghi).
+    
+    Example:
+    --------
+    >>> import pandas as pd
+    >>> df = pd.read_excel('data.xlsx', header=None)
+    >>> result = excel_to_nested_json(df, 'output.json')
+    >>> print(json.dumps(result, indent=2, ensure_ascii=False))
+    >>> excel_to_nested_json(df, 'output.ndjson', ndjson=True)
+    """
+    
+    parser = DynamicExcelParser(df)
+    
+    if stream or ndjson:
+        if not output_file:
+            raise ValueError("Chế độ stream/ndjson cần output_file.")
+        
+        metadata = parser.parse_header()
+        with open(output_file, 'w', encoding='utf-8') as f:
+            if ndjson:
+                total_rows = _write_ndjson_stream(f, metadata, parser.iter_data_rows())
+            else:
+                total_rows = _write_json_stream(f, metadata, parser.iter_data_rows(), indent)
+        
+        print(f"✅ Đã lưu JSON (streaming) vào: {output_file}")
+        print(f"📊 Số hàng dữ liệu: {total_rows}")
+        print(f"📋 Số cột: {metadata['total_columns']}")
+        return {"metadata": metadata, "total_rows": total_rows}
+    
+    result = parser.parse()
+    
+    # Ghi file nếu được chỉ định
+    if output_file:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=indent, ensure_ascii=False)
+        print(f"✅ Đã lưu JSON vào: {output_file}")
+        print(f"📊 Số hàng dữ liệu: {len(result['data'])}")
+        print(f"📋 Số cột: {result['metadata']['total_columns']}")
+    
+    return result
+
+
+def _write_json_stream(f: TextIO, metadata: Dict[str, Any],
+                       rows: Iterable[Dict[str, Any]],
+                       indent: Optional[int] = 2) -> int:
+    """
+    Ghi {"metadata": ..., "data": [...]} theo từng phần tử.
+    Định dạng đầu ra giống hệt `json.dump(result, f, indent=indent)`.
+    
+    Returns:
+        Số hàng dữ liệu đã ghi.
+    """
+    
+    def dumps(obj: Any, level: int) -> str:
+        text = json.dumps(obj, indent=indent, ensure_ascii=False)
+        if indent is None:
+            return text
+        # Thụt lề các dòng con theo cấp lồng nhau trong file
+        return text.replace("\n", "\n" + " " * (indent * level))
+    
+    if indent is None:
+        item_sep, open_data, close_data = ", ", "[", "]}"
+        f.write('{"metadata": ' + dumps(metadata, 1) + ', "data": ')
+    else:
+        pad = " " * indent
+        item_sep = ",\n" + pad * 2
+        open_data = "[\n" + pad * 2
+        close_data = "\n" + pad + "]\n}"
+        f.write("{\n" + pad + '"metadata": ' + dumps(metadata, 1) + ",\n" + pad + '"data": ')
+    
+    total_rows = 0
+    for row in rows:
+        f.write((item_sep if total_rows else open_data) + dumps(row, 2))
+        total_rows += 1
+    
+    if total_rows:
+        f.write(close_data)
+    else:
+        f.write("[]}" if indent is None else "[]\n}")
+    return total_rows
+
+
+def _write_ndjson_stream(f: TextIO, metadata: Dict[str, Any],
+                         rows: Iterable[Dict[str, Any]]) -> int:
+    """
+    Ghi NDJSON: dòng đầu {"metadata": ...}, mỗi dòng sau là 1 hàng dữ liệu.
+    
+    Returns:
+        Số hàng dữ liệu đã ghi.
+    """
+    f.write(json.dumps({"metadata": metadata}, ensure_ascii=False) + "\n")
+    
+    total_rows = 0
+    for row in rows:
+        f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        total_rows += 1
+    return total_rows
+
+
+def visualize_structure(result: Dict[str, Any]) -> None:
+    """
+    In ra cấu trúc cột để kiểm tra.
+    """
+    print("\n" + "="*80)
+    print("CẤU TRÚC CỘT ĐƯỢC PHÁT HIỆN")
+    print("="*80)
+    
+    for col in result['metadata']['column_structure']:
+        print(f"Cột {col['col_index']:2d}: {col['full_path']}")
+    
+    print("\n" + "="*80)
+    print(f"Tổng số cột: {result['metadata']['total_columns']}")
+    print(f"Số hàng header: {result['metadata']['header_rows']}")
+    print(f"Số hàng dữ liệu: {len(result['data'])}")
+    print("="*80 + "\n")
@@ -0,0 +1,164 @@
+"""
+Pipeline cho một sheet: Giai đoạn 1 (phát hiện bảng) + Giai đoạn 2 (JSON "dài").
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from .detection import (
+    DETECTION_MODES,
+    _create_merged_cell_map,
+    debug_extract_data,
+    detect_tables_in_worksheet,
+    detect_value_blocks_in_worksheet,
+    load_worksheet,
+)
+from .header_split import DEFAULT_HEADER_STRATEGY, detect_header_split_point
+from .long_format import (analyze_header, infer_column_types, parse_table_to_long_json,
+                          parse_table_to_long_json_sharded)
+from .xlsx_reader import WorkbookSource, as_seekable
+
+
+def extract_sheet(file_path: WorkbookSource, sheet_name: str,
+                  worksheet: Optional[Any] = None,
+                  min_width: int = 2,
+                  min_height: int = 2,
+                  border_threshold: float = 0.98,
+                  engine: str = "bfs",
+                  header_strategy: Optional[str] = None,
+                  merged_map: Optional[Dict[Tuple[int, int], Tuple[int, int]]] = None,
+                  detection: str = "borders",
+                  structured: bool = False,
+                  layouts: Optional[List[Dict[str, Any]]] = None,
+                  table_workers: int = 1
+                  ) -> List[Dict[str, Any]]:
+    """
+    Chạy toàn bộ pipeline trên một sheet: phát hiện bảng -> tách header/data
+    -> tách thuộc tính -> lắp ráp JSON "dài".
+    
+    Args:
+        file_path: File nguồn - đường dẫn, bytes hoặc stream nhị phân
+                   (dùng khi phải đọc lại bằng pandas với openpyxl).
+        worksheet: Sheet đã tải (`load_worksheet`). None -> tự tải.
+        merged_map: Bản đồ ô gộp đã tạo sẵn (nếu có).
+        header_strategy: Tên chiến lược tách header (xem `header_split`).
+                         None -> "edges" (chế độ borders) / "numeric_density" (chế độ values).
+        detection: "borders" (mặc định) - bảng là cụm ô có border;
+                   "values" - bảng là khối ô có giá trị, không đọc style
+                   (nhanh hơn với sheet không kẻ bảng).
+        structured: (chế độ borders, mặc định tắt) Dùng Excel Table / defined name của sheet
+                    làm bảng có sẵn, chỉ tìm border ở phần còn lại.
+        layouts: Nếu truyền một list, "bố cục" của từng bảng parse thành công
+                 được thêm vào (dùng cho `templates`): {'boundary', 'split',
+                 'attribute_cols', 'data_cols', 'header_map', 'header_df'}.
+        table_workers: > 1 -> khối dữ liệu của bảng lớn được chia theo hàng cho
+                       nhiều process (`parse_table_to_long_json_sharded`).
+    
+    Returns:
+        List các bản ghi JSON của tất cả các bảng trong sheet.
+    """
+    if detection not in DETECTION_MODES:
+        raise ValueError(f"detection không hợp lệ: {detection!r} (chọn một trong {list(DETECTION_MODES)})")
+    values_only = detection == "values"
+    if header_strategy is None:
+        header_strategy = "numeric_density" if values_only else DEFAULT_HEADER_STRATEGY
+    
+    # bytes / stream chỉ được chuẩn hoá một lần cho mọi bước đọc phía sau
+    file_path = as_seekable(file_path)
+    wb = None
+    if worksheet is None:
+        worksheet, wb = load_worksheet(file_path, sheet_name, values_only=values_only)
+    try:
+        if merged_map is None:
+            merged_map = _create_merged_cell_map(worksheet)
+        
+        print(f"\n--- [GIAI ĐOẠN 1] Đang chạy detect_tables... ---")
+        if values_only:
+            table_coordinates = detect_value_blocks_in_worksheet(
+                worksheet,
+                min_width=min_width,
+                min_height=min_height,
+                engine=engine
+            )
+        else:
+            table_coordinates = detect_tables_in_worksheet(
+                worksheet,
+                min_width=min_width,
+                min_height=min_height,
+                merged_map=merged_map,
+                engine=engine,
+                structured=structured
+            )
+        print(f"--- [GIAI ĐOẠN 1] Hoàn thành: Tìm thấy {len(table_coordinates)} bảng ---")
+        
+        all_parsed_data = []
+        
+        # Lặp qua các bảng tìm được
+        for i, coords in enumerate(table_coordinates):
+            print(f"\n--- Xử lý Bảng {i+1} (Hàng {coords['min_row']}->{coords['max_row']}) ---")
+            
+            raw_table_df = debug_extract_data(file_path, sheet_name, coords, worksheet)
+            
+            if raw_table_df.empty:
+                continue
+            
+            # --- BƯỚC 2.1: TÌM RANH GIỚI HEADER/DATA ---
+            split_point_index = detect_header_split_point(
+                raw_table_df, 
+                worksheet,
+                coords,
+                merged_map,
+                border_threshold=border_threshold,
+                strategy=header_strategy
+            )
+            
+            if split_point_index == -1:
+                print(f"\n--- Kết quả Bảng {i+1}: Không thể xác định ranh giới Header/Data ---")
+                continue
+            if split_point_index >= len(raw_table_df.index):
+                print(f"\n--- Kết quả Bảng {i+1}: Ranh giới ({split_point_index}) vượt quá số hàng.")
+                continue
+            
+            header_df = raw_table_df.iloc[0 : split_point_index]
+            data_df = raw_table_df.iloc[split_point_index : ]
+            
+            try:
+                # --- BƯỚC 2.2 & 2.3: RANH GIỚI THUỘC TÍNH + BẢN ĐỒ HEADER (có nhớ) ---
+                attribute_cols, data_cols, header_map = analyze_header(header_df)
+                data_df = infer_column_types(data_df, data_cols)
+                
+                # --- BƯỚC 2.4: LẮP RÁP JSON ---
+                if table_workers > 1:
+                    json_output = parse_table_to_long_json_sharded(
+                        header_df,
+                        data_df,
+                        attribute_cols,
+                        data_cols,
+                        workers=table_workers,
+                        header_map=header_map
+                    )
+                else:
+                    json_output = parse_table_to_long_json(
+                        header_df, 
+                        data_df, 
+                        attribute_cols, 
+                        data_cols,
+                        header_map=header_map
+                    )
+                all_parsed_data.extend(json_output)
+                if layouts is not None:
+                    layouts.append({'boundary': dict(coords), 'split': split_point_index,
+                                    'attribute_cols': attribute_cols, 'data_cols': data_cols,
+                                    'header_map': header_map,
+                                    'header_df': header_df.reset_index(drop=True)})
+                print(f"\n--- [GIAI ĐOẠN 2] Parse Bảng {i+1} thành công. Tạo ra {len(json_output)} bản ghi JSON.")
+            except Exception as e:
+                print(f"LỖI khi parse Bảng {i+1}: {e}")
+                import traceback
+                traceback.print_exc()
+            
+            print("-" * 30)
+        
+        return all_parsed_data
+    finally:
+        if wb is not None:
+            wb.close()
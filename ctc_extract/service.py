@@ -0,0 +1,400 @@
+"""
+API bất đồng bộ (asyncio) cho pipeline trích xuất.
+
+Phần nặng CPU (đọc XML, phát hiện bảng, parse JSON) chạy trong một
+`ProcessPoolExecutor` có giới hạn, nên event loop của service upload không bị
+chặn và nhiều file được xử lý song song.
+
+    async with ExtractionService(max_workers=4) as service:
+        result = await service.extract("Book1.xlsx", ExtractOptions(sheets=["Sheet1"]), timeout=60)
+
+    # Hoặc dùng service mặc định của module:
+    result = await extract_workbook(data_bytes)
+
+Entry point mỏng:
+    python -m ctc_extract.service stdin  < danh_sach_file.txt   (mỗi dòng 1 đường dẫn -> 1 dòng NDJSON)
+    python -m ctc_extract.service serve --port 8080             (POST /extract, body = file .xlsx)
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Dict, List, NamedTuple, Optional, Union
+from urllib.parse import parse_qs, urlsplit
+
+# Không nạp pandas / openpyxl
+from .detection import DETECTION_MODES, ENGINES
+from .header_split import HEADER_SPLIT_STRATEGIES
+
+
+Source = Union[str, bytes]
+
+# Kích thước body tối đa của một yêu cầu HTTP (file .xlsx), mặc định 100 MiB
+MAX_BODY_BYTES = 100 * 2 ** 20
+
+
+class ExtractOptions(NamedTuple):
+    """Tham số của một lần trích xuất (picklable để gửi sang worker)."""
+    sheets: Optional[List[str]] = None   # None = tất cả các sheet
+    min_width: int = 2
+    min_height: int = 2
+    border_threshold: float = 0.98
+    engine: str = "bfs"
+    header_strategy: Optional[str] = None   # None = mặc định theo `detection`
+    detection: str = "borders"              # "borders" hoặc "values" (không đọc style)
+    template_dir: Optional[str] = None      # thư mục template bố cục (xem `templates`)
+    table_workers: int = 1                  # > 1: chia hàng của bảng lớn cho nhiều process
+    structured: bool = False                # Excel Table / defined name làm bảng có sẵn
+
+
+# ======================================================================
+# PHẦN CHẠY TRONG WORKER (đồng bộ)
+# ======================================================================
+
+def extract_workbook_sync(source: Source, options: Optional[ExtractOptions] = None) -> Dict[str, Any]:
+    """
+    Trích xuất các sheet của một workbook (chạy đồng bộ, trong process hiện tại).
+
+    Workbook được mở một lần (bộ đọc native, fallback openpyxl); bảng chuỗi và
+    style dùng chung cho mọi sheet.
+
+    Returns:
+        {"sheets": {tên sheet: [bản ghi JSON...]}, "errors": {tên sheet: lỗi}, "elapsed": giây}
+    """
+    # Import ở đây: process cha (event loop) không cần nạp pandas/openpyxl
+    from .pipeline import extract_sheet
+    from .templates import TemplateStore, extract_sheet_templated
+    from .xlsx_reader import XlsxWorkbook, as_seekable, rewind
+
+    options = options or ExtractOptions()
+    started = time.perf_counter()
+    file_like = as_seekable(source)
+
+    try:
+        workbook = XlsxWorkbook(file_like, values_only=options.detection == "values")
+        close = workbook.close
+        get_sheet = workbook.__getitem__
+    except Exception as e:
+        print(f"⚠ Bộ đọc native không đọc được file ({e}). Chuyển sang openpyxl...")
+        import openpyxl
+        
+        workbook = openpyxl.load_workbook(rewind(file_like), data_only=True)
+        close = workbook.close
+        get_sheet = workbook.__getitem__
+
+    store = TemplateStore(options.template_dir) if options.template_dir else None
+
+    sheets: Dict[str, List[Dict[str, Any]]] = {}
+    errors: Dict[str, str] = {}
+    try:
+        for sheet_name in options.sheets or workbook.sheetnames:
+            if sheet_name not in workbook.sheetnames:
+                errors[sheet_name] = "Không tìm thấy sheet"
+                continue
+            try:
+                sheet_options = dict(
+                    min_width=options.min_width,
+                    min_height=options.min_height,
+                    border_threshold=options.border_threshold,
+                    engine=options.engine,
+                    header_strategy=options.header_strategy,
+                    detection=options.detection,
+                    table_workers=options.table_workers,
+                    structured=options.structured,
+                )
+                if store is not None:
+                    sheets[sheet_name] = extract_sheet_templated(
+                        file_like, sheet_name, store, get_sheet(sheet_name),
+                        sheetnames=workbook.sheetnames, **sheet_options)
+                else:
+                    sheets[sheet_name] = extract_sheet(file_like, sheet_name, get_sheet(sheet_name),
+                                                       **sheet_options)
+            except Exception as e:
+                errors[sheet_name] = f"{type(e).__name__}: {e}"
+    finally:
+        close()
+
+    return {"sheets": sheets, "errors": errors,
+            "elapsed": round(time.perf_counter() - started, 3)}
+
+
+def _worker_extract(source: Source, options: ExtractOptions) -> Dict[str, Any]:
+    # Log của pipeline (print) sang stderr để stdout chỉ còn kết quả
+    with contextlib.redirect_stdout(sys.stderr):
+        return extract_workbook_sync(source, options)
+
+
+# ======================================================================
+# SERVICE BẤT ĐỒNG BỘ
+# ======================================================================
+
+class ExtractionService:
+    """
+    Pool process có giới hạn + semaphore giới hạn số yêu cầu đồng thời.
+
+    Args:
+        max_workers: Số process (mặc định = số CPU).
+        max_concurrency: Số yêu cầu được gửi vào pool cùng lúc (mặc định
+                         = max_workers); các yêu cầu khác chờ ở semaphore.
+
+    Timeout / huỷ: người gọi nhận lỗi ngay, nhưng job đã gửi vào pool KHÔNG bị
+    dừng (process pool không dừng được giữa chừng) - worker chạy tiếp đến hết,
+    kết quả bị bỏ qua, và job vẫn giữ slot của semaphore cho đến khi xong. Nhờ
+    vậy số job thực sự chạy trong pool không bao giờ vượt `max_concurrency`.
+
+    Service có thể được tạo ngoài event loop: semaphore chỉ được tạo khi dùng
+    (trong loop đang chạy), và tạo lại nếu service được dùng trong loop khác
+    (ví dụ nhiều lần `asyncio.run`).
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_concurrency: Optional[int] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_concurrency = max_concurrency or self.max_workers
+        self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        # Python 3.8/3.9: Semaphore gắn với loop lúc tạo -> tạo trong loop đang chạy
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def extract(self, source: Source,
+                      options: Optional[ExtractOptions] = None,
+                      timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Trích xuất một workbook (đường dẫn hoặc bytes) trong pool.
+
+        Raises:
+            asyncio.TimeoutError: Quá `timeout` giây (tính cả thời gian chờ slot).
+                Worker vẫn chạy tiếp đến hết (xem docstring của lớp).
+            asyncio.CancelledError: Yêu cầu bị huỷ (như trên, worker không dừng).
+        """
+        options = options or ExtractOptions()
+        return await asyncio.wait_for(self._run(source, options), timeout)
+
+    async def _run(self, source: Source, options: ExtractOptions) -> Dict[str, Any]:
+        semaphore = self._slots()
+        await semaphore.acquire()
+        try:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._pool, _worker_extract, source, options)
+        except BaseException:
+            semaphore.release()
+            raise
+        # Slot chỉ được trả khi job trong pool thực sự xong - kể cả khi người gọi
+        # đã timeout / bị huỷ (`shield`: huỷ người gọi không huỷ job)
+        future.add_done_callback(partial(self._release_slot, semaphore))
+        return await asyncio.shield(future)
+
+    @staticmethod
+    def _release_slot(semaphore: asyncio.Semaphore, future: "asyncio.Future") -> None:
+        semaphore.release()
+        # Kết quả của job bị bỏ dở không ai đọc -> tránh log "exception was never retrieved"
+        if not future.cancelled():
+            future.exception()
+
+    def close(self, cancel_pending: bool = True) -> None:
+        if sys.version_info >= (3, 9):
+            self._pool.shutdown(wait=False, cancel_futures=cancel_pending)
+        else:
+            # Python 3.8: shutdown() chưa có cancel_futures
+            self._pool.shutdown(wait=False)
+
+    async def __aenter__(self) -> "ExtractionService":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+
+_default_service: Optional[ExtractionService] = None
+
+
+async def extract_workbook(path_or_bytes: Source,
+                           options: Optional[ExtractOptions] = None,
+                           timeout: Optional[float] = None) -> Dict[str, Any]:
+    """Trích xuất bằng service mặc định của module (tạo ở lần gọi đầu tiên)."""
+    global _default_service
+    if _default_service is None:
+        _default_service = ExtractionService()
+    return await _default_service.extract(path_or_bytes, options, timeout)
+
+
+# ======================================================================
+# ENTRY POINT: STDIN / HTTP
+# ======================================================================
+
+async def _run_stdin(service: ExtractionService, options: ExtractOptions, timeout: Optional[float]) -> None:
+    """Mỗi dòng stdin là 1 đường dẫn; in 1 dòng NDJSON cho mỗi file (theo thứ tự hoàn thành)."""
+    # Đọc stdin (chặn) trong thread, không chặn event loop
+    lines = await asyncio.get_running_loop().run_in_executor(None, sys.stdin.readlines)
+    paths = [line.strip() for line in lines if line.strip()]
+
+    async def one(path: str) -> Dict[str, Any]:
+        try:
+            result = await service.extract(path, options, timeout)
+        except asyncio.TimeoutError:
+            result = {"error": f"Quá thời gian ({timeout}s)"}
+        except Exception as e:
+            result = {"error": f"{type(e).__name__}: {e}"}
+        return {"file": path, **result}
+
+    for future in asyncio.as_completed([one(p) for p in paths]):
+        print(_to_json(await future), flush=True)
+
+
+def _to_json(payload: Dict[str, Any]) -> str:
+    # Ô ngày tháng (datetime / Timestamp) -> chuỗi ISO
+    return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+def _http_response(status: str, payload: Dict[str, Any]) -> bytes:
+    body = _to_json(payload).encode("utf-8")
+    head = (f"HTTP/1.1 {status}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n")
+    return head.encode("ascii") + body
+
+
+def _choice(query: Dict[str, List[str]], name: str, default: Any, choices: Any) -> Any:
+    value = query.get(name, [default])[0]
+    if value != default and value not in choices:
+        raise ValueError(f"{name} không hợp lệ: {value!r} (chọn một trong {sorted(choices)})")
+    return value
+
+
+def _options_from_query(query: Dict[str, List[str]], defaults: ExtractOptions) -> ExtractOptions:
+    """Tham số từ query string; giá trị sai -> ValueError (trả về 400)."""
+    sheets = query.get("sheets")
+    return defaults._replace(
+        sheets=[s for value in sheets for s in value.split(",") if s] if sheets else defaults.sheets,
+        min_width=int(query.get("min_width", [defaults.min_width])[0]),
+        min_height=int(query.get("min_height", [defaults.min_height])[0]),
+        border_threshold=float(query.get("border_threshold", [defaults.border_threshold])[0]),
+        engine=_choice(query, "engine", defaults.engine, ENGINES),
+        header_strategy=_choice(query, "header_strategy", defaults.header_strategy, HEADER_SPLIT_STRATEGIES),
+        detection=_choice(query, "detection", defaults.detection, DETECTION_MODES),
+    )
+
+
+def _content_length(headers: Dict[str, str], max_body_bytes: int) -> Union[int, bytes]:
+    """Độ dài body hợp lệ, hoặc response lỗi (400 / 413) nếu header sai / quá lớn."""
+    value = headers.get("content-length")
+    if value is None or not value.isdigit():
+        return _http_response("400 Bad Request", {"error": "Thiếu hoặc sai header Content-Length"})
+    length = int(value)
+    if length > max_body_bytes:
+        return _http_response("413 Payload Too Large",
+                              {"error": f"File quá lớn ({length} byte > {max_body_bytes} byte)"})
+    return length
+
+
+async def _handle_http(service: ExtractionService, defaults: ExtractOptions, timeout: Optional[float],
+                       max_body_bytes: int,
+                       reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """HTTP tối giản: `POST /extract?sheets=A,B&min_width=2`, body là nội dung file .xlsx."""
+    try:
+        request_line = (await reader.readline()).decode("latin-1").split()
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if len(request_line) < 2 or request_line[0] != "POST" or urlsplit(request_line[1]).path != "/extract":
+            writer.write(_http_response("404 Not Found", {"error": "Dùng POST /extract"}))
+            return
+        try:
+            options = _options_from_query(parse_qs(urlsplit(request_line[1]).query), defaults)
+        except ValueError as e:
+            writer.write(_http_response("400 Bad Request", {"error": str(e)}))
+            return
+
+        length = _content_length(headers, max_body_bytes)
+        if isinstance(length, bytes):
+            writer.write(length)
+            return
+        try:
+            body = await reader.readexactly(length)
+        except asyncio.IncompleteReadError:
+            # Client đóng kết nối trước khi gửi đủ body -> không còn ai để trả lời
+            return
+        try:
+            result = await service.extract(body, options, timeout)
+            writer.write(_http_response("200 OK", result))
+        except asyncio.TimeoutError:
+            writer.write(_http_response("504 Gateway Timeout", {"error": f"Quá thời gian ({timeout}s)"}))
+        except Exception as e:
+            writer.write(_http_response("500 Internal Server Error", {"error": f"{type(e).__name__}: {e}"}))
+    finally:
+        with contextlib.suppress(ConnectionError):
+            await writer.drain()
+        writer.close()
+
+
+async def _serve(service: ExtractionService, host: str, port: int,
+                 options: ExtractOptions, timeout: Optional[float],
+                 max_body_bytes: int = MAX_BODY_BYTES) -> None:
+    server = await asyncio.start_server(
+        lambda r, w: _handle_http(service, options, timeout, max_body_bytes, r, w), host, port)
+    print(f"Đang lắng nghe http://{host}:{port}/extract", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+
+async def _main(args: argparse.Namespace) -> None:
+    options = ExtractOptions(
+        sheets=args.sheets.split(",") if args.sheets else None,
+        min_width=args.min_width,
+        min_height=args.min_height,
+        border_threshold=args.border_threshold,
+        engine=args.engine,
+        header_strategy=args.header_strategy,
+        detection=args.detection,
+        template_dir=args.templates,
+        table_workers=args.table_workers,
+        structured=args.structured,
+    )
+    async with ExtractionService(args.workers, args.max_concurrency) as service:
+        if args.mode == "serve":
+            await _serve(service, args.host, args.port, options, args.timeout, args.max_body_bytes)
+        else:
+            await _run_stdin(service, options, args.timeout)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Service trích xuất bảng từ Excel.")
+    parser.add_argument("mode", choices=["stdin", "serve"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-concurrency", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=None, help="Giây cho mỗi file")
+    parser.add_argument("--max-body-bytes", type=int, default=MAX_BODY_BYTES,
+                        help="Kích thước body tối đa của một yêu cầu HTTP")
+    parser.add_argument("--sheets", default=None, help="Danh sách sheet, cách nhau bởi dấu phẩy")
+    parser.add_argument("--min-width", type=int, default=2)
+    parser.add_argument("--min-height", type=int, default=2)
+    parser.add_argument("--border-threshold", type=float, default=0.98)
+    parser.add_argument("--engine", choices=ENGINES, default="bfs")
+    parser.add_argument("--header-strategy", choices=sorted(HEADER_SPLIT_STRATEGIES), default=None)
+    parser.add_argument("--detection", choices=DETECTION_MODES, default="borders")
+    parser.add_argument("--templates", default=None, help="Thư mục template bố cục")
+    parser.add_argument("--table-workers", type=int, default=1,
+                        help="Số process lắp ráp một bảng lớn (chia theo hàng)")
+    parser.add_argument("--structured", action="store_true",
+                        help="Dùng Excel Table / defined name của sheet làm bảng có sẵn")
+    asyncio.run(_main(parser.parse_args()))
@@ -0,0 +1,178 @@
+"""
+Chuyển khối dữ liệu của một bảng sang process con qua `multiprocessing.shared_memory`
+thay vì pickle DataFrame object.
+
+Process cha chép các mảng kiểu cố định vào các block bộ nhớ dùng chung (một lần)
+và chỉ gửi cho worker một "handle" nhỏ (tên block, dtype, shape). Worker gắn vào
+block theo tên - không copy, không giải mã phần không dùng. Giá trị được mã hoá
+giống `grid_cache`: số -> float64, chuỗi / giá trị khác -> mã int32 trỏ vào bảng
+giá trị (dictionary encoding). Bảng giá trị và metadata cột đi trong handle (qua
+kênh IPC của pool) - không bao giờ giải pickle dữ liệu đọc từ block dùng chung,
+vì process nào mở được tên block cũng ghi được vào đó.
+
+    with share_frame(data_df) as shared:
+        pool.map(worker, repeat(shared.handle), ...)   # worker: attach_frame(handle, start, end)
+
+Bên tạo (`SharedArrays`) chịu trách nhiệm giải phóng block (`close()` / `with`).
+
+Phạm vi: chỉ khối dữ liệu của bảng được chia sẻ, vì đó là phần duy nhất đi
+sang process khác (`parse_table_to_long_json_sharded`). Lưới style index và
+ma trận cạnh border của `SheetGrid` chỉ được dùng ở process cha (phát hiện
+bảng, tách header - chạy trước khi chia shard) nên không được đưa vào shared
+memory; `SharedArrays` dùng lại được nếu sau này có worker cần chúng.
+"""
+
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .grid_cache import _decode_values, _encode_values
+
+# Handle: { "arrays": { tên: (tên block, dtype, shape) }, ...metadata picklable }
+SharedHandle = Dict[str, Any]
+
+
+class SharedArrays:
+    """
+    Các mảng NumPy đặt trong shared memory (phía process cha).
+
+    Args:
+        arrays: { tên: mảng } - được chép vào block mới.
+        **meta: Metadata (bảng giá trị, tên cột...), gửi thẳng trong handle.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], **meta: Any):
+        self._blocks: List[shared_memory.SharedMemory] = []
+        self.handle: SharedHandle = {"arrays": {}, **meta}
+        try:
+            for name, array in arrays.items():
+                array = np.ascontiguousarray(array)
+                # Block rỗng không tạo được -> tối thiểu 1 byte
+                block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                self._blocks.append(block)
+                np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+                self.handle["arrays"][name] = (block.name, array.dtype.str, array.shape)
+        except BaseException:
+            self.close()
+            raise
+
+    @property
+    def nbytes(self) -> int:
+        return sum(block.size for block in self._blocks)
+
+    def close(self) -> None:
+        """Đóng và xoá (unlink) mọi block."""
+        for block in self._blocks:
+            block.close()
+            try:
+                block.unlink()
+            except FileNotFoundError:
+                pass
+        self._blocks = []
+
+    def __enter__(self) -> "SharedArrays":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class AttachedArrays:
+    """
+    Phía worker: các mảng gắn vào block của `SharedArrays` theo tên (không copy).
+    Các mảng chỉ dùng được khi chưa `close()`; dữ liệu cần giữ lại phải copy ra.
+    """
+
+    def __init__(self, handle: SharedHandle):
+        self.handle = handle
+        self._blocks: List[shared_memory.SharedMemory] = []
+        self.arrays: Dict[str, np.ndarray] = {}
+        try:
+            for name, (block_name, dtype, shape) in handle["arrays"].items():
+                block = shared_memory.SharedMemory(name=block_name)
+                self._blocks.append(block)
+                self.arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        """Chỉ đóng (không xoá) block - bên tạo sẽ xoá."""
+        self.arrays = {}
+        for block in self._blocks:
+            block.close()
+        self._blocks = []
+
+    def __enter__(self) -> "AttachedArrays":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+# ======================================================================
+# BẢNG (DataFrame)
+# ======================================================================
+
+def _is_plain_array(dtype: Any) -> bool:
+    # Số và datetime64 NumPy: chia sẻ nguyên mảng (datetime64 không qua Timestamp)
+    return isinstance(dtype, np.dtype) and dtype.kind in "iufbM"
+
+
+def share_frame(df: "pd.DataFrame") -> SharedArrays:
+    """
+    Đặt một DataFrame vào shared memory: cột số (int/float/bool) và datetime64
+    giữ nguyên mảng của nó, các cột còn lại được mã hoá chung (kinds/numbers/codes, mỗi
+    cột một hàng của mảng 2D) với một bảng giá trị duy nhất.
+    """
+    arrays: Dict[str, np.ndarray] = {}
+    object_cols: List[int] = []
+    for position, dtype in enumerate(df.dtypes):
+        if _is_plain_array(dtype):
+            arrays[f"col{position}"] = df.iloc[:, position].to_numpy()
+        else:
+            object_cols.append(position)
+
+    objects: List[Any] = []
+    if object_cols:
+        # Thứ tự theo cột: các hàng của một cột nằm liền nhau
+        block = df.iloc[:, object_cols].to_numpy(dtype=object).ravel(order="F")
+        encoded = _encode_values(block)
+        shape = (len(object_cols), len(df))
+        for name in ("kinds", "numbers", "codes"):
+            arrays[name] = encoded[name].reshape(shape)
+        objects = encoded["objects"]
+
+    return SharedArrays(arrays, objects=objects,
+                        columns=df.columns.tolist(), object_cols=object_cols,
+                        num_rows=len(df))
+
+
+def attach_frame(handle: SharedHandle, start: int = 0, end: Optional[int] = None) -> "pd.DataFrame":
+    """
+    Dựng lại các hàng [start, end) của DataFrame đã `share_frame` (index
+    0-based theo vị trí hàng). Chỉ giải mã phần được yêu cầu; kết quả không
+    còn tham chiếu tới shared memory.
+    """
+    import pandas as pd
+
+    end = handle["num_rows"] if end is None else end
+    object_position = {position: i for i, position in enumerate(handle["object_cols"])}
+
+    with AttachedArrays(handle) as attached:
+        objects = handle["objects"]
+        data = {}
+        for position in range(len(handle["columns"])):
+            i = object_position.get(position)
+            if i is None:
+                data[position] = attached.arrays[f"col{position}"][start:end].copy()
+            else:
+                data[position] = _decode_values(attached.arrays["kinds"][i, start:end],
+                                                attached.arrays["numbers"][i, start:end],
+                                                attached.arrays["codes"][i, start:end],
+                                                objects)
+
+    df = pd.DataFrame(data, index=pd.RangeIndex(start, end))
+    df.columns = handle["columns"]
+    return df
@@ -0,0 +1,216 @@
+"""
+Template bố cục cho các báo cáo định kỳ (cùng mẫu, chỉ số liệu thay đổi).
+
+Lần đầu gặp một mẫu, sheet được xử lý đầy đủ (`extract_sheet`) và "bố cục" của
+từng bảng được lưu lại: tọa độ bảng, ranh giới header/data, cột thuộc tính/dữ
+liệu, bản đồ header và giá trị các ô header. Các file sau cùng chữ ký cấu trúc
+(tên các sheet, kích thước sheet, tham số trích xuất) chỉ cần đọc giá trị, so
+khớp các ô header rồi lắp ráp JSON - không dựng heatmap, không tìm cụm, không
+quét border để tách header. Header khác template -> chạy lại đầy đủ và ghi đè.
+
+    store = TemplateStore("templates/")
+    records = extract_sheet_templated("chi_nhanh_A_2024-05-01.xlsx", "Sheet1", store)
+
+Bố cục:
+    <thư mục template>/<chữ ký>.json - {"version", "sheet", "tables": [bố cục từng bảng]}
+
+Template là JSON thuần (tọa độ, chỉ số, giá trị ô header qua `value_to_json`),
+không pickle: thư mục template có thể dùng chung, đọc template không được chạy mã.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from functools import partial
+from typing import Any, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from .detection import debug_extract_data, load_worksheet
+from .grid_cache import value_from_json, value_to_json
+from .long_format import infer_column_types, parse_table_to_long_json, parse_table_to_long_json_sharded
+from .pipeline import extract_sheet
+from .xlsx_reader import WorkbookSource, XlsxWorkbook, as_seekable, rewind
+
+
+TEMPLATE_VERSION = 2
+
+# Tham số chỉ ảnh hưởng cách chạy, không ảnh hưởng bố cục -> không đưa vào chữ ký
+_EXECUTION_OPTIONS = ("table_workers",)
+
+
+class TemplateStore:
+    """
+    Thư mục chứa template, mỗi chữ ký một file. Template đã đọc được giữ trong
+    bộ nhớ cho các lần tra sau (cùng một lượt chạy).
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._loaded: Dict[str, Dict[str, Any]] = {}
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Template của chữ ký `key`, None nếu chưa có / hỏng / khác phiên bản."""
+        template = self._loaded.get(key)
+        if template is not None:
+            return template
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                template = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(template, dict) or template.get("version") != TEMPLATE_VERSION:
+            return None
+        self._loaded[key] = template
+        return template
+
+    def put(self, key: str, template: Dict[str, Any]) -> None:
+        """
+        Ghi template (dict JSON được, xem `_layout_to_json`) - ghi file tạm rồi
+        đổi tên, an toàn khi nhiều process cùng ghi.
+        """
+        template = {"version": TEMPLATE_VERSION, **template}
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=self.directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(template, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._loaded[key] = template
+
+
+def sheet_signature(sheetnames: Sequence[str], worksheet: Any, options: Dict[str, Any]) -> str:
+    """
+    Chữ ký cấu trúc của một sheet: tên các sheet của workbook, tên + kích thước
+    sheet và các tham số trích xuất (template của tham số khác không dùng lại).
+    """
+    payload = json.dumps({
+        "sheets": list(sheetnames),
+        "sheet": worksheet.title,
+        "dimension": [worksheet.max_row, worksheet.max_column],
+        "options": {k: v for k, v in options.items() if k not in _EXECUTION_OPTIONS},
+    }, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:20]
+
+
+def _header_cells(header_df: pd.DataFrame) -> List[List[Any]]:
+    """
+    Giá trị các ô header dạng JSON (ô trống -> None) để lưu và so khớp. So
+    theo giá trị: kiểu cột có thể đổi theo số liệu (2024 và 2024.0 là một).
+    """
+    return [[None if pd.isna(value) else value_to_json(value) for value in row]
+            for row in header_df.to_numpy(dtype=object).tolist()]
+
+
+def _layout_to_json(layout: Dict[str, Any]) -> Dict[str, Any]:
+    """Bố cục một bảng (từ `extract_sheet(layouts=...)`) -> dict JSON."""
+    return {
+        "boundary": {k: int(v) for k, v in layout["boundary"].items()},
+        "split": int(layout["split"]),
+        "attribute_cols": [int(c) for c in layout["attribute_cols"]],
+        "data_cols": [int(c) for c in layout["data_cols"]],
+        "header_map": [[int(c), [value_to_json(v) for v in path]]
+                       for c, path in layout["header_map"].items()],
+        "header": _header_cells(layout["header_df"]),
+    }
+
+
+def _layout_from_json(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Ngược lại của `_layout_to_json` (header giữ dạng JSON để so khớp)."""
+    return {
+        **data,
+        "header_map": {c: [value_from_json(v) for v in path] for c, path in data["header_map"]},
+    }
+
+
+def _extract_with_template(file_path: WorkbookSource, sheet_name: str, worksheet: Any,
+                           layouts: List[Dict[str, Any]],
+                           table_workers: int = 1) -> Optional[List[Dict[str, Any]]]:
+    """
+    Lắp ráp JSON theo bố cục đã lưu. Trả về None nếu header của một bảng
+    không còn khớp (người gọi chạy lại phát hiện bảng).
+    """
+    all_parsed_data = []
+    for layout in layouts:
+        raw_table_df = debug_extract_data(file_path, sheet_name, layout['boundary'], worksheet)
+        split = layout['split']
+        if raw_table_df.empty or split >= len(raw_table_df.index):
+            return None
+
+        header_df = raw_table_df.iloc[0:split]
+        if _header_cells(header_df) != layout['header']:
+            return None
+
+        assemble = parse_table_to_long_json
+        if table_workers > 1:
+            assemble = partial(parse_table_to_long_json_sharded, workers=table_workers)
+        all_parsed_data.extend(assemble(
+            header_df,
+            infer_column_types(raw_table_df.iloc[split:], layout['data_cols']),
+            layout['attribute_cols'],
+            layout['data_cols'],
+            header_map=layout['header_map']
+        ))
+    return all_parsed_data
+
+
+def extract_sheet_templated(file_path: WorkbookSource, sheet_name: str, store: TemplateStore,
+                            worksheet: Optional[Any] = None,
+                            sheetnames: Optional[Sequence[str]] = None,
+                            **options: Any) -> List[Dict[str, Any]]:
+    """
+    Như `extract_sheet` (cùng kết quả), nhưng dùng template của `store` khi
+    sheet khớp chữ ký cấu trúc và giá trị các ô header.
+
+    Args:
+        worksheet: Sheet đã tải (`load_worksheet`). None -> tự tải.
+        sheetnames: Tên các sheet của workbook (None -> đọc từ file).
+        **options: Tham số của `extract_sheet` (min_width, border_threshold...).
+    """
+    file_path = as_seekable(file_path)
+    wb = None
+    if worksheet is None:
+        worksheet, wb = load_worksheet(file_path, sheet_name,
+                                       values_only=options.get("detection") == "values")
+    try:
+        if sheetnames is None:
+            if wb is not None:
+                sheetnames = wb.sheetnames
+            else:
+                with XlsxWorkbook(rewind(file_path)) as workbook:
+                    sheetnames = workbook.sheetnames
+
+        key = sheet_signature(sheetnames, worksheet, options)
+        template = store.get(key)
+        try:
+            layouts = [_layout_from_json(layout) for layout in template["tables"]] if template else None
+        except (KeyError, TypeError, ValueError):
+            # Template sai cấu trúc -> coi như chưa có
+            layouts = None
+        if layouts is not None:
+            records = _extract_with_template(file_path, sheet_name, worksheet, layouts,
+                                             table_workers=options.get("table_workers", 1))
+            if records is not None:
+                print(f"✓ Template {key}: {len(layouts)} bảng, bỏ qua phát hiện bảng.")
+                return records
+            print(f"⚠ Header khác template {key}, chạy lại phát hiện bảng...")
+
+        layouts = []
+        records = extract_sheet(file_path, sheet_name, worksheet, layouts=layouts, **options)
+        try:
+            store.put(key, {"sheet": sheet_name, "tables": [_layout_to_json(layout) for layout in layouts]})
+        except (OSError, TypeError) as e:
+            # Không ghi được template (thư mục chỉ đọc...) -> vẫn trả kết quả
+            print(f"⚠ Không ghi được template: {e}")
+        return records
+    finally:
+        if wb is not None:
+            wb.close()
@@ -0,0 +1,788 @@
+"""
+Bộ đọc XLSX "nhẹ" (native) - không dựng object Cell / style proxy của openpyxl.
+
+Pipeline chỉ cần 3 thứ từ một sheet:
+  1. Giá trị ô
+  2. Chỉ số style (để tra border)
+  3. Các dải ô gộp
+
+Module này đọc trực tiếp `xl/worksheets/sheetN.xml`, `sharedStrings.xml` và
+`styles.xml` bằng `iterparse` (streaming) và trả về `SheetGrid`:
+mảng giá trị + mảng style index (dạng toạ độ, chỉ các ô có trong XML).
+
+`SheetGrid` cung cấp một phần giao diện của openpyxl `Worksheet`
+(`max_row`, `max_column`, `merged_cells.ranges`, `cell(row, column).border`,
+`tables.items()`) nên các hàm hiện có dùng được mà không cần sửa. Các vùng của
+defined name (named range) trỏ vào sheet nằm trong `defined_ranges`.
+"""
+
+import datetime
+import io
+import os
+import posixpath
+import re
+import zipfile
+from typing import IO, Any, Dict, List, NamedTuple, Optional, Tuple, Union
+from xml.etree.ElementTree import iterparse
+
+import numpy as np
+
+
+_NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_NS_DOC_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+_TAG_C = _NS_MAIN + "c"
+_TAG_V = _NS_MAIN + "v"
+_TAG_T = _NS_MAIN + "t"
+_TAG_R = _NS_MAIN + "r"
+_TAG_IS = _NS_MAIN + "is"
+_TAG_ROW = _NS_MAIN + "row"
+_TAG_SI = _NS_MAIN + "si"
+_TAG_MERGE_CELL = _NS_MAIN + "mergeCell"
+
+_REL_TYPE_STYLES = "/styles"
+_REL_TYPE_SHARED_STRINGS = "/sharedStrings"
+_REL_TYPE_TABLE = "/table"
+
+# --- Định dạng số (tương thích openpyxl.styles.numbers) ---
+# Các định dạng dựng sẵn là ngày/giờ (ID theo chuẩn ECMA-376)
+_BUILTIN_FORMATS = {
+    14: 'mm-dd-yy', 15: 'd-mmm-yy', 16: 'd-mmm', 17: 'mmm-yy',
+    18: 'h:mm AM/PM', 19: 'h:mm:ss AM/PM', 20: 'h:mm', 21: 'h:mm:ss',
+    22: 'm/d/yy h:mm', 45: 'mm:ss', 46: '[h]:mm:ss', 47: 'mmss.0',
+}
+_STRIP_RE = re.compile(r'".*?"|\[(?!hh?\]|mm?\]|ss?\])[^\]]*\]')
+_DATE_CHAR_RE = re.compile(r"(?<![_\\])[dmhysDMHYS]")
+_TIMEDELTA_RE = re.compile(r'\[hh?\](:mm(:ss(\.0*)?)?)?|\[mm?\](:ss(\.0*)?)?|\[ss?\](\.0*)?', re.I)
+
+_WINDOWS_EPOCH = datetime.datetime(1899, 12, 30)
+_MAC_EPOCH = datetime.datetime(1904, 1, 1)
+_SECS_PER_DAY = 86400
+
+_CELL_REF_RE = re.compile(r"^\$?([A-Za-z]{1,3})\$?(\d+)$")
+# Một vùng trong công thức của defined name: Sheet1!$A$1:$C$9 hoặc 'Tên sheet'!A1
+_NAME_AREA_RE = re.compile(r"(?:'((?:[^']|'')+)'|([^'!,()\s]+))!(\$?[A-Za-z]{1,3}\$?\d+(?::\$?[A-Za-z]{1,3}\$?\d+)?)")
+
+# Nguồn workbook: đường dẫn, nội dung file (bytes) hoặc stream nhị phân
+WorkbookSource = Union[str, "os.PathLike[str]", bytes, bytearray, memoryview, IO[bytes]]
+
+
+class CellError(str):
+    """Giá trị lỗi của ô (ví dụ '#N/A'). Là `str` nên dùng như giá trị của openpyxl."""
+
+
+class BorderSide(NamedTuple):
+    style: Optional[str]
+
+
+class CellBorder(NamedTuple):
+    left: BorderSide
+    right: BorderSide
+    top: BorderSide
+    bottom: BorderSide
+
+    @property
+    def has_any(self) -> bool:
+        """Chỉ cần 1 cạnh có style là coi như ô đó có border."""
+        return bool(self.left.style or self.right.style or self.top.style or self.bottom.style)
+
+
+_NO_BORDER = CellBorder(BorderSide(None), BorderSide(None), BorderSide(None), BorderSide(None))
+
+
+class GridCell(NamedTuple):
+    value: Any
+    border: CellBorder
+
+
+class MergedRange(NamedTuple):
+    """Tương tự openpyxl `CellRange`: bounds = (min_col, min_row, max_col, max_row)."""
+    bounds: Tuple[int, int, int, int]
+
+
+class MergedCells(NamedTuple):
+    ranges: List[MergedRange]
+
+
+class SheetStyles(NamedTuple):
+    """
+    Thông tin style theo từng chỉ số xf (thuộc tính `s` của ô).
+    """
+    borders: List[CellBorder]            # border của từng xf
+    has_border: np.ndarray               # bool, True nếu xf có ít nhất 1 cạnh
+    date_styles: frozenset               # các xf định dạng ngày/giờ
+    timedelta_styles: frozenset          # các xf định dạng khoảng thời gian ([h]:mm...)
+
+
+# ======================================================================
+# TIỆN ÍCH
+# ======================================================================
+
+def column_index(letters: str) -> int:
+    """'A' -> 1, 'AD' -> 30 (1-indexed)."""
+    idx = 0
+    for ch in letters.upper():
+        idx = idx * 26 + (ord(ch) - 64)
+    return idx
+
+
+def parse_cell_ref(ref: str) -> Tuple[int, int]:
+    """'B3' -> (3, 2) = (row, col), 1-indexed."""
+    match = _CELL_REF_RE.match(ref)
+    if not match:
+        raise ValueError(f"Toạ độ ô không hợp lệ: {ref!r}")
+    return int(match.group(2)), column_index(match.group(1))
+
+
+def parse_range_ref(ref: str) -> Tuple[int, int, int, int]:
+    """'A3:C5' -> (min_col, min_row, max_col, max_row), giống openpyxl `range_boundaries`."""
+    start, _, end = ref.partition(":")
+    min_row, min_col = parse_cell_ref(start)
+    max_row, max_col = parse_cell_ref(end) if end else (min_row, min_col)
+    return min_col, min_row, max_col, max_row
+
+
+def defined_name_destinations(formula: str) -> List[Tuple[str, str]]:
+    """
+    Các vùng ô mà công thức của một defined name trỏ tới:
+    "'Báo cáo'!$A$1:$C$9,Sheet2!B2" -> [("Báo cáo", "$A$1:$C$9"), ("Sheet2", "B2")].
+    Tên trỏ tới hằng số / công thức khác trả về list rỗng.
+    """
+    return [((quoted.replace("''", "'") if quoted else plain), ref)
+            for quoted, plain, ref in _NAME_AREA_RE.findall(formula or "")]
+
+
+def _is_date_format(fmt: Optional[str]) -> bool:
+    if fmt is None:
+        return False
+    fmt = _STRIP_RE.sub("", fmt.split(";")[0])
+    return _DATE_CHAR_RE.search(fmt) is not None
+
+
+def _is_timedelta_format(fmt: Optional[str]) -> bool:
+    if fmt is None:
+        return False
+    return _TIMEDELTA_RE.search(fmt.split(";")[0]) is not None
+
+
+def from_excel(value: float, epoch: datetime.datetime = _WINDOWS_EPOCH, timedelta: bool = False) -> Any:
+    """Chuyển số serial của Excel sang datetime/time/timedelta (giống openpyxl)."""
+    if timedelta:
+        td = datetime.timedelta(days=value)
+        if td.microseconds:
+            td = datetime.timedelta(seconds=td.total_seconds() // 1,
+                                    microseconds=round(td.microseconds, -3))
+        return td
+
+    day, fraction = divmod(value, 1)
+    diff = datetime.timedelta(milliseconds=round(fraction * _SECS_PER_DAY * 1000))
+    if 0 <= value < 1 and diff.days == 0:
+        mins, seconds = divmod(diff.seconds, 60)
+        hours, mins = divmod(mins, 60)
+        return datetime.time(hours, mins, seconds, diff.microseconds)
+    if 0 < value < 60 and epoch == _WINDOWS_EPOCH:
+        day += 1
+    return epoch + datetime.timedelta(days=day) + diff
+
+
+# Giới hạn của datetime Python (ngoài khoảng -> lỗi như `from_excel`)
+_DATETIME64_MIN = np.datetime64(datetime.datetime.min, "ms")
+_DATETIME64_MAX = np.datetime64(datetime.datetime.max, "ms")
+_MS_PER_DAY = _SECS_PER_DAY * 1000
+
+
+def _error_array(size: int) -> np.ndarray:
+    # np.full đổi CellError (lớp con của str) thành str -> dùng fill
+    array = np.empty(size, dtype=object)
+    array.fill(CellError("#VALUE!"))
+    return array
+
+
+def from_excel_array(serials: np.ndarray, epoch: datetime.datetime = _WINDOWS_EPOCH) -> np.ndarray:
+    """
+    `from_excel` (không timedelta) cho cả mảng serial trong một lượt NumPy.
+
+    Kết quả giống hệt từng ô qua `from_excel`: datetime (làm tròn mili giây),
+    time cho serial trong [0, 1), lỗi 1900 của Excel cho serial < 60. Serial
+    không chuyển được (NaN, vô cực, ngoài năm 1-9999) -> CellError("#VALUE!").
+    """
+    values = np.asarray(serials, dtype=np.float64)
+    result = _error_array(len(values))
+
+    with np.errstate(invalid="ignore"):
+        day, fraction = np.divmod(values, 1)
+        milliseconds = np.round(fraction * _SECS_PER_DAY * 1000)
+    if epoch == _WINDOWS_EPOCH:
+        day = day + ((values > 0) & (values < 60))
+    # Chặn trước khi đổi sang int64 (serial Excel hợp lệ < 3 triệu ngày)
+    finite = np.isfinite(values) & (np.abs(day) < 4e6)
+
+    is_time = finite & (values >= 0) & (values < 1) & (milliseconds < _MS_PER_DAY)
+    if is_time.any():
+        ms = milliseconds[is_time].astype(np.int64)
+        seconds, ms = np.divmod(ms, 1000)
+        minutes, seconds = np.divmod(seconds, 60)
+        hours, minutes = np.divmod(minutes, 60)
+        result[is_time] = [datetime.time(h, m, s, us * 1000) for h, m, s, us in
+                           zip(hours.tolist(), minutes.tolist(), seconds.tolist(), ms.tolist())]
+
+    is_datetime = finite & ~is_time
+    if is_datetime.any():
+        offset = (day[is_datetime].astype(np.int64) * _MS_PER_DAY +
+                  milliseconds[is_datetime].astype(np.int64))
+        stamps = np.datetime64(epoch, "ms") + offset.astype("timedelta64[ms]")
+        in_range = (stamps >= _DATETIME64_MIN) & (stamps <= _DATETIME64_MAX)
+        decoded = _error_array(len(stamps))
+        decoded[in_range] = stamps[in_range].astype(object)
+        result[is_datetime] = decoded
+    return result
+
+
+def _cast_number(text: str) -> Any:
+    if "." in text or "E" in text or "e" in text:
+        return float(text)
+    return int(text)
+
+
+def _text_content(element) -> str:
+    """Nội dung chuỗi của <si>/<is>: <t> trực tiếp + <t> trong các run <r> (bỏ phiên âm <rPh>)."""
+    parts = []
+    plain = element.find(_TAG_T)
+    if plain is not None:
+        parts.append(plain.text or "")
+    for run in element.iter(_TAG_R):
+        text = run.findtext(_TAG_T)
+        if text is not None:
+            parts.append(text)
+    return "".join(parts)
+
+
+# ======================================================================
+# NGUỒN WORKBOOK (ĐƯỜNG DẪN / BYTES / STREAM)
+# ======================================================================
+
+def is_path(source: WorkbookSource) -> bool:
+    return isinstance(source, (str, os.PathLike))
+
+
+def as_seekable(source: WorkbookSource) -> Union[str, "os.PathLike[str]", IO[bytes]]:
+    """
+    Chuẩn hoá nguồn workbook để đọc được nhiều lần mà không qua file tạm:
+    đường dẫn / stream seek được giữ nguyên, bytes -> `BytesIO`, stream không
+    seek được (HTTP, object store) được đọc MỘT lần vào bộ nhớ.
+    """
+    if is_path(source):
+        return source
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    seekable = getattr(source, "seekable", None)
+    if seekable is not None and seekable():
+        return source
+    return io.BytesIO(source.read())
+
+
+def rewind(source: WorkbookSource) -> WorkbookSource:
+    """Đưa stream về đầu trước khi một bộ đọc khác (openpyxl, pandas) dùng lại."""
+    if not is_path(source) and hasattr(source, "seek"):
+        source.seek(0)
+    return source
+
+
+# ======================================================================
+# ĐỌC CÁC PHẦN CỦA FILE
+# ======================================================================
+
+def _read_relationships(archive: zipfile.ZipFile, rels_path: str, base_dir: str) -> Dict[str, Tuple[str, str]]:
+    """Đọc file .rels -> { rId: (type, đường dẫn đầy đủ trong zip) }."""
+    rels = {}
+    if rels_path not in archive.namelist():
+        return rels
+    with archive.open(rels_path) as f:
+        for _, element in iterparse(f):
+            if element.tag == _NS_PKG_REL + "Relationship":
+                target = element.get("Target", "")
+                if element.get("TargetMode") == "External":
+                    continue
+                if target.startswith("/"):
+                    path = target.lstrip("/")
+                else:
+                    path = posixpath.normpath(posixpath.join(base_dir, target))
+                rels[element.get("Id")] = (element.get("Type", ""), path)
+    return rels
+
+
+def _read_shared_strings(archive: zipfile.ZipFile, path: Optional[str]) -> List[str]:
+    strings = []
+    if not path or path not in archive.namelist():
+        return strings
+    with archive.open(path) as f:
+        for _, element in iterparse(f):
+            if element.tag == _TAG_SI:
+                strings.append(_text_content(element))
+                element.clear()
+    return strings
+
+
+def _read_styles(archive: zipfile.ZipFile, path: Optional[str], borders: bool = True) -> SheetStyles:
+    """
+    `borders=False` (chế độ chỉ đọc giá trị): chỉ lấy định dạng số của từng xf
+    để giải mã ngày/giờ giống hệt chế độ thường; mọi xf coi như không có border.
+    """
+    border_list: List[CellBorder] = []
+    custom_formats: Dict[int, str] = {}
+    xfs: List[Tuple[int, int]] = []   # (numFmtId, borderId) của từng cellXfs/xf
+
+    if path and path in archive.namelist():
+        with archive.open(path) as f:
+            parent_stack = []
+            for event, element in iterparse(f, events=("start", "end")):
+                tag = element.tag
+                if event == "start":
+                    parent_stack.append(tag)
+                    continue
+                parent_stack.pop()
+                parent = parent_stack[-1] if parent_stack else None
+
+                if tag == _NS_MAIN + "numFmt":
+                    custom_formats[int(element.get("numFmtId"))] = element.get("formatCode")
+                elif tag == _NS_MAIN + "border" and parent == _NS_MAIN + "borders":
+                    if not borders:
+                        element.clear()
+                        continue
+                    sides = {}
+                    for side in ("left", "right", "top", "bottom"):
+                        child = element.find(_NS_MAIN + side)
+                        if child is None:
+                            # Chuẩn mới dùng start/end thay cho left/right
+                            alias = {"left": "start", "right": "end"}.get(side)
+                            child = element.find(_NS_MAIN + alias) if alias else None
+                        style = child.get("style") if child is not None else None
+                        sides[side] = BorderSide(style if style != "none" else None)
+                    border_list.append(CellBorder(**sides))
+                    element.clear()
+                elif tag == _NS_MAIN + "xf" and parent == _NS_MAIN + "cellXfs":
+                    xfs.append((int(element.get("numFmtId", 0)), int(element.get("borderId", 0))))
+
+    if not xfs:
+        xfs = [(0, 0)]
+
+    xf_borders = [border_list[border_id] if border_id < len(border_list) else _NO_BORDER
+                  for _, border_id in xfs]
+    date_styles = set()
+    timedelta_styles = set()
+    for idx, (fmt_id, _) in enumerate(xfs):
+        fmt = custom_formats.get(fmt_id, _BUILTIN_FORMATS.get(fmt_id))
+        if _is_date_format(fmt):
+            date_styles.add(idx)
+        if _is_timedelta_format(fmt):
+            timedelta_styles.add(idx)
+
+    return SheetStyles(
+        borders=xf_borders,
+        has_border=np.array([b.has_any for b in xf_borders], dtype=bool),
+        date_styles=frozenset(date_styles),
+        timedelta_styles=frozenset(timedelta_styles),
+    )
+
+
+def _read_workbook(archive: zipfile.ZipFile) -> Tuple[Dict[str, str], Dict[str, Tuple[str, str]],
+                                                   datetime.datetime, List[Tuple[str, str]]]:
+    """
+    Returns:
+        (sheet_paths, workbook_rels, epoch, defined_names)
+        sheet_paths: { tên sheet: đường dẫn xml trong zip } (giữ thứ tự)
+        defined_names: [(tên, công thức)], bỏ các tên ẩn và tên dựng sẵn
+                       (`_xlnm.Print_Area`...)
+    """
+    root_rels = _read_relationships(archive, "_rels/.rels", "")
+    workbook_path = next((path for rel_type, path in root_rels.values()
+                          if rel_type.endswith("/officeDocument")), "xl/workbook.xml")
+    base_dir = posixpath.dirname(workbook_path)
+    rels_path = posixpath.join(base_dir, "_rels", posixpath.basename(workbook_path) + ".rels")
+    workbook_rels = _read_relationships(archive, rels_path, base_dir)
+
+    sheet_paths: Dict[str, str] = {}
+    defined_names: List[Tuple[str, str]] = []
+    epoch = _WINDOWS_EPOCH
+    with archive.open(workbook_path) as f:
+        for _, element in iterparse(f):
+            if element.tag == _NS_MAIN + "workbookPr":
+                if element.get("date1904", "").lower() in ("1", "true"):
+                    epoch = _MAC_EPOCH
+            elif element.tag == _NS_MAIN + "sheet":
+                rel = workbook_rels.get(element.get(_NS_DOC_REL + "id"))
+                if rel is not None:
+                    sheet_paths[element.get("name")] = rel[1]
+            elif element.tag == _NS_MAIN + "definedName":
+                name = element.get("name", "")
+                hidden = element.get("hidden", "").lower() in ("1", "true")
+                if not hidden and not name.startswith("_xlnm."):
+                    defined_names.append((name, element.text or ""))
+    return sheet_paths, workbook_rels, epoch, defined_names
+
+
+def _read_sheet_tables(archive: zipfile.ZipFile, sheet_path: str) -> Dict[str, str]:
+    """Các Excel Table (ListObject) của sheet: { tên hiển thị: ref } (như `ws.tables.items()`)."""
+    base_dir = posixpath.dirname(sheet_path)
+    rels_path = posixpath.join(base_dir, "_rels", posixpath.basename(sheet_path) + ".rels")
+    tables: Dict[str, str] = {}
+    for rel_type, path in _read_relationships(archive, rels_path, base_dir).values():
+        if not rel_type.endswith(_REL_TYPE_TABLE) or path not in archive.namelist():
+            continue
+        with archive.open(path) as f:
+            # Chỉ cần thuộc tính của thẻ gốc <table>
+            for _, element in iterparse(f, events=("start",)):
+                if element.tag == _NS_MAIN + "table" and element.get("ref"):
+                    tables[element.get("displayName") or element.get("name") or path] = element.get("ref")
+                break
+    return tables
+
+
+# ======================================================================
+# SHEET GRID
+# ======================================================================
+
+class SheetGrid:
+    """
+    Kết quả đọc một sheet: các ô có trong XML dưới dạng mảng toạ độ.
+
+    Attributes:
+        title: Tên sheet.
+        rows, cols: np.int32, toạ độ 1-indexed của từng ô.
+        style_ids: np.int32, chỉ số xf (style) của từng ô.
+        values: np.ndarray(object), giá trị của từng ô (None nếu trống).
+        styles: `SheetStyles` của workbook.
+        merged_cells: giống `ws.merged_cells` của openpyxl.
+        tables: { tên: ref } các Excel Table của sheet (giống `ws.tables.items()`).
+        defined_ranges: [(tên, ref)] các vùng của defined name nằm trên sheet này.
+    """
+
+    def __init__(self, title: str, rows: np.ndarray, cols: np.ndarray,
+                 style_ids: np.ndarray, values: np.ndarray,
+                 merged_ranges: List[Tuple[int, int, int, int]],
+                 styles: SheetStyles,
+                 tables: Optional[Dict[str, str]] = None,
+                 defined_ranges: Optional[List[Tuple[str, str]]] = None):
+        self.title = title
+        self.rows = rows
+        self.cols = cols
+        self.style_ids = style_ids
+        self.values = values
+        self.styles = styles
+        self.merged_cells = MergedCells([MergedRange(b) for b in merged_ranges])
+        self.tables = dict(tables or {})
+        self.defined_ranges = list(defined_ranges or [])
+        self._cell_index: Optional[Dict[Tuple[int, int], int]] = None
+        self._has_value: Optional[np.ndarray] = None
+        self._last_data_row: Optional[int] = None
+
+        # Giống openpyxl: kích thước tính cả ô trong XML lẫn dải ô gộp
+        max_rows = [int(rows.max())] if len(rows) else []
+        max_cols = [int(cols.max())] if len(cols) else []
+        max_rows += [b[3] for b in merged_ranges]
+        max_cols += [b[2] for b in merged_ranges]
+        self.max_row = max(max_rows, default=1)
+        self.max_column = max(max_cols, default=1)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _index_of(self, row: int, column: int) -> Optional[int]:
+        if self._cell_index is None:
+            self._cell_index = {(r, c): i for i, (r, c) in
+                                enumerate(zip(self.rows.tolist(), self.cols.tolist()))}
+        return self._cell_index.get((row, column))
+
+    def cell(self, row: int, column: int) -> GridCell:
+        """Tra một ô (1-indexed). Ô không có trong XML -> giá trị None, style 0."""
+        i = self._index_of(row, column)
+        if i is None:
+            return GridCell(None, self.styles.borders[0])
+        return GridCell(self.values[i], self.styles.borders[self.style_ids[i]])
+
+    def style_id(self, row: int, column: int) -> int:
+        """Chỉ số style của một ô (1-indexed), 0 nếu ô không có trong XML."""
+        i = self._index_of(row, column)
+        return 0 if i is None else int(self.style_ids[i])
+
+    def bordered_cells(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Toạ độ (rows, cols, 1-indexed) của các ô trong XML có style chứa border.
+        Chỉ tỉ lệ với số ô trong XML, không phụ thuộc `max_row x max_column`.
+        (Chưa xét dải gộp - người gọi tự áp style ô cha cho ô con.)
+        """
+        mask = self.styles.has_border[self.style_ids]
+        return self.rows[mask], self.cols[mask]
+
+    def has_value(self) -> np.ndarray:
+        """Mask (bool, chỉ đọc) các ô trong XML có giá trị (khác None). Tính một lần cho mỗi grid."""
+        if self._has_value is None:
+            mask = np.fromiter((v is not None for v in self.values), dtype=bool, count=len(self.values))
+            mask.flags.writeable = False
+            self._has_value = mask
+        return self._has_value
+
+    @property
+    def last_data_row(self) -> int:
+        """Hàng cuối cùng (1-indexed) có ô có giá trị, 0 nếu sheet trống."""
+        if self._last_data_row is None:
+            has_value = self.has_value()
+            self._last_data_row = int(self.rows[has_value].max()) if has_value.any() else 0
+        return self._last_data_row
+
+    def table_frame(self, boundary: Dict[str, int]):
+        """
+        Đọc giá trị BÊN TRONG `boundary` (1-indexed) thành DataFrame,
+        giống `pd.read_excel(header=None, skiprows=..., nrows=..., usecols=...)`.
+        """
+        from pandas.io.parsers import TextParser
+
+        min_row, max_row = boundary['min_row'], boundary['max_row']
+        min_col, max_col = boundary['min_col'], boundary['max_col']
+
+        # pandas bỏ các hàng trống ở cuối sheet
+        max_row = min(max_row, self.last_data_row)
+
+        height = max_row - min_row + 1
+        width = max_col - min_col + 1
+        if height <= 0 or width <= 0:
+            import pandas as pd
+            return pd.DataFrame()
+
+        data = [[""] * width for _ in range(height)]
+        inside = ((self.rows >= min_row) & (self.rows <= max_row) &
+                  (self.cols >= min_col) & (self.cols <= max_col) & self.has_value())
+        for r, c, value in zip((self.rows[inside] - min_row).tolist(),
+                               (self.cols[inside] - min_col).tolist(),
+                               self.values[inside].tolist()):
+            data[r][c] = _pandas_cell_value(value)
+
+        return TextParser(data, header=None, skip_blank_lines=False).read()
+
+
+def _pandas_cell_value(value: Any) -> Any:
+    """Chuyển giá trị ô giống `pandas` (engine openpyxl) `_convert_cell`."""
+    if isinstance(value, CellError):
+        return np.nan
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        as_int = int(value)
+        return as_int if as_int == value else float(value)
+    return value
+
+
+# ======================================================================
+# WORKBOOK
+# ======================================================================
+
+class XlsxWorkbook:
+    """
+    Workbook mở "lười" (lazy): khi mở chỉ đọc `workbook.xml` (danh sách sheet).
+    `sharedStrings.xml` và `styles.xml` được parse ở lần đầu cần tới, còn XML
+    của từng sheet chỉ được parse khi sheet đó được yêu cầu (và được nhớ lại).
+
+    Với workbook nhiều sheet, lấy 1 sheet chỉ tốn chi phí của sheet đó
+    + bảng chuỗi/style dùng chung; lấy thêm sheet khác không phải mở lại file.
+
+        with XlsxWorkbook("Book1.xlsx") as wb:     # hoặc bytes / stream nhị phân
+            ws = wb["Sheet1"]
+
+    Với `values_only=True`, chỉ các ô có giá trị được giữ và `styles.xml` chỉ được
+    đọc phần định dạng số (không dựng border): ô ngày tháng vẫn được giải mã như
+    chế độ thường, nhưng không ô nào có border.
+
+    Raises (khi mở):
+        zipfile.BadZipFile / ValueError / SyntaxError: File không phải xlsx hợp lệ.
+    """
+
+    def __init__(self, source: WorkbookSource, values_only: bool = False):
+        self.values_only = values_only
+        self._archive = zipfile.ZipFile(rewind(as_seekable(source)))
+        try:
+            self._sheet_paths, workbook_rels, self._epoch, self._defined_names = _read_workbook(self._archive)
+        except KeyError as e:
+            # Thiếu workbook.xml - không để lẫn với KeyError "không có sheet"
+            self._archive.close()
+            raise ValueError(f"File không phải xlsx hợp lệ: {e}") from e
+        except BaseException:
+            self._archive.close()
+            raise
+        self._styles_path = next((p for t, p in workbook_rels.values()
+                                  if t.endswith(_REL_TYPE_STYLES)), None)
+        self._strings_path = next((p for t, p in workbook_rels.values()
+                                   if t.endswith(_REL_TYPE_SHARED_STRINGS)), None)
+        self._styles: Optional[SheetStyles] = None
+        self._shared_strings: Optional[List[str]] = None
+        self._sheets: Dict[str, SheetGrid] = {}
+
+    @property
+    def sheetnames(self) -> List[str]:
+        return list(self._sheet_paths)
+
+    @property
+    def styles(self) -> SheetStyles:
+        if self._styles is None:
+            self._styles = _read_styles(self._archive, self._styles_path, borders=not self.values_only)
+        return self._styles
+
+    @property
+    def shared_strings(self) -> List[str]:
+        if self._shared_strings is None:
+            self._shared_strings = _read_shared_strings(self._archive, self._strings_path)
+        return self._shared_strings
+
+    def __contains__(self, sheet_name: str) -> bool:
+        return sheet_name in self._sheet_paths
+
+    def __getitem__(self, sheet_name: str) -> SheetGrid:
+        grid = self._sheets.get(sheet_name)
+        if grid is None:
+            if sheet_name not in self._sheet_paths:
+                raise KeyError(f"Không tìm thấy sheet '{sheet_name}' trong file.")
+            with self._archive.open(self._sheet_paths[sheet_name]) as f:
+                grid = _parse_sheet_xml(f, sheet_name, self.shared_strings, self.styles, self._epoch,
+                                        values_only=self.values_only)
+            grid.tables = _read_sheet_tables(self._archive, self._sheet_paths[sheet_name])
+            grid.defined_ranges = self._defined_ranges(sheet_name)
+            self._sheets[sheet_name] = grid
+        return grid
+
+    def _defined_ranges(self, sheet_name: str) -> List[Tuple[str, str]]:
+        """Các vùng (tên, ref) của defined name trỏ vào `sheet_name`."""
+        # Tên toàn cục lẫn tên cục bộ (của bất kỳ sheet nào) đều xét theo vùng nó trỏ tới
+        return [(name, ref) for name, formula in self._defined_names
+                for target, ref in defined_name_destinations(formula) if target == sheet_name]
+
+    def close(self) -> None:
+        self._archive.close()
+
+    def __enter__(self) -> "XlsxWorkbook":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+# ======================================================================
+# HÀM CHÍNH
+# ======================================================================
+
+def read_sheet(source: WorkbookSource, sheet_name: str, values_only: bool = False) -> SheetGrid:
+    """
+    Đọc một sheet bằng bộ đọc native (không qua openpyxl).
+    Chỉ XML của sheet đó (cùng bảng chuỗi và style) được parse.
+    `values_only`: chỉ giữ ô có giá trị, không đọc border (xem `XlsxWorkbook`).
+
+    Raises:
+        KeyError: Không tìm thấy sheet.
+        zipfile.BadZipFile / ValueError / SyntaxError: File không phải xlsx hợp lệ
+            (người gọi nên fallback sang openpyxl).
+    """
+    with XlsxWorkbook(source, values_only=values_only) as workbook:
+        return workbook[sheet_name]
+
+
+def _parse_sheet_xml(source, title: str, shared_strings: List[str],
+                     styles: SheetStyles, epoch: datetime.datetime,
+                     values_only: bool = False) -> SheetGrid:
+    rows: List[int] = []
+    cols: List[int] = []
+    style_ids: List[int] = []
+    values: List[Any] = []
+    merged_ranges: List[Tuple[int, int, int, int]] = []
+
+    date_styles = styles.date_styles
+    timedelta_styles = styles.timedelta_styles
+    date_cells: List[int] = []          # vị trí các ô số có định dạng ngày/giờ
+    column_cache: Dict[str, int] = {}   # 'AD' -> 30
+    row_counter = 0
+
+    # Chỉ xử lý khi </row> kết thúc: lúc đó đã có đủ các ô <c> của hàng
+    for _, element in iterparse(source):
+        tag = element.tag
+
+        if tag == _TAG_ROW:
+            row_attr = element.get("r")
+            row_counter = int(row_attr) if row_attr else row_counter + 1
+            col_counter = 0
+
+            for cell in element:
+                if cell.tag != _TAG_C:
+                    continue
+
+                ref = cell.get("r")
+                if ref:
+                    letters = ref.rstrip("0123456789")
+                    col = column_cache.get(letters)
+                    if col is None:
+                        col = column_cache[letters] = column_index(letters.lstrip("$"))
+                    col_counter = col
+                else:
+                    col_counter += 1
+                    col = col_counter
+
+                data_type = cell.get("t", "n")
+                style_id = int(cell.get("s", 0))
+                value = None
+
+                if data_type == "inlineStr":
+                    child = cell.find(_TAG_IS)
+                    if child is not None:
+                        value = _text_content(child)
+                else:
+                    text = cell.findtext(_TAG_V) or None
+                    if text is not None:
+                        if data_type == "n":
+                            value = _cast_number(text)
+                            if style_id in date_styles:
+                                if style_id in timedelta_styles:
+                                    try:
+                                        value = from_excel(value, epoch, timedelta=True)
+                                    except (OverflowError, ValueError):
+                                        value = CellError("#VALUE!")
+                                else:
+                                    # Giải mã cả loạt sau vòng lặp (from_excel_array)
+                                    date_cells.append(len(values))
+                        elif data_type == "s":
+                            value = shared_strings[int(text)]
+                        elif data_type == "b":
+                            value = bool(int(text))
+                        elif data_type == "e":
+                            value = CellError(text)
+                        elif data_type == "d":
+                            value = datetime.datetime.fromisoformat(text.rstrip("Z"))
+                        else:  # "str" (kết quả công thức)
+                            value = text
+
+                if values_only and value is None:
+                    continue
+                rows.append(row_counter)
+                cols.append(col)
+                style_ids.append(style_id)
+                values.append(value)
+
+            element.clear()
+
+        elif tag == _TAG_MERGE_CELL:
+            merged_ranges.append(parse_range_ref(element.get("ref")))
+
+    value_array = np.empty(len(values), dtype=object)
+    value_array[:] = values
+    if date_cells:
+        try:
+            serials = np.array([values[i] for i in date_cells], dtype=np.float64)
+        except OverflowError:
+            # int quá lớn cho float64 -> NaN (thành lỗi, như from_excel)
+            serials = np.array([values[i] if abs(values[i]) < 1e308 else np.nan
+                                for i in date_cells], dtype=np.float64)
+        value_array[date_cells] = from_excel_array(serials, epoch)
+
+    return SheetGrid(
+        title=title,
+        rows=np.asarray(rows, dtype=np.int32),
+        cols=np.asarray(cols, dtype=np.int32),
+        style_ids=np.asarray(style_ids, dtype=np.int32),
+        values=value_array,
+        merged_ranges=merged_ranges,
+        styles=styles,
+    )
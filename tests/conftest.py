@@ -0,0 +1,70 @@
+"""Fixture chung: Book1.xlsx của repo và các workbook tổng hợp (tạo bằng openpyxl)."""
+
+import datetime
+import os
+
+import pytest
+from openpyxl import Workbook
+from openpyxl.styles import Border, Side
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BOOK1 = os.path.join(REPO_ROOT, "Book1.xlsx")
+
+_THIN = Side(style="thin")
+# Hàng header trên: không kẻ dưới; hàng header cuối + dữ liệu: kẻ đủ 4 cạnh
+_HEADER_TOP = Border(left=_THIN, right=_THIN, top=_THIN)
+_HEADER_BOTTOM = Border(left=_THIN, right=_THIN, bottom=_THIN)
+_CELL = Border(left=_THIN, right=_THIN, top=_THIN, bottom=_THIN)
+
+
+def write_table(ws, top, left, header_rows, data_rows):
+    """
+    Ghi một bảng có border tại (top, left): các hàng header rồi các hàng dữ
+    liệu. Ranh giới header/data là đường kẻ đầu tiên chạy suốt bề ngang bảng.
+    """
+    for r, row in enumerate(header_rows):
+        border = _HEADER_BOTTOM if r == len(header_rows) - 1 else _HEADER_TOP
+        for c, value in enumerate(row):
+            cell = ws.cell(row=top + r, column=left + c, value=value)
+            cell.border = border
+    for r, row in enumerate(data_rows, start=top + len(header_rows)):
+        for c, value in enumerate(row):
+            cell = ws.cell(row=r, column=left + c, value=value)
+            cell.border = _CELL
+
+
+@pytest.fixture(scope="session")
+def book1():
+    return BOOK1
+
+
+@pytest.fixture(scope="session")
+def multi_table_xlsx(tmp_path_factory):
+    """
+    Một sheet có ba bảng tách rời: thuộc tính có ô trống (ffill), header hai
+    cấp, cột ngày, cột số nguyên có ô trống, cột chuỗi lặp lại.
+    """
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Sheet1"
+
+    write_table(ws, 2, 2,
+                [["Khu vực", "Doanh thu", None, "Ghi chú"],
+                 [None, "Q1", "Q2", "Loại"]],
+                [["Bắc" if i % 4 == 0 else None, i * 10, None if i % 3 == 0 else i * 1.5,
+                  ["A", "B"][i % 2]] for i in range(12)])
+
+    base = datetime.datetime(2024, 1, 1, 8, 30)
+    write_table(ws, 2, 8,
+                [["Mã", "Ngày", "Số lượng"]],
+                [[f"SP{i}", base + datetime.timedelta(days=i, minutes=i), None if i == 2 else i]
+                 for i in range(6)])
+
+    write_table(ws, 18, 2,
+                [["Tháng", "Kết quả", None],
+                 [None, "Đạt", "Chưa đạt"]],
+                [[m, m * 3, None if m % 2 else m] for m in range(1, 8)])
+
+    path = tmp_path_factory.mktemp("xlsx") / "multi_table.xlsx"
+    wb.save(path)
+    return str(path)
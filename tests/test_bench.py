@@ -0,0 +1,35 @@
+import pytest
+
+from ctc_extract import bench
+from ctc_extract.header_split import HEADER_SPLIT_STRATEGIES
+
+BORDER_STRATEGIES = ["edges", "edges_vectorized", "top_border", "top_border_vectorized"]
+
+
+@pytest.fixture(params=["book1", "multi_table_xlsx"])
+def workbook_path(request):
+    return request.getfixturevalue(request.param)
+
+
+@pytest.mark.parametrize("reader", ["native", "openpyxl"])
+def test_border_strategies_agree_on_synthetic_sheet(multi_table_xlsx, reader):
+    stats = bench.bench_file(multi_table_xlsx, sorted(HEADER_SPLIT_STRATEGIES), repeat=1, reader=reader)
+    assert set(stats) == set(HEADER_SPLIT_STRATEGIES)
+    assert all(entry["tables"] == 3 for entry in stats.values())
+    splits = [stats[name]["splits"] for name in BORDER_STRATEGIES]
+    assert splits == [[2, 1, 2]] * len(BORDER_STRATEGIES)
+
+
+@pytest.mark.parametrize("reader", ["native", "openpyxl"])
+def test_vectorized_strategies_match_scalar(workbook_path, reader):
+    stats = bench.bench_file(workbook_path, BORDER_STRATEGIES, repeat=1, reader=reader)
+    assert stats["edges_vectorized"]["splits"] == stats["edges"]["splits"]
+    assert stats["top_border_vectorized"]["splits"] == stats["top_border"]["splits"]
+
+
+def test_bench_cli_reports_every_strategy(multi_table_xlsx, capsys):
+    assert bench.main([multi_table_xlsx, "--repeat", "1"]) == 0
+    report = capsys.readouterr().out
+    for name in HEADER_SPLIT_STRATEGIES:
+        assert f"  {name} " in report
+    assert bench.main([multi_table_xlsx, "--strategies", "nope"]) == 2
@@ -0,0 +1,21 @@
+import shutil
+
+from ctc_extract.cli import main
+
+
+def test_same_stem_inputs_are_rejected(book1, tmp_path, capsys):
+    inputs = []
+    for folder in ("a", "b"):
+        (tmp_path / folder).mkdir()
+        inputs.append(str(shutil.copy(book1, tmp_path / folder / "Book1.xlsx")))
+    out_dir = tmp_path / "out"
+
+    assert main(inputs + ["--workers", "2", "-o", str(out_dir)]) == 2
+    assert "Book1.json" in capsys.readouterr().err
+    assert not out_dir.exists()
+
+
+def test_distinct_inputs_are_written(book1, multi_table_xlsx, tmp_path, capsys):
+    out_dir = tmp_path / "out"
+    assert main([book1, multi_table_xlsx, "-o", str(out_dir)]) == 0
+    assert sorted(p.name for p in out_dir.iterdir()) == ["Book1.json", "multi_table.json"]
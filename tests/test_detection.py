@@ -0,0 +1,40 @@
+import contextlib
+import io
+
+from openpyxl import Workbook
+from openpyxl.workbook.defined_name import DefinedName
+from openpyxl.worksheet.table import Table
+
+from ctc_extract import detect_tables
+
+
+def _quiet(func, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def _fill(ws, top, left, rows, cols, header=None):
+    for r in range(rows):
+        for c in range(cols):
+            value = header[c] if header and r == 0 else (r + 1) * 10 + c
+            ws.cell(row=top + r, column=left + c, value=value)
+
+
+def test_structured_tables_same_order_for_both_readers(tmp_path):
+    # Table T1 ở dưới cùng, tên toàn cục "Rng" ở trên, tên cục bộ "Local" ở giữa
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Sheet1"
+    _fill(ws, 30, 1, 4, 3, header=["a", "b", "c"])
+    ws.add_table(Table(displayName="T1", ref="A30:C33"))
+    _fill(ws, 1, 1, 4, 3)
+    wb.defined_names["Rng"] = DefinedName("Rng", attr_text="Sheet1!$A$1:$C$4")
+    _fill(ws, 12, 2, 3, 3)
+    ws.defined_names["Local"] = DefinedName("Local", attr_text="Sheet1!$B$12:$D$14")
+    path = tmp_path / "structured.xlsx"
+    wb.save(path)
+
+    native = _quiet(detect_tables, str(path), "Sheet1", 2, 2, reader="native", structured=True)
+    fallback = _quiet(detect_tables, str(path), "Sheet1", 2, 2, reader="openpyxl", structured=True)
+    assert native == fallback
+    assert [(t["min_row"], t["min_col"]) for t in native] == [(1, 1), (12, 2), (30, 1)]
@@ -0,0 +1,112 @@
+"""
+Các đường chạy nhanh (shard, scanline, bộ đọc native, cache, ghi streaming)
+phải cho kết quả giống hệt đường chạy gốc - trên Book1.xlsx và một sheet
+tổng hợp nhiều bảng.
+"""
+
+import contextlib
+import io
+import json
+
+import pandas as pd
+import pytest
+
+from ctc_extract import (debug_extract_data, detect_tables, excel_to_nested_json, extract_sheet,
+                         infer_column_types, load_worksheet, parse_table_to_long_json,
+                         parse_table_to_long_json_sharded)
+from ctc_extract.grid_cache import load_sheet
+
+
+@pytest.fixture(params=["book1", "multi_table_xlsx"])
+def workbook(request):
+    return request.getfixturevalue(request.param)
+
+
+def _quiet(func, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def _dump(records):
+    # NaN != NaN: so sánh qua chuỗi JSON
+    return json.dumps(records, ensure_ascii=False, default=str)
+
+
+def _tables(path, sheet="Sheet1"):
+    """(header_df, data_df, layout) của từng bảng parse được trong sheet."""
+    layouts = []
+    _quiet(extract_sheet, path, sheet, layouts=layouts)
+    ws, _ = load_worksheet(path, sheet)
+    for layout in layouts:
+        raw = _quiet(debug_extract_data, path, sheet, layout["boundary"], ws)
+        data_df = infer_column_types(raw.iloc[layout["split"]:], layout["data_cols"])
+        yield raw.iloc[:layout["split"]], data_df, layout
+
+
+def test_sharded_matches_unsharded(workbook):
+    tables = list(_tables(workbook))
+    assert tables
+    for header_df, data_df, layout in tables:
+        expected = parse_table_to_long_json(header_df, data_df, layout["attribute_cols"],
+                                            layout["data_cols"])
+        sharded = _quiet(parse_table_to_long_json_sharded, header_df, data_df,
+                         layout["attribute_cols"], layout["data_cols"], workers=3, min_shard_rows=2)
+        assert _dump(sharded) == _dump(expected)
+
+
+def test_sharded_carries_ffill_across_shards(multi_table_xlsx):
+    header_df, data_df, layout = next(_tables(multi_table_xlsx))
+    attribute_cols = layout["attribute_cols"]
+    # 12 hàng, 5 shard: ranh giới 2, 4, 7, 9 - hàng 2, 7, 9 không có giá trị thuộc tính
+    assert data_df.iloc[[2, 7, 9], attribute_cols[0]].isna().all()
+
+    expected = parse_table_to_long_json(header_df, data_df, attribute_cols, layout["data_cols"])
+    sharded = _quiet(parse_table_to_long_json_sharded, header_df, data_df,
+                     attribute_cols, layout["data_cols"], workers=5, min_shard_rows=2)
+    assert _dump(sharded) == _dump(expected)
+    assert all(record["Khu vực"] == "Bắc" for record in sharded)
+
+
+def test_scanline_matches_bfs(workbook):
+    bfs = _quiet(detect_tables, workbook, "Sheet1", 2, 2, engine="bfs")
+    scanline = _quiet(detect_tables, workbook, "Sheet1", 2, 2, engine="scanline")
+    assert bfs and scanline == bfs
+    assert (_dump(_quiet(extract_sheet, workbook, "Sheet1", engine="scanline"))
+            == _dump(_quiet(extract_sheet, workbook, "Sheet1", engine="bfs")))
+
+
+def test_native_reader_matches_openpyxl(workbook):
+    assert (_quiet(detect_tables, workbook, "Sheet1", 2, 2, reader="native")
+            == _quiet(detect_tables, workbook, "Sheet1", 2, 2, reader="openpyxl"))
+
+    ws, wb = load_worksheet(workbook, "Sheet1", reader="openpyxl")
+    try:
+        from_openpyxl = _quiet(extract_sheet, workbook, "Sheet1", worksheet=ws)
+    finally:
+        wb.close()
+    assert _dump(_quiet(extract_sheet, workbook, "Sheet1")) == _dump(from_openpyxl)
+
+
+def test_cached_matches_uncached(workbook, tmp_path):
+    uncached = _quiet(extract_sheet, workbook, "Sheet1")
+    for _ in range(2):  # lần 1 ghi cache, lần 2 đọc từ cache
+        grid = load_sheet(workbook, "Sheet1", cache_dir=str(tmp_path))
+        assert _dump(_quiet(extract_sheet, workbook, "Sheet1", worksheet=grid)) == _dump(uncached)
+    assert any(tmp_path.iterdir())
+
+
+def test_streamed_output_matches_in_memory(workbook, tmp_path):
+    df = pd.read_excel(workbook, header=None)
+    in_memory_path = tmp_path / "in_memory.json"
+    result = _quiet(excel_to_nested_json, df, str(in_memory_path))
+
+    streamed_path = tmp_path / "streamed.json"
+    _quiet(excel_to_nested_json, df, str(streamed_path), stream=True)
+    assert streamed_path.read_text(encoding="utf-8") == in_memory_path.read_text(encoding="utf-8")
+
+    ndjson_path = tmp_path / "rows.ndjson"
+    summary = _quiet(excel_to_nested_json, df, str(ndjson_path), ndjson=True)
+    lines = [json.loads(line) for line in ndjson_path.read_text(encoding="utf-8").splitlines()]
+    assert summary["total_rows"] == len(result["data"])
+    assert lines[0] == {"metadata": result["metadata"]}
+    assert lines[1:] == result["data"]
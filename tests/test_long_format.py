@@ -0,0 +1,96 @@
+import contextlib
+import datetime
+import io
+import json
+
+import pandas as pd
+import pytest
+
+from ctc_extract import extract_sheet, infer_column_types, long_format, parse_table_to_long_json
+from ctc_extract.long_format import (_build_header_map, analyze_header, clear_header_memo,
+                                     detect_attribute_boundary, header_memo_info)
+
+
+def _extract(path, sheet="Sheet1", **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return extract_sheet(path, sheet, **kwargs)
+
+
+def test_infer_column_types():
+    df = pd.DataFrame({
+        0: pd.Series([datetime.datetime(2024, 1, 1, 8, 30), None, datetime.datetime(2024, 3, 2), None], dtype=object),
+        1: pd.Series(["A", "B", "A", "B"], dtype=object),
+    })
+    typed = infer_column_types(df, [0, 1])
+    assert typed[0].dtype.kind == "M"
+    assert isinstance(typed[1].dtype, pd.CategoricalDtype)
+
+
+def test_date_column_round_trips_through_json(multi_table_xlsx):
+    records = _extract(multi_table_xlsx)
+
+    dates = [r["Ngày"] for r in records if "Ngày" in r]
+    assert len(dates) == 6
+    assert all(type(value) is datetime.datetime for value in dates)
+    assert dates[1] == datetime.datetime(2024, 1, 2, 8, 31)
+
+    # Cột chuỗi lặp lại (categorical) trả về str thuần
+    kinds = [r["Ghi chú"]["Loại"] for r in records if "Ghi chú" in r]
+    assert kinds and all(type(value) is str for value in kinds)
+
+    decoded = json.loads(json.dumps(records, default=str))
+    assert [r["Ngày"] for r in decoded if "Ngày" in r] == [str(value) for value in dates]
+    assert decoded[0] == {"Khu vực": "Bắc", "Doanh thu": {"Q1": 0}}
+
+
+def test_column_without_header_keeps_its_values(capsys):
+    # Cột 0 không có ô header nào (ffill ngang không có gì bên trái để lấp)
+    header_df = pd.DataFrame([[None, "Nhóm"], [None, "x"]], dtype=object)
+    data_df = pd.DataFrame([[1, 2], [3, None]], dtype=object, index=[2, 3])
+    records = parse_table_to_long_json(header_df, data_df, [], [0, 1])
+    assert records == [{"Column_0": 1}, {"Nhóm": {"x": 2}}, {"Column_0": 3}]
+    assert "⚠ Cột 0 không có header" in capsys.readouterr().out
+
+    # header_map có sẵn (ví dụ từ template cũ) còn path rỗng
+    assert parse_table_to_long_json(header_df, data_df, [], [0, 1], header_map={0: [], 1: ["Nhóm", "x"]}) \
+        == records
+
+
+def _header(year):
+    return pd.DataFrame([["Khu vực", "Năm", None], [None, year, "Ghi chú"]], dtype=object)
+
+
+def test_header_memo_hit_matches_cold_call():
+    clear_header_memo()
+    with contextlib.redirect_stdout(io.StringIO()):
+        cold = analyze_header(_header(2024))
+        warm = analyze_header(_header(2024))
+    assert header_memo_info()["hits"] == 1 and header_memo_info()["misses"] == 1
+    assert warm == cold
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        attribute_cols, data_cols = detect_attribute_boundary(_header(2024))
+        expected = (attribute_cols, data_cols, _build_header_map(_header(2024), data_cols))
+    assert cold == expected
+
+
+@pytest.mark.parametrize("first, second", [(2024, 2024.0), (True, 1), (1, "1")])
+def test_header_memo_separates_equal_values_of_different_types(first, second):
+    clear_header_memo()
+    with contextlib.redirect_stdout(io.StringIO()):
+        a = analyze_header(_header(first))
+        b = analyze_header(_header(second))
+    assert header_memo_info()["misses"] == 2 and header_memo_info()["hits"] == 0
+    assert type(a[2][1][1]) is type(first)
+    assert type(b[2][1][1]) is type(second)
+
+
+def test_header_memo_is_bounded(monkeypatch):
+    clear_header_memo()
+    monkeypatch.setattr(long_format, "HEADER_MEMO_SIZE", 1)
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyze_header(_header(2023))
+        analyze_header(_header(2024))
+        analyze_header(_header(2023))
+    assert header_memo_info()["size"] == 1
+    assert header_memo_info()["misses"] == 3
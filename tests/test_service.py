@@ -0,0 +1,82 @@
+import asyncio
+import io
+import json
+import subprocess
+import sys
+
+import pytest
+
+from conftest import REPO_ROOT
+from ctc_extract.service import (ExtractionService, ExtractOptions, _handle_http, _options_from_query,
+                                 _run_stdin)
+
+
+def test_native_path_does_not_import_openpyxl(book1):
+    code = ("import contextlib, io, sys\n"
+            "from ctc_extract.service import extract_workbook_sync\n"
+            "with contextlib.redirect_stdout(io.StringIO()):\n"
+            f"    result = extract_workbook_sync({book1!r})\n"
+            "assert result['sheets'] and not result['errors'], result['errors']\n"
+            "print('openpyxl' in sys.modules)\n")
+    output = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True,
+                            text=True, check=True).stdout
+    assert output.strip() == "False"
+
+
+def test_service_built_outside_loop_survives_several_loops(book1):
+    # Semaphore tạo trong loop đang chạy: dùng lại service qua nhiều asyncio.run
+    service = ExtractionService(max_workers=1, max_concurrency=1)
+
+    async def two_at_once():
+        return await asyncio.gather(service.extract(book1), service.extract(book1))
+
+    try:
+        for _ in range(2):
+            results = asyncio.run(two_at_once())
+            assert all(result["sheets"] and not result["errors"] for result in results)
+    finally:
+        service.close()
+
+
+def test_stdin_mode(book1, monkeypatch, capsys):
+    monkeypatch.setattr(sys, "stdin", io.StringIO(f"{book1}\n\n"))
+
+    async def run():
+        async with ExtractionService(max_workers=1) as service:
+            await _run_stdin(service, ExtractOptions(), None)
+
+    asyncio.run(run())
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 1
+    assert json.loads(lines[0])["file"] == book1
+
+
+@pytest.mark.parametrize("query", ["engine=dfs", "detection=cells", "header_strategy=nope"])
+def test_http_rejects_unknown_choices(query):
+    async def request():
+        service = ExtractionService(max_workers=1)
+        server = await asyncio.start_server(
+            lambda r, w: _handle_http(service, ExtractOptions(), None, 1024, r, w), "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(f"POST /extract?{query} HTTP/1.1\r\nContent-Length: 0\r\n\r\n".encode("ascii"))
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            return response
+        finally:
+            server.close()
+            await server.wait_closed()
+            service.close()
+
+    response = asyncio.run(request())
+    assert response.startswith(b"HTTP/1.1 400 ")
+    assert query.split("=")[0].encode("ascii") in response
+
+
+def test_query_options_accept_valid_choices():
+    options = _options_from_query({"engine": ["scanline"], "detection": ["values"],
+                                   "header_strategy": ["numeric_density"]}, ExtractOptions())
+    assert (options.engine, options.detection, options.header_strategy) == \
+        ("scanline", "values", "numeric_density")
@@ -0,0 +1,98 @@
+import contextlib
+import io
+import json
+
+import pytest
+from openpyxl import Workbook
+
+from conftest import write_table
+from ctc_extract import extract_sheet
+from ctc_extract.templates import TEMPLATE_VERSION, TemplateStore, extract_sheet_templated
+
+
+def _run(func, *args, **kwargs):
+    """(kết quả, log in ra) của một lần chạy."""
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        return func(*args, **kwargs), log.getvalue()
+
+
+def _report(path, header="Doanh thu", scale=1):
+    """Báo cáo định kỳ: cùng bố cục, số liệu (và có thể header) thay đổi."""
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Sheet1"
+    write_table(ws, 2, 2,
+                [["Khu vực", header, None], [None, "Q1", "Q2"]],
+                [[f"KV{i}", i * scale, i * scale + 1] for i in range(5)])
+    wb.save(path)
+    return str(path)
+
+
+def _template_files(directory):
+    return sorted(p for p in directory.iterdir() if p.suffix == ".json")
+
+
+def test_template_hit_matches_extract_sheet(tmp_path):
+    first = _report(tmp_path / "a.xlsx")
+    second = _report(tmp_path / "b.xlsx", scale=7)
+    store_dir = tmp_path / "templates"
+
+    records, log = _run(extract_sheet_templated, first, "Sheet1", TemplateStore(str(store_dir)))
+    assert "✓ Template" not in log
+    assert len(records) == 10
+    assert records == _run(extract_sheet, first, "Sheet1")[0]
+    assert len(_template_files(store_dir)) == 1
+
+    # Store mới: template được đọc lại từ đĩa
+    records, log = _run(extract_sheet_templated, second, "Sheet1", TemplateStore(str(store_dir)))
+    assert "✓ Template" in log
+    assert records == _run(extract_sheet, second, "Sheet1")[0]
+
+
+def test_header_mismatch_reruns_and_overwrites(tmp_path):
+    store_dir = tmp_path / "templates"
+    _run(extract_sheet_templated, _report(tmp_path / "a.xlsx"), "Sheet1", TemplateStore(str(store_dir)))
+
+    changed = _report(tmp_path / "b.xlsx", header="Chi phí")
+    records, log = _run(extract_sheet_templated, changed, "Sheet1", TemplateStore(str(store_dir)))
+    assert "Header khác template" in log
+    assert records == _run(extract_sheet, changed, "Sheet1")[0]
+
+    [template_file] = _template_files(store_dir)
+    template = json.loads(template_file.read_text(encoding="utf-8"))
+    assert template["tables"][0]["header"][0][1] == "Chi phí"
+    _, log = _run(extract_sheet_templated, changed, "Sheet1", TemplateStore(str(store_dir)))
+    assert "✓ Template" in log
+
+
+@pytest.mark.parametrize("content", [
+    "{not json",
+    json.dumps({"version": TEMPLATE_VERSION - 1, "sheet": "Sheet1", "tables": []}),
+    json.dumps({"version": TEMPLATE_VERSION, "sheet": "Sheet1", "tables": [{"boundary": 1}]}),
+])
+def test_corrupt_or_old_template_is_ignored(tmp_path, content):
+    path = _report(tmp_path / "a.xlsx")
+    store_dir = tmp_path / "templates"
+    _run(extract_sheet_templated, path, "Sheet1", TemplateStore(str(store_dir)))
+    [template_file] = _template_files(store_dir)
+    template_file.write_text(content, encoding="utf-8")
+
+    records, log = _run(extract_sheet_templated, path, "Sheet1", TemplateStore(str(store_dir)))
+    assert "✓ Template" not in log
+    assert records == _run(extract_sheet, path, "Sheet1")[0]
+    # Template hỏng được ghi lại bằng bản mới
+    assert json.loads(template_file.read_text(encoding="utf-8"))["version"] == TEMPLATE_VERSION
+
+
+def test_unwritable_store_still_returns_records(tmp_path, monkeypatch):
+    path = _report(tmp_path / "a.xlsx")
+
+    def read_only(*args, **kwargs):
+        raise PermissionError(13, "Permission denied")
+
+    # Chạy bằng root thì chmod không chặn được ghi -> giả lập thư mục chỉ đọc
+    monkeypatch.setattr("ctc_extract.templates.tempfile.mkstemp", read_only)
+    records, log = _run(extract_sheet_templated, path, "Sheet1", TemplateStore(str(tmp_path / "templates")))
+    assert "Không ghi được template" in log
+    assert records == _run(extract_sheet, path, "Sheet1")[0]
@@ -0,0 +1,61 @@
+import contextlib
+import datetime
+import io
+
+import pandas as pd
+from openpyxl import Workbook
+
+from ctc_extract import debug_extract_data, extract_sheet, load_worksheet
+from ctc_extract.header_split import HEADER_SPLIT_STRATEGIES
+
+
+def _quiet(func, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def _plain_sheet(path):
+    """Bảng không kẻ border: header 2 hàng, cột ngày + cột giờ + cột chuỗi."""
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Sheet1"
+    ws.append(["Mã", "Thời gian", None, "Ghi chú"])
+    ws.append([None, "Ngày", "Giờ", None])
+    for i in range(5):
+        ws.append([f"SP{i}", datetime.datetime(2024, 1, 1 + i), datetime.time(8, i), "x"])
+    wb.save(path)
+    return str(path)
+
+
+def test_values_mode_decodes_dates(multi_table_xlsx):
+    boundary = {"min_row": 2, "max_row": 8, "min_col": 8, "max_col": 10}
+    frames = []
+    for values_only in (False, True):
+        ws, _ = load_worksheet(multi_table_xlsx, "Sheet1", values_only=values_only)
+        frames.append(_quiet(debug_extract_data, multi_table_xlsx, "Sheet1", boundary, ws))
+    assert frames[0].astype(object).equals(frames[1].astype(object))
+    assert frames[1].iloc[1, 1] == datetime.datetime(2024, 1, 1, 8, 30)
+
+
+def test_values_mode_same_dates_as_borders_mode(multi_table_xlsx):
+    borders = _quiet(extract_sheet, multi_table_xlsx, "Sheet1")
+    values = _quiet(extract_sheet, multi_table_xlsx, "Sheet1", detection="values")
+    assert [r for r in values if "Mã" in r] == [r for r in borders if "Mã" in r]
+
+
+def test_numeric_density_counts_dates():
+    df = pd.DataFrame([["Mã", "Ngày", "Ghi chú"],
+                       ["SP0", datetime.datetime(2024, 1, 1), "x"],
+                       ["SP1", datetime.datetime(2024, 1, 2), "y"]], dtype=object)
+    split = _quiet(HEADER_SPLIT_STRATEGIES["numeric_density"], df, None, {}, {})
+    assert split == 1
+
+
+def test_values_mode_on_plain_sheet(tmp_path):
+    path = _plain_sheet(tmp_path / "plain.xlsx")
+    records = _quiet(extract_sheet, path, "Sheet1", detection="values")
+    assert records[:2] == [
+        {"Mã": "SP0", "Thời gian": {"Ngày": datetime.datetime(2024, 1, 1)}},
+        {"Mã": "SP0", "Thời gian": {"Giờ": datetime.time(8, 0)}},
+    ]
+    assert len(records) == 15
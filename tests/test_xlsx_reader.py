@@ -0,0 +1,73 @@
+import contextlib
+import datetime
+import io
+
+import numpy as np
+import pytest
+from openpyxl import Workbook, load_workbook
+from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900
+from openpyxl.utils.datetime import from_excel as openpyxl_from_excel
+
+from ctc_extract import debug_extract_data, detect_tables
+from ctc_extract.xlsx_reader import CellError, from_excel_array, read_sheet
+
+
+def _quiet(func, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def test_value_mask_is_computed_once(book1):
+    grid = read_sheet(book1, "Sheet1")
+    mask = grid.has_value()
+    assert grid.has_value() is mask
+    assert not mask.flags.writeable
+    assert grid.last_data_row == int(grid.rows[mask].max())
+
+    for boundary in _quiet(detect_tables, book1, "Sheet1", 2, 2):
+        from_grid = _quiet(debug_extract_data, book1, "Sheet1", boundary, grid)
+        from_pandas = _quiet(debug_extract_data, book1, "Sheet1", boundary)
+        assert from_grid.astype(object).equals(from_pandas.astype(object))
+    assert grid.has_value() is mask
+
+
+SERIALS = [0, 1e-9, 0.25, 0.5000000001, 0.99999999, 0.9999999999,   # chỉ giờ / sát nửa đêm
+           1, 1.5, 59, 59.999, 60, 60.5, 61,                           # lỗi năm nhuận 1900 của Excel
+           45292, 45292.75, 2958465.999, -0.5, -1.5,
+           -700000, 3e6]                                               # ngoài năm 1-9999
+
+
+@pytest.mark.parametrize("epoch", [CALENDAR_WINDOWS_1900, CALENDAR_MAC_1904], ids=["1900", "1904"])
+def test_vectorized_dates_match_openpyxl(epoch):
+    decoded = from_excel_array(np.array(SERIALS, dtype=np.float64), epoch).tolist()
+    for serial, value in zip(SERIALS, decoded):
+        try:
+            expected = openpyxl_from_excel(serial, epoch)
+        except (OverflowError, ValueError):
+            assert isinstance(value, CellError), serial
+            continue
+        assert type(value) is type(expected) and value == expected, serial
+
+
+@pytest.mark.parametrize("epoch", [CALENDAR_WINDOWS_1900, CALENDAR_MAC_1904], ids=["1900", "1904"])
+def test_date_cells_match_openpyxl_reader(tmp_path, epoch):
+    wb = Workbook()
+    wb.epoch = epoch
+    ws = wb.active
+    ws.title = "Sheet1"
+    for row, serial in enumerate([0.25, 0.75, 1, 59, 60, 61, 45292.5], start=1):
+        for col, number_format in enumerate(["yyyy-mm-dd hh:mm", "hh:mm:ss"], start=1):
+            cell = ws.cell(row=row, column=col, value=serial)
+            cell.number_format = number_format
+    ws.cell(row=8, column=1, value=datetime.datetime(2024, 2, 29, 13, 45))
+    ws.cell(row=8, column=2, value=datetime.time(7, 30))
+    path = tmp_path / f"dates_{epoch.year}.xlsx"
+    wb.save(path)
+
+    grid = read_sheet(str(path), "Sheet1")
+    reference = load_workbook(path, data_only=True)["Sheet1"]
+    for row in range(1, 9):
+        for col in (1, 2):
+            value = grid.cell(row, col).value
+            expected = reference.cell(row=row, column=col).value
+            assert type(value) is type(expected) and value == expected, (row, col)